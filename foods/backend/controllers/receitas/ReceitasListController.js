@@ -3,6 +3,10 @@
  * Implementa operações de listagem e busca de receitas
  */
 
+const PythonPDFService = require('../../services/pythonPDFService');
+
+const pythonPDFService = new PythonPDFService();
+
 class ReceitasListController {
   /**
    * Listar receitas com paginação e filtros
@@ -72,6 +76,34 @@ class ReceitasListController {
     }
   }
 
+  /**
+   * Consultar em quais cardápios processados (arquivo, data, turno) um código de receita aparece
+   */
+  static async consultarIndiceCardapios(req, res) {
+    try {
+      const { codigo, data, limite } = req.query;
+      const resultado = await pythonPDFService.consultarIndiceReceitas({
+        codigo,
+        data,
+        limite: limite ? parseInt(limite) : undefined
+      });
+
+      res.json({
+        success: true,
+        data: {
+          ocorrencias: resultado.ocorrencias,
+          total: resultado.total
+        }
+      });
+    } catch (error) {
+      console.error('Erro ao consultar índice de receitas dos cardápios:', error);
+      res.status(500).json({
+        success: false,
+        error: 'Erro interno do servidor'
+      });
+    }
+  }
+
   // ===== MÉTODOS DE LÓGICA DE NEGÓCIO =====
 
   /**
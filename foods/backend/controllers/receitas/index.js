@@ -13,6 +13,7 @@ module.exports = {
   buscarPorId: ReceitasListController.buscarPorId,
   listarReceitas: ReceitasListController.listarReceitas,
   buscarReceitaPorId: ReceitasListController.buscarReceitaPorId,
+  consultarIndiceCardapios: ReceitasListController.consultarIndiceCardapios,
   
   // Métodos CRUD
   criar: ReceitasCRUDController.criar,
@@ -30,6 +30,13 @@ router.get('/',
   receitasController.listar
 );
 
+// Onde um código de receita aparece nos cardápios processados (?codigo=LL25.228 e/ou ?data=13/10/2025)
+router.get('/indice-cardapios',
+  checkScreenPermission('receitas', 'visualizar'),
+  receitasValidations.indiceCardapios,
+  receitasController.consultarIndiceCardapios
+);
+
 // Buscar receita por ID
 router.get('/:id',
   checkScreenPermission('receitas', 'visualizar'),
@@ -4,6 +4,9 @@
  */
 
 const { body, param, query } = require('express-validator');
+const { createEntityValidationHandler } = require('../../middleware/validationHandler');
+
+const handleValidationErrors = createEntityValidationHandler('receitas');
 
 // Validações comuns (reutilizáveis)
 const commonValidations = {
@@ -55,6 +58,18 @@ const receitasValidations = {
 
 
 
+  // Consulta ao índice de códigos de receita dos cardápios processados
+  indiceCardapios: [
+    query('codigo').optional().isString().trim().matches(/^[A-Za-z]{1,2}\d{2}\.\d{2,3}$/)
+      .withMessage('Código deve estar no formato LL25.228'),
+    query('data').optional().matches(/^(\d{2}\/\d{2}\/\d{4}|\d{4}-\d{2}-\d{2})$/)
+      .withMessage('Data deve estar no formato dd/mm/aaaa'),
+    query('limite').optional().isInt({ min: 1, max: 5000 }).withMessage('Limite deve ser entre 1 e 5000'),
+    query('codigo').custom((codigo, { req }) => Boolean(codigo || req.query.data))
+      .withMessage('Informe codigo ou data'),
+    handleValidationErrors
+  ],
+
   // Validação para formato de exportação
   formatoExportacao: [
     param('formato').isIn(['xlsx', 'pdf', 'csv']).withMessage('Formato deve ser: xlsx, pdf ou csv')
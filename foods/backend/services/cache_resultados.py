@@ -0,0 +1,191 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Cache de resultados de cardápios processados
+Chaveado pelo hash do conteúdo do PDF + versão do processador, com uma
+camada LRU em memória e uma camada em disco com limite de tamanho e idade
+"""
+
+import json
+import os
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, Callable, Dict, Optional, Tuple
+
+# Intervalo entre releituras completas do diretório (arquivos de outros processos e vencidos)
+INTERVALO_VARREDURA_SEGUNDOS = 300
+
+
+class CacheResultados:
+    """Cache em dois níveis (memória LRU + disco) para resultados em JSON"""
+
+    def __init__(self, diretorio: Optional[str] = None, max_itens_memoria: int = 32,
+                 max_bytes_disco: int = 512 * 1024 * 1024, max_idade_segundos: int = 30 * 24 * 3600):
+        """
+        Args:
+            diretorio: Diretório do nível em disco (None desativa o disco)
+            max_itens_memoria: Resultados mantidos em memória
+            max_bytes_disco: Tamanho total máximo dos arquivos em disco
+            max_idade_segundos: Idade máxima de um arquivo em disco desde o último acesso
+        """
+        self.diretorio = diretorio
+        self.max_itens_memoria = max_itens_memoria
+        self.max_bytes_disco = max_bytes_disco
+        self.max_idade_segundos = max_idade_segundos
+        self._memoria: "OrderedDict[str, str]" = OrderedDict()
+        self._lock = threading.Lock()
+        self._estatisticas = {"hits_memoria": 0, "hits_disco": 0, "misses": 0, "gravacoes": 0, "removidos_disco": 0}
+        # Ocupação do disco acompanhada a cada gravação: caminho → (último acesso, tamanho)
+        self._arquivos_disco: Dict[str, Tuple[float, int]] = {}
+        self._bytes_disco = 0
+        self._ultima_varredura = 0.0
+
+        if self.diretorio:
+            os.makedirs(self.diretorio, exist_ok=True)
+            self._varrer_disco()
+
+    @staticmethod
+    def calcular_chave(hash_conteudo: str, versao: str) -> str:
+        """Chave do cache: sha256 do PDF (hexadecimal, já calculado por quem chama) seguido da versão do processador"""
+        return f"{hash_conteudo}-{versao}"
+
+    def _caminho_disco(self, chave: str) -> str:
+        return os.path.join(self.diretorio, f"{chave}.json")
+
+    def obter(self, chave: str) -> Optional[Dict[str, Any]]:
+        """
+        Busca um resultado (memória, depois disco)
+
+        Args:
+            chave: Chave calculada por calcular_chave
+
+        Returns:
+            Cópia independente do resultado ou None
+        """
+        serializado = self.obter_serializado(chave)
+        return json.loads(serializado) if serializado is not None else None
+
+    def obter_serializado(self, chave: str) -> Optional[str]:
+        """Como obter, mas devolve o JSON guardado sem decodificar"""
+        with self._lock:
+            serializado = self._memoria.get(chave)
+            if serializado is not None:
+                self._memoria.move_to_end(chave)
+                self._estatisticas["hits_memoria"] += 1
+                return serializado
+
+            if self.diretorio:
+                caminho = self._caminho_disco(chave)
+                try:
+                    if time.time() - os.path.getmtime(caminho) <= self.max_idade_segundos:
+                        with open(caminho, "r", encoding="utf-8") as f:
+                            serializado = f.read()
+                        # Acesso renova a idade do arquivo
+                        os.utime(caminho, None)
+                        if caminho in self._arquivos_disco:
+                            self._arquivos_disco[caminho] = (time.time(), self._arquivos_disco[caminho][1])
+                        self._guardar_memoria(chave, serializado)
+                        self._estatisticas["hits_disco"] += 1
+                        return serializado
+                except OSError:
+                    pass
+
+            self._estatisticas["misses"] += 1
+            return None
+
+    def salvar(self, chave: str, resultado: Dict[str, Any], padrao: Optional[Callable[[Any], Any]] = None):
+        """
+        Guarda o resultado nos dois níveis e aplica a remoção por tamanho/idade
+
+        Args:
+            padrao: Função default= do json.dumps para objetos que não são JSON nativo
+        """
+        self.salvar_serializado(chave, json.dumps(resultado, ensure_ascii=False, separators=(",", ":"), default=padrao))
+
+    def salvar_serializado(self, chave: str, serializado: str):
+        """Como salvar, para um resultado já serializado em JSON"""
+        with self._lock:
+            self._guardar_memoria(chave, serializado)
+            self._estatisticas["gravacoes"] += 1
+            if not self.diretorio:
+                return
+            try:
+                caminho_temporario = f"{self._caminho_disco(chave)}.{os.getpid()}.tmp"
+                with open(caminho_temporario, "w", encoding="utf-8") as f:
+                    f.write(serializado)
+                caminho = self._caminho_disco(chave)
+                os.replace(caminho_temporario, caminho)
+                self._registrar_arquivo(caminho, os.path.getsize(caminho))
+                self._remover_excedentes_disco()
+            except OSError as e:
+                print(f"❌ Erro ao gravar cache: {str(e)}")
+
+    def _guardar_memoria(self, chave: str, serializado: str):
+        self._memoria[chave] = serializado
+        self._memoria.move_to_end(chave)
+        while len(self._memoria) > self.max_itens_memoria:
+            self._memoria.popitem(last=False)
+
+    def _registrar_arquivo(self, caminho: str, tamanho: int):
+        _, tamanho_anterior = self._arquivos_disco.get(caminho, (0.0, 0))
+        self._arquivos_disco[caminho] = (time.time(), tamanho)
+        self._bytes_disco += tamanho - tamanho_anterior
+
+    def _varrer_disco(self):
+        """Relê o diretório: remove os vencidos e recalcula a ocupação"""
+        agora = time.time()
+        self._arquivos_disco = {}
+        for nome in os.listdir(self.diretorio):
+            if not nome.endswith(".json"):
+                continue
+            caminho = os.path.join(self.diretorio, nome)
+            try:
+                info = os.stat(caminho)
+            except OSError:
+                continue
+            if agora - info.st_mtime > self.max_idade_segundos:
+                self._remover_arquivo(caminho)
+            else:
+                self._arquivos_disco[caminho] = (info.st_mtime, info.st_size)
+        self._bytes_disco = sum(tamanho for _, tamanho in self._arquivos_disco.values())
+        self._ultima_varredura = agora
+
+    def _remover_excedentes_disco(self):
+        """
+        Remove os arquivos menos acessados até caber no limite
+
+        A ocupação vem do registro mantido a cada gravação; o diretório só é
+        relido a cada INTERVALO_VARREDURA_SEGUNDOS (vencidos e gravações de
+        outros processos que compartilham o diretório).
+        """
+        if time.time() - self._ultima_varredura > INTERVALO_VARREDURA_SEGUNDOS:
+            self._varrer_disco()
+        if self._bytes_disco <= self.max_bytes_disco:
+            return
+        for caminho, (_, tamanho) in sorted(self._arquivos_disco.items(), key=lambda item: item[1][0]):
+            if self._bytes_disco <= self.max_bytes_disco:
+                break
+            self._remover_arquivo(caminho)
+
+    def _remover_arquivo(self, caminho: str):
+        _, tamanho = self._arquivos_disco.pop(caminho, (0.0, 0))
+        self._bytes_disco -= tamanho
+        try:
+            os.unlink(caminho)
+            self._estatisticas["removidos_disco"] += 1
+        except OSError:
+            pass
+
+    def estatisticas(self) -> Dict[str, Any]:
+        """Contadores de hits/misses e ocupação atual"""
+        with self._lock:
+            consultas = self._estatisticas["hits_memoria"] + self._estatisticas["hits_disco"] + self._estatisticas["misses"]
+            hits = self._estatisticas["hits_memoria"] + self._estatisticas["hits_disco"]
+            return {
+                **self._estatisticas,
+                "taxa_acerto": round(hits / consultas, 4) if consultas else 0.0,
+                "itens_memoria": len(self._memoria),
+                "bytes_disco": self._bytes_disco,
+                "diretorio": self.diretorio
+            }
@@ -0,0 +1,193 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Formato compacto do resultado do processador de cardápios
+Cada refeição é gravada uma única vez, como índices para tabelas de datas,
+turnos e receitas (código, descrição, texto original); cardapio_por_data
+guarda só os índices das refeições de cada data e tabela_bruta é opcional.
+
+Em memória, as refeições são registros Refeicao (com __slots__) e só viram
+dicionários na serialização (json_padrao / serializar_resultado).
+"""
+
+import json
+import sys
+from collections.abc import Mapping
+from typing import Any, Dict, Iterator, List, Optional
+
+try:
+    import orjson
+except ImportError:  # opcional: sem ele, json da biblioteca padrão
+    orjson = None
+
+FORMATO_COMPACTO = "compacto-v1"
+
+CAMPOS_REFEICAO = ("data", "turno", "codigo", "descricao", "texto_original")
+
+
+class Refeicao(Mapping):
+    """
+    Refeição como registro compacto, lido como o dicionário de antes
+
+    refeicao["data"], .get(), dict(refeicao) e a comparação com dicionários
+    continuam funcionando; data e turno são internados, e descrição/texto
+    vêm da classificação da célula, compartilhados entre os turnos.
+    """
+    __slots__ = CAMPOS_REFEICAO
+
+    def __init__(self, data: str, turno: str, codigo: Optional[str], descricao: str, texto_original: str):
+        self.data = sys.intern(data)
+        self.turno = sys.intern(turno)
+        self.codigo = codigo
+        self.descricao = descricao
+        self.texto_original = texto_original
+
+    def __getitem__(self, campo: str) -> Any:
+        if campo not in CAMPOS_REFEICAO:
+            raise KeyError(campo)
+        return getattr(self, campo)
+
+    def __setitem__(self, campo: str, valor: Any):
+        if campo not in CAMPOS_REFEICAO:
+            raise KeyError(campo)
+        setattr(self, campo, valor)
+
+    def __iter__(self) -> Iterator[str]:
+        return iter(CAMPOS_REFEICAO)
+
+    def __len__(self) -> int:
+        return len(CAMPOS_REFEICAO)
+
+    def __repr__(self) -> str:
+        return f"Refeicao({self.para_dict()!r})"
+
+    def para_dict(self) -> Dict[str, Any]:
+        return {
+            "data": self.data,
+            "turno": self.turno,
+            "codigo": self.codigo,
+            "descricao": self.descricao,
+            "texto_original": self.texto_original,
+        }
+
+
+def json_padrao(objeto: Any) -> Any:
+    """Parâmetro default= do json.dump(s) para resultados com registros Refeicao"""
+    if isinstance(objeto, Refeicao):
+        return objeto.para_dict()
+    raise TypeError(f"Objeto do tipo {type(objeto).__name__} não é serializável em JSON")
+
+
+def serializar_resultado(resultado: Dict[str, Any]) -> bytes:
+    """
+    JSON compacto em UTF-8, serializado uma vez e reaproveitado (arquivo, stdout)
+
+    Usa o orjson quando instalado; a saída equivale à do json com
+    ensure_ascii=False e separadores sem espaço.
+    """
+    if orjson is not None:
+        return orjson.dumps(resultado, default=json_padrao)
+    return json.dumps(resultado, ensure_ascii=False, separators=(",", ":"), default=json_padrao).encode("utf-8")
+
+
+def _internar(valor: Any, tabela: List[Any], indices: Dict[Any, int]) -> int:
+    indice = indices.get(valor)
+    if indice is None:
+        indice = indices[valor] = len(tabela)
+        tabela.append(valor)
+    return indice
+
+
+def compactar_resultado(resultado: Dict[str, Any], incluir_tabela_bruta: bool = False) -> Dict[str, Any]:
+    """
+    Converte o resultado de processar_pdf_completo para o formato compacto
+
+    Args:
+        resultado: Resultado completo (resultados com erro são devolvidos como estão)
+        incluir_tabela_bruta: Mantém tabela_bruta no resultado
+
+    Returns:
+        {"formato", "datas", "turnos", "receitas", "refeicoes": [[data, turno, receita]],
+         "cardapio_por_data": [[refeições da data i]], ...}
+    """
+    if not resultado.get("sucesso"):
+        return resultado
+
+    datas: List[str] = []
+    turnos: List[str] = []
+    receitas: List[List[Any]] = []
+    indices_datas: Dict[str, int] = {}
+    indices_turnos: Dict[str, int] = {}
+    indices_receitas: Dict[tuple, int] = {}
+
+    refeicoes = []
+    for refeicao in resultado["refeicoes"]:
+        receita = (refeicao["codigo"], refeicao["descricao"], refeicao["texto_original"])
+        refeicoes.append([
+            _internar(refeicao["data"], datas, indices_datas),
+            _internar(refeicao["turno"], turnos, indices_turnos),
+            _internar(receita, receitas, indices_receitas),
+        ])
+    receitas = [list(receita) for receita in receitas]
+
+    # As refeições de cada data são as mesmas de 'refeicoes', na mesma ordem
+    indices_por_data: List[List[int]] = [[] for _ in datas]
+    for i, (indice_data, _, _) in enumerate(refeicoes):
+        indices_por_data[indice_data].append(i)
+
+    compacto = {
+        "formato": FORMATO_COMPACTO,
+        "sucesso": True,
+        "total_refeicoes": resultado["total_refeicoes"],
+        "total_dias": resultado["total_dias"],
+        "datas": datas,
+        "turnos": turnos,
+        "receitas": receitas,
+        "refeicoes": refeicoes,
+        "cardapio_por_data": indices_por_data,
+        "metadados": resultado["metadados"],
+    }
+    if incluir_tabela_bruta:
+        compacto["tabela_bruta"] = resultado["tabela_bruta"]
+    if "texto_paginas" in resultado:
+        compacto["texto_paginas"] = resultado["texto_paginas"]
+    return compacto
+
+
+def expandir_resultado_compacto(compacto: Dict[str, Any]) -> Dict[str, Any]:
+    """
+    Reconstrói o formato completo (refeicoes e cardapio_por_data como dicionários)
+
+    Sem tabela_bruta no compacto, o resultado expandido também não a terá.
+    """
+    if compacto.get("formato") != FORMATO_COMPACTO:
+        return compacto
+
+    datas, turnos, receitas = compacto["datas"], compacto["turnos"], compacto["receitas"]
+    refeicoes = []
+    for indice_data, indice_turno, indice_receita in compacto["refeicoes"]:
+        codigo, descricao, texto_original = receitas[indice_receita]
+        refeicoes.append({
+            "data": datas[indice_data],
+            "turno": turnos[indice_turno],
+            "codigo": codigo,
+            "descricao": descricao,
+            "texto_original": texto_original,
+        })
+
+    resultado = {
+        "sucesso": compacto["sucesso"],
+        "total_refeicoes": compacto["total_refeicoes"],
+        "total_dias": compacto["total_dias"],
+        "refeicoes": refeicoes,
+        "cardapio_por_data": {
+            data: [refeicoes[i] for i in indices]
+            for data, indices in zip(datas, compacto["cardapio_por_data"])
+        },
+    }
+    if "tabela_bruta" in compacto:
+        resultado["tabela_bruta"] = compacto["tabela_bruta"]
+    if "texto_paginas" in compacto:
+        resultado["texto_paginas"] = compacto["texto_paginas"]
+    resultado["metadados"] = compacto["metadados"]
+    return resultado
@@ -0,0 +1,228 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Índice de códigos de receita dos cardápios processados
+Banco SQLite local, atualizado a cada cardápio: código → (arquivo, data,
+turno) e data → códigos, sem reler os JSONs gravados em downloads_dir.
+
+Uso:
+    python indice_receitas.py --codigo LL25.228
+    python indice_receitas.py --data 13/10/2025
+    python indice_receitas.py --reindexar /caminho/dos/jsons
+"""
+
+import argparse
+import glob
+import gzip
+import hashlib
+import json
+import os
+import sqlite3
+import sys
+import time
+from datetime import datetime
+from typing import Any, Dict, Iterable, List, Mapping, Optional
+
+from formato_resultado import expandir_resultado_compacto
+
+ESQUEMA = """
+CREATE TABLE IF NOT EXISTS documentos (
+    id INTEGER PRIMARY KEY,
+    chave TEXT NOT NULL UNIQUE,
+    arquivo TEXT NOT NULL,
+    data_processamento TEXT NOT NULL
+);
+CREATE TABLE IF NOT EXISTS ocorrencias (
+    documento_id INTEGER NOT NULL REFERENCES documentos(id) ON DELETE CASCADE,
+    codigo TEXT NOT NULL,
+    descricao TEXT,
+    data TEXT NOT NULL,
+    data_iso TEXT,
+    turno TEXT NOT NULL
+);
+CREATE INDEX IF NOT EXISTS ocorrencias_codigo ON ocorrencias (codigo);
+CREATE INDEX IF NOT EXISTS ocorrencias_data ON ocorrencias (data_iso);
+CREATE INDEX IF NOT EXISTS ocorrencias_documento ON ocorrencias (documento_id);
+"""
+
+
+def data_iso(data: str) -> Optional[str]:
+    """dd/mm/aaaa (ou aaaa-mm-dd) → aaaa-mm-dd; None se não for data"""
+    for formato in ("%d/%m/%Y", "%Y-%m-%d"):
+        try:
+            return datetime.strptime(data.strip(), formato).strftime("%Y-%m-%d")
+        except ValueError:
+            continue
+    return None
+
+
+class IndiceReceitas:
+    """Índice em SQLite; cada operação abre a própria conexão (seguro entre threads e processos)"""
+
+    def __init__(self, caminho: str):
+        self.caminho = caminho
+        os.makedirs(os.path.dirname(os.path.abspath(caminho)), exist_ok=True)
+        conexao = self._conectar()
+        try:
+            conexao.execute("PRAGMA journal_mode=WAL")
+            conexao.executescript(ESQUEMA)
+        finally:
+            conexao.close()
+
+    def _conectar(self) -> sqlite3.Connection:
+        conexao = sqlite3.connect(self.caminho, timeout=30)
+        conexao.row_factory = sqlite3.Row
+        conexao.execute("PRAGMA foreign_keys=ON")
+        # Índice derivado (reconstruível com --reindexar): com WAL, NORMAL evita um fsync por gravação
+        conexao.execute("PRAGMA synchronous=NORMAL")
+        return conexao
+
+    def registrar(self, chave: str, arquivo: str, refeicoes: Iterable[Mapping[str, Any]],
+                  data_processamento: Optional[str] = None):
+        """
+        Indexa as refeições de um cardápio, substituindo o registro anterior da mesma chave
+
+        Args:
+            chave: Identificador do conteúdo (ex: sha256 do PDF)
+            arquivo: Nome do arquivo processado
+            refeicoes: Refeições do resultado; só as que têm código entram no índice
+            data_processamento: Padrão: agora
+        """
+        ocorrencias = {}
+        for refeicao in refeicoes:
+            codigo = refeicao.get("codigo")
+            if not codigo:
+                continue
+            chave_ocorrencia = (codigo, refeicao["data"], refeicao["turno"])
+            ocorrencias.setdefault(chave_ocorrencia, refeicao.get("descricao"))
+
+        datas_iso = {data: data_iso(data) for data in {data for _, data, _ in ocorrencias}}
+        conexao = self._conectar()
+        try:
+            with conexao:
+                conexao.execute(
+                    "INSERT INTO documentos (chave, arquivo, data_processamento) VALUES (?, ?, ?) "
+                    "ON CONFLICT(chave) DO UPDATE SET arquivo = excluded.arquivo, "
+                    "data_processamento = excluded.data_processamento",
+                    (chave, arquivo, data_processamento or datetime.now().isoformat()))
+                documento_id = conexao.execute("SELECT id FROM documentos WHERE chave = ?", (chave,)).fetchone()[0]
+                conexao.execute("DELETE FROM ocorrencias WHERE documento_id = ?", (documento_id,))
+                conexao.executemany(
+                    "INSERT INTO ocorrencias (documento_id, codigo, descricao, data, data_iso, turno) "
+                    "VALUES (?, ?, ?, ?, ?, ?)",
+                    [(documento_id, codigo, descricao, data, datas_iso[data], turno)
+                     for (codigo, data, turno), descricao in ocorrencias.items()])
+        finally:
+            conexao.close()
+
+    def consultar(self, codigo: Optional[str] = None, data: Optional[str] = None,
+                  limite: int = 1000) -> List[Dict[str, Any]]:
+        """
+        Ocorrências por código de receita e/ou data (dd/mm/aaaa ou aaaa-mm-dd)
+
+        Returns:
+            [{"codigo", "descricao", "arquivo", "data", "turno"}], em ordem de data
+        """
+        condicoes, parametros = [], []
+        if codigo:
+            condicoes.append("o.codigo = ?")
+            parametros.append(codigo.strip().upper())
+        if data:
+            iso = data_iso(data)
+            condicoes.append("o.data_iso = ?" if iso else "o.data = ?")
+            parametros.append(iso or data.strip())
+        if not condicoes:
+            raise ValueError("Informe o código da receita ou a data")
+
+        conexao = self._conectar()
+        try:
+            linhas = conexao.execute(
+                "SELECT o.codigo, o.descricao, d.arquivo, o.data, o.turno "
+                "FROM ocorrencias o JOIN documentos d ON d.id = o.documento_id "
+                f"WHERE {' AND '.join(condicoes)} "
+                "ORDER BY o.data_iso, d.arquivo, o.turno, o.codigo LIMIT ?",
+                parametros + [limite]).fetchall()
+        finally:
+            conexao.close()
+        return [dict(linha) for linha in linhas]
+
+    def estatisticas(self) -> Dict[str, int]:
+        conexao = self._conectar()
+        try:
+            documentos = conexao.execute("SELECT COUNT(*) FROM documentos").fetchone()[0]
+            ocorrencias, codigos = conexao.execute(
+                "SELECT COUNT(*), COUNT(DISTINCT codigo) FROM ocorrencias").fetchone()
+        finally:
+            conexao.close()
+        return {"documentos": documentos, "ocorrencias": ocorrencias, "codigos": codigos}
+
+    def reindexar_jsons(self, diretorio: str) -> int:
+        """Indexa os resultados já gravados em disco (cardapio-pdfplumber-*.json[.gz]); devolve quantos"""
+        total = 0
+        caminhos = (glob.glob(os.path.join(diretorio, "cardapio-pdfplumber-*.json"))
+                    + glob.glob(os.path.join(diretorio, "cardapio-pdfplumber-*.json.gz")))
+        for caminho in sorted(caminhos):
+            abrir = gzip.open if caminho.endswith(".gz") else open
+            try:
+                with abrir(caminho, "rt", encoding="utf-8") as f:
+                    # A cópia guarda o que foi impresso: pode estar no formato compacto
+                    resultado = expandir_resultado_compacto(json.load(f))
+            except (OSError, ValueError) as e:
+                print(f"⚠️ Ignorando {caminho}: {str(e)}", file=sys.stderr)
+                continue
+            metadados = resultado.get("metadados", {})
+            arquivo = metadados.get("arquivo_original") or os.path.basename(caminho)
+            refeicoes = resultado.get("refeicoes", [])
+            # Mesma chave da indexação ao vivo (sha256 do PDF); cópias antigas, sem ela, usam o
+            # hash das refeições e são ignoradas se o arquivo já estiver indexado por outra chave
+            chave = metadados.get("sha256_pdf")
+            if not chave:
+                chave = "refeicoes:" + hashlib.sha256(json.dumps(
+                    refeicoes, ensure_ascii=False, sort_keys=True, separators=(",", ":")).encode("utf-8")).hexdigest()
+                if self._arquivo_indexado(arquivo, chave):
+                    continue
+            self.registrar(chave, arquivo, refeicoes, metadados.get("data_processamento"))
+            total += 1
+        return total
+
+    def _arquivo_indexado(self, arquivo: str, exceto_chave: str) -> bool:
+        conexao = self._conectar()
+        try:
+            return conexao.execute("SELECT 1 FROM documentos WHERE arquivo = ? AND chave != ? LIMIT 1",
+                                   (arquivo, exceto_chave)).fetchone() is not None
+        finally:
+            conexao.close()
+
+
+def indice_receitas_ativo() -> bool:
+    """PDF_INDICE_RECEITAS=false desativa o índice"""
+    return os.environ.get("PDF_INDICE_RECEITAS", "true").lower() != "false"
+
+
+def caminho_indice_padrao() -> str:
+    """Arquivo SQLite do índice (PDF_INDICE_RECEITAS_ARQUIVO)"""
+    diretorio_padrao = os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "storage", "indice_receitas")
+    return os.environ.get("PDF_INDICE_RECEITAS_ARQUIVO", os.path.join(diretorio_padrao, "indice.sqlite3"))
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Consulta o índice de códigos de receita dos cardápios processados")
+    parser.add_argument("--codigo", help="Código da receita (ex: LL25.228)")
+    parser.add_argument("--data", help="Data do cardápio (dd/mm/aaaa)")
+    parser.add_argument("--limite", type=int, default=1000)
+    parser.add_argument("--reindexar", metavar="DIR_JSONS", help="Indexa os JSONs já gravados no diretório")
+    parser.add_argument("--indice", default=None, help="Arquivo SQLite (padrão: PDF_INDICE_RECEITAS_ARQUIVO)")
+    args = parser.parse_args()
+
+    if not args.indice and not indice_receitas_ativo():
+        parser.error("Índice de receitas desativado (PDF_INDICE_RECEITAS=false)")
+    indice = IndiceReceitas(args.indice or caminho_indice_padrao())
+    if args.reindexar:
+        print(f"✅ {indice.reindexar_jsons(args.reindexar)} cardápio(s) indexado(s)", file=sys.stderr)
+    if args.codigo or args.data:
+        inicio = time.perf_counter()
+        ocorrencias = indice.consultar(args.codigo, args.data, args.limite)
+        print(json.dumps({"ocorrencias": ocorrencias, "total": len(ocorrencias),
+                          "tempo_ms": round((time.perf_counter() - inicio) * 1000, 3)}, ensure_ascii=False))
+    elif not args.reindexar:
+        print(json.dumps(indice.estatisticas(), ensure_ascii=False))
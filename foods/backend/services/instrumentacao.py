@@ -0,0 +1,173 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Instrumentação opcional do processamento de cardápios
+Registra tempo de parede, tempo de CPU e pico de memória (tracemalloc) por
+etapa e por página; MonitorMemoria acompanha a memória residente do
+processo e aplica o limite configurado
+"""
+
+import contextlib
+import os
+import sys
+import time
+import tracemalloc
+from typing import Dict, Any, Iterator, List, Optional
+
+try:
+    import resource
+except ImportError:  # Windows
+    resource = None
+
+
+class _Medicao:
+    __slots__ = ("inicio_parede", "inicio_cpu", "pico_bytes")
+
+    def __init__(self):
+        self.inicio_parede = time.perf_counter()
+        self.inicio_cpu = time.process_time()
+        self.pico_bytes = 0
+
+
+class Instrumentacao:
+    """
+    Coleta métricas de etapas aninhadas; desativada, as etapas não custam nada
+
+    Com memoria=False mede só os tempos, sem ligar o tracemalloc.
+    """
+
+    def __init__(self, ativa: bool = True, memoria: bool = True):
+        self.ativa = ativa
+        self.memoria = ativa and memoria
+        self.etapas: Dict[str, Dict[str, float]] = {}
+        self.paginas: Dict[int, Dict[str, Dict[str, float]]] = {}
+        self.anotacoes: Dict[str, Any] = {}
+        self._pilha: List[_Medicao] = []
+        self._iniciou_tracemalloc = False
+        if self.memoria and not tracemalloc.is_tracing():
+            tracemalloc.start()
+            self._iniciou_tracemalloc = True
+
+    @contextlib.contextmanager
+    def etapa(self, nome: str, pagina: Optional[int] = None) -> Iterator[None]:
+        """
+        Mede o bloco como etapa global ou da página informada
+
+        Etapas repetidas (ex: uma por página) são acumuladas; o pico de memória
+        fica com o maior valor observado.
+        """
+        if not self.ativa:
+            yield
+            return
+
+        if self.memoria:
+            # O pico até aqui pertence à etapa externa antes de ser zerado para esta
+            if self._pilha:
+                self._pilha[-1].pico_bytes = max(self._pilha[-1].pico_bytes, tracemalloc.get_traced_memory()[1])
+            tracemalloc.reset_peak()
+        medicao = _Medicao()
+        self._pilha.append(medicao)
+        try:
+            yield
+        finally:
+            self._pilha.pop()
+            if self.memoria:
+                medicao.pico_bytes = max(medicao.pico_bytes, tracemalloc.get_traced_memory()[1])
+                if self._pilha:
+                    self._pilha[-1].pico_bytes = max(self._pilha[-1].pico_bytes, medicao.pico_bytes)
+
+            destino = self.etapas if pagina is None else self.paginas.setdefault(pagina, {})
+            acumulado = destino.setdefault(nome, {"parede_ms": 0.0, "cpu_ms": 0.0})
+            acumulado["parede_ms"] += (time.perf_counter() - medicao.inicio_parede) * 1000
+            acumulado["cpu_ms"] += (time.process_time() - medicao.inicio_cpu) * 1000
+            if self.memoria:
+                acumulado["pico_memoria_kb"] = max(acumulado.get("pico_memoria_kb", 0.0), medicao.pico_bytes / 1024)
+
+    def anotar(self, chave: str, valor: Any):
+        """Acrescenta uma informação ao resumo (ex: estatísticas de uma etapa)"""
+        if self.ativa:
+            self.anotacoes[chave] = valor
+
+    def resumo(self) -> Dict[str, Any]:
+        """Métricas no formato gravado em metadados['instrumentacao']"""
+        def arredondar(metricas):
+            return {nome: {k: round(v, 3) for k, v in valores.items()} for nome, valores in metricas.items()}
+
+        resumo = {
+            "etapas": arredondar(self.etapas),
+            "paginas": [{"pagina": pagina, **arredondar(etapas)} for pagina, etapas in sorted(self.paginas.items())],
+            **self.anotacoes,
+        }
+        if resource is not None:
+            # ru_maxrss em KB no Linux: pico de memória residente do processo inteiro
+            resumo["pico_rss_kb"] = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+        return resumo
+
+    def encerrar(self):
+        """Para o tracemalloc se foi esta instância que o iniciou"""
+        if self._iniciou_tracemalloc:
+            tracemalloc.stop()
+            self._iniciou_tracemalloc = False
+
+
+# Instância inerte usada quando a instrumentação não foi pedida
+SEM_INSTRUMENTACAO = Instrumentacao(ativa=False)
+
+
+def rss_atual_kb() -> Optional[int]:
+    """
+    Memória residente atual do processo em KB (/proc/self/statm)
+
+    Fora do Linux usa o pico do processo (ru_maxrss), que nunca diminui.
+    """
+    try:
+        with open("/proc/self/statm", "rb") as f:
+            return int(f.read().split()[1]) * os.sysconf("SC_PAGE_SIZE") // 1024
+    except (OSError, ValueError, IndexError):
+        pass
+    if resource is not None:
+        pico = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+        # ru_maxrss vem em bytes no macOS
+        return pico // 1024 if sys.platform == "darwin" else pico
+    return None
+
+
+class MonitorMemoria:
+    """
+    Amostra a memória residente ao fim de cada página
+
+    Com limite_kb, a primeira amostra acima do limite marca o monitor como
+    excedido; quem extrai as páginas para ali e devolve o resultado parcial.
+    """
+
+    def __init__(self, limite_kb: Optional[int] = None):
+        self.limite_kb = limite_kb or None
+        self.rss_inicial_kb = rss_atual_kb()
+        self.pico_rss_kb = self.rss_inicial_kb
+        self.excedido = False
+        self.paginas_processadas = 0
+        self.paginas_total: Optional[int] = None
+
+    def amostrar(self) -> bool:
+        """Registra uma amostra; devolve False se o limite foi ultrapassado"""
+        rss = rss_atual_kb()
+        if rss is None:
+            return True
+        self.pico_rss_kb = max(self.pico_rss_kb or 0, rss)
+        if self.limite_kb is not None and rss > self.limite_kb:
+            self.excedido = True
+        return not self.excedido
+
+    def resumo(self) -> Dict[str, Any]:
+        """Gravado em metadados['memoria']"""
+        resumo = {
+            "rss_inicial_kb": self.rss_inicial_kb,
+            "pico_rss_kb": self.pico_rss_kb,
+            "limite_kb": self.limite_kb,
+        }
+        if resource is not None:
+            resumo["pico_rss_processo_kb"] = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+        if self.excedido:
+            resumo["paginas_processadas"] = self.paginas_processadas
+            resumo["paginas_total"] = self.paginas_total
+        return resumo
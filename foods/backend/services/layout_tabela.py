@@ -0,0 +1,148 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Aprendizado do layout da tabela de cardápio
+Na primeira página detecta a região da tabela e as linhas verticais das
+colunas (a impressão digital do layout); nas páginas seguintes com a mesma
+impressão, a extração considera só os objetos dentro da região (as
+configurações do extract_tables são as padrão; o ganho vem de não analisar
+cabeçalhos, rodapés e demais objetos fora da tabela). Qualquer divergência
+volta para a extração da página inteira.
+"""
+
+from typing import Any, Dict, List, NamedTuple, Optional, Tuple
+
+# Distância máxima (pt) entre a borda de uma coluna e a do layout aprendido
+TOLERANCIA_COLUNA = 1.0
+# Folga (pt) em volta da região da tabela
+MARGEM_REGIAO = 2.0
+
+
+class LayoutTabela(NamedTuple):
+    """Impressão digital do layout: tamanho da página e posição das bordas das colunas"""
+    largura: float
+    altura: float
+    colunas: Tuple[float, ...]
+
+
+def _bordas_verticais(page) -> List[Dict[str, Any]]:
+    return [e for e in page.edges if e["orientation"] == "v"]
+
+
+def _proxima_coluna(x: float, colunas: Tuple[float, ...]) -> Optional[int]:
+    for i, coluna in enumerate(colunas):
+        if abs(x - coluna) <= TOLERANCIA_COLUNA:
+            return i
+    return None
+
+
+def aprender_layout(page, tabela) -> Optional[LayoutTabela]:
+    """
+    Monta a impressão digital a partir da tabela (pdfplumber.table.Table) da página
+
+    Returns:
+        LayoutTabela, ou None se a tabela não for delimitada por linhas verticais
+    """
+    colunas = tuple(sorted({round(x, 1) for celula in tabela.cells for x in (celula[0], celula[2])}))
+    if len(colunas) < 2:
+        return None
+    layout = LayoutTabela(round(float(page.width), 1), round(float(page.height), 1), colunas)
+    return layout if regiao_da_tabela(page, layout) else None
+
+
+def regiao_da_tabela(page, layout: LayoutTabela) -> Optional[Tuple[float, float, float, float]]:
+    """
+    Confere se a página tem o layout aprendido e devolve a região da tabela
+
+    A altura da tabela varia de página para página; a região vai do topo à base
+    das bordas verticais encontradas sobre as colunas do layout.
+
+    Returns:
+        (x0, top, x1, bottom) com folga, ou None se a página não corresponde ao layout
+    """
+    if (round(float(page.width), 1), round(float(page.height), 1)) != (layout.largura, layout.altura):
+        return None
+
+    x0, x1 = layout.colunas[0], layout.colunas[-1]
+    encontradas = [None] * len(layout.colunas)
+    sem_coluna = []
+    for borda in _bordas_verticais(page):
+        i = _proxima_coluna(borda["x0"], layout.colunas)
+        if i is None:
+            sem_coluna.append(borda)
+            continue
+        topo, base = encontradas[i] or (borda["top"], borda["bottom"])
+        encontradas[i] = (min(topo, borda["top"]), max(base, borda["bottom"]))
+
+    if any(extensao is None for extensao in encontradas):
+        return None
+
+    topo = min(extensao[0] for extensao in encontradas)
+    base = max(extensao[1] for extensao in encontradas)
+
+    # Borda vertical extra dentro da região = outra divisão de colunas
+    for borda in sem_coluna:
+        if x0 < borda["x0"] < x1 and borda["bottom"] > topo and borda["top"] < base:
+            return None
+
+    return (x0 - MARGEM_REGIAO, topo - MARGEM_REGIAO, x1 + MARGEM_REGIAO, base + MARGEM_REGIAO)
+
+
+def _dentro(regiao: Tuple[float, float, float, float]):
+    x0, topo, x1, base = regiao
+
+    def teste(objeto: Dict[str, Any]) -> bool:
+        return objeto["x0"] >= x0 and objeto["x1"] <= x1 and objeto["top"] >= topo and objeto["bottom"] <= base
+
+    return teste
+
+
+class ExtratorTabelas:
+    """
+    Extrai as tabelas de páginas sucessivas do mesmo PDF
+
+    Com aprender=True, a primeira página com tabela define o layout; ele só é
+    adotado se a extração restrita à região reproduzir a extração completa.
+    """
+
+    def __init__(self, aprender: bool = False):
+        self.aprender = aprender
+        self.layout: Optional[LayoutTabela] = None
+        self._aprendeu = False
+        self.paginas_na_regiao = 0
+        self.paginas_completas = 0
+
+    def extrair(self, page) -> List[List[List[Optional[str]]]]:
+        """Equivalente a page.extract_tables(), restrito à região da tabela quando possível"""
+        if self.layout is not None:
+            regiao = regiao_da_tabela(page, self.layout)
+            if regiao is not None:
+                tabelas = page.filter(_dentro(regiao)).extract_tables()
+                # A primeira tabela precisa ter as colunas do layout; senão extração completa
+                if tabelas and len(tabelas[0][0]) == len(self.layout.colunas) - 1:
+                    self.paginas_na_regiao += 1
+                    return tabelas
+
+        self.paginas_completas += 1
+        if not self.aprender or self._aprendeu:
+            return page.extract_tables()
+
+        tabelas_encontradas = page.find_tables()
+        tabelas = [tabela.extract() for tabela in tabelas_encontradas]
+        if tabelas_encontradas:
+            self._aprendeu = True
+            layout = aprender_layout(page, tabelas_encontradas[0])
+            if layout is not None:
+                regiao = regiao_da_tabela(page, layout)
+                restritas = page.filter(_dentro(regiao)).extract_tables()
+                if restritas and restritas[0] == tabelas[0]:
+                    self.layout = layout
+        return tabelas
+
+    def estatisticas(self) -> Dict[str, Any]:
+        """Páginas extraídas na região aprendida e com a página inteira"""
+        return {
+            "layout": list(self.layout.colunas) if self.layout else None,
+            "paginas_na_regiao": self.paginas_na_regiao,
+            "paginas_completas": self.paginas_completas,
+        }
@@ -0,0 +1,75 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Memoização das funções puras de texto (turnos, código e descrição das
+células do processador; limpeza, datas e itens no teste_cardapio): os mesmos
+textos se repetem em todas as semanas e turnos e entre documentos. Cada
+função tem um LRU limitado (PDF_MEMO_TAMANHO entradas, 0 desativa), com
+acertos e erros em estatisticas().
+
+O cache guarda só valores imutáveis: `congelar` converte o resultado antes
+de guardar e `copiar` devolve a quem chamou uma cópia nova (listas,
+dicionários), então ninguém altera o que está em cache.
+"""
+
+import functools
+import os
+from typing import Any, Callable, Dict, Optional
+
+TAMANHO_PADRAO = int(os.environ.get("PDF_MEMO_TAMANHO", "8192"))
+
+_funcoes: Dict[str, Any] = {}
+
+
+def memoizar(maximo: Optional[int] = None, congelar: Optional[Callable[[Any], Any]] = None,
+             copiar: Optional[Callable[[Any], Any]] = None) -> Callable[[Callable], Callable]:
+    """
+    Decorador: LRU de `maximo` entradas (padrão TAMANHO_PADRAO) registrado em estatisticas()
+
+    Sem `congelar`, a função decorada deve devolver valores imutáveis.
+    Argumentos não hasheáveis chamam a função direto, sem cache.
+    """
+    def decorador(funcao: Callable) -> Callable:
+        tamanho = TAMANHO_PADRAO if maximo is None else maximo
+        if not tamanho:
+            return funcao
+
+        @functools.lru_cache(maxsize=tamanho, typed=True)
+        def memoizada(*args):
+            resultado = funcao(*args)
+            return congelar(resultado) if congelar else resultado
+
+        @functools.wraps(funcao)
+        def chamar(*args):
+            try:
+                resultado = memoizada(*args)
+            except TypeError:  # argumento não hasheável
+                return funcao(*args)
+            return copiar(resultado) if copiar else resultado
+
+        chamar.cache_info = memoizada.cache_info
+        chamar.cache_clear = memoizada.cache_clear
+        _funcoes[funcao.__name__] = memoizada
+        return chamar
+    return decorador
+
+
+def estatisticas() -> Dict[str, Dict[str, Any]]:
+    """{função: {"acertos", "erros", "entradas", "maximo", "taxa_acerto"}}"""
+    resultado = {}
+    for nome, funcao in _funcoes.items():
+        info = funcao.cache_info()
+        chamadas = info.hits + info.misses
+        resultado[nome] = {
+            "acertos": info.hits,
+            "erros": info.misses,
+            "entradas": info.currsize,
+            "maximo": info.maxsize,
+            "taxa_acerto": round(info.hits / chamadas, 4) if chamadas else None,
+        }
+    return resultado
+
+
+def limpar():
+    for funcao in _funcoes.values():
+        funcao.cache_clear()
@@ -6,17 +6,345 @@ Usa pdfplumber para extrair tabelas de forma estruturada
 """
 
 import pdfplumber
+import contextlib
+import glob
+import hashlib
+import io
 import re
 import json
 import os
+import sys
+import time
+from collections import defaultdict
+from concurrent.futures import ProcessPoolExecutor, as_completed
 from datetime import datetime
-from typing import List, Dict, Any, Optional
+from itertools import chain
+from typing import List, Dict, Any, BinaryIO, Iterable, Iterator, NamedTuple, Optional, Sequence, Tuple, Union
+
+from cache_resultados import CacheResultados
+from indice_receitas import IndiceReceitas, caminho_indice_padrao, indice_receitas_ativo
+from formato_resultado import Refeicao, compactar_resultado, json_padrao, serializar_resultado
+from instrumentacao import Instrumentacao, MonitorMemoria, SEM_INSTRUMENTACAO
+from layout_tabela import ExtratorTabelas
+from memoizacao import memoizar
+from persistencia_resultados import GravadorResultados
+from revisoes import HistoricoVersoes, hash_pagina
+from triagem_paginas import motivo_para_ignorar
+
+# Incrementar sempre que a saída do processamento mudar (invalida o cache de resultados)
+VERSAO_PROCESSADOR = "2"
+
+# Regex compiladas uma única vez por processo (reaproveitadas pelo modo servidor)
+REGEX_DATA = re.compile(r'(\d{1,2}/\d{1,2}/\d{4})')
+REGEX_CODIGO_RECEITA = re.compile(r'([A-Z]{1,2}\d{2}\.\d{2,3})\s*(.*)')
+REGEX_DIA_SEMANA_DATA = re.compile(r'^[A-Za-z]+\s*[–-]\s*feira\s+\d{1,2}/\d{1,2}/\d{4}$')
+REGEX_ESPACOS = re.compile(r'\s+')
+
+# Acima disso o cache de classificação é esvaziado (worker persistente atende muitos PDFs)
+LIMITE_CLASSIFICACOES = 50000
+
+
+class ClassificacaoCelula(NamedTuple):
+    """Resultado da classificação de uma célula, calculado uma vez por texto"""
+    texto: str                # Texto com quebras de linha trocadas por espaço
+    data: Optional[str]       # Primeira data dd/mm/aaaa encontrada
+    codigo: Optional[str]     # Código de receita (ex: LL25.228)
+    descricao: str            # Descrição após o código (ou texto inteiro)
+    refeicao: bool            # Tem código ou descrição válida de refeição
+    cabecalho: bool           # 'TURNOS' ou dia da semana com data
+    ruido: bool               # Célula vazia ou só com espaços
+
+
+# Mesmos textos em todas as semanas, turnos e PDFs: LRU compartilhado pelo processo (memoizacao.py)
+@memoizar()
+def _turnos_validos(turno_bruto: str) -> Tuple[str, ...]:
+    """Turnos reconhecidos nas linhas da célula (tupla: o valor em cache não pode ser alterado)"""
+    turnos_validos = []
+    for turno in (t.strip() for t in turno_bruto.split('\n')):
+        if not turno:
+            continue
+        # Ignorar cabeçalhos e strings inválidas
+        if any(palavra in turno.lower() for palavra in [
+            'semana', 'pág', 'documento', 'secretaria', 'turnos', 'cardápio', 'parcial'
+        ]):
+            continue
+        
+        # Ignorar strings muito curtas ou que parecem datas
+        if len(turno) <= 2 or REGEX_DATA.match(turno):
+            continue
+        
+        # Verificar se é um turno válido
+        if any(turno_valido in turno.lower() for turno_valido in [
+            'matutino', 'vespertino', 'noturno', 'manhã', 'tarde', 'noite'
+        ]):
+            turnos_validos.append(turno)
+    return tuple(turnos_validos)
+
+
+@memoizar()
+def _codigo_descricao(texto_refeicao: str) -> Tuple[Optional[str], str]:
+    """(codigo, descricao) de uma string de refeição; ver PDFCardapioProcessor._extrair_codigo_descricao"""
+    if not texto_refeicao or not texto_refeicao.strip():
+        return None, ""
+    
+    # Limpar o texto
+    texto_limpo = texto_refeicao.strip()
+    
+    # Regex para códigos de receita (ex: LL25.228, R25.375, LL24.22)
+    match = REGEX_CODIGO_RECEITA.search(texto_limpo)
+    
+    if match:
+        # Limpar descrição de quebras de linha e espaços extras
+        return match.group(1), REGEX_ESPACOS.sub(' ', match.group(2).strip())
+    
+    # Se não encontrar código, verificar se é apenas uma data
+    if REGEX_DIA_SEMANA_DATA.match(texto_limpo):
+        return None, ""
+    
+    # Se não encontrar código, usar o texto inteiro como descrição
+    return None, texto_limpo
+
+
+_cache_padrao: Optional[CacheResultados] = None
+_cache_paginas: Optional[CacheResultados] = None
+_historico_versoes: Optional[HistoricoVersoes] = None
+_indice_receitas: Optional[IndiceReceitas] = None
+_gravadores_resultados: Dict[str, GravadorResultados] = {}
+
+def _diretorio_cache() -> str:
+    diretorio_padrao = os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "storage", "cache_cardapios")
+    return os.environ.get("PDF_CACHE_DIR", diretorio_padrao)
+
+def _orcamento_disco_cache() -> Tuple[int, int]:
+    """
+    Bytes em disco do cache de resultados e do cache de páginas: PDF_CACHE_MAX_MB é o total
+    dos dois, e PDF_CACHE_PAGINAS_FRACAO (padrão 0.25) dele fica com as páginas
+    """
+    total = int(os.environ.get("PDF_CACHE_MAX_MB", "512")) * 1024 * 1024
+    if not _revisoes_ativas():
+        return total, 0
+    paginas = int(total * float(os.environ.get("PDF_CACHE_PAGINAS_FRACAO", "0.25")))
+    return total - paginas, paginas
+
+def obter_cache_padrao() -> Optional[CacheResultados]:
+    """
+    Cache de resultados compartilhado pelo processo, configurado por variáveis de ambiente
+    (PDF_CACHE=false desativa; PDF_CACHE_DIR, PDF_CACHE_MAX_MB, PDF_CACHE_MAX_DIAS, PDF_CACHE_ITENS_MEMORIA)
+    """
+    global _cache_padrao
+    if os.environ.get("PDF_CACHE", "true").lower() == "false":
+        return None
+    if _cache_padrao is None:
+        _cache_padrao = CacheResultados(
+            diretorio=_diretorio_cache(),
+            max_itens_memoria=int(os.environ.get("PDF_CACHE_ITENS_MEMORIA", "32")),
+            max_bytes_disco=_orcamento_disco_cache()[0],
+            max_idade_segundos=int(os.environ.get("PDF_CACHE_MAX_DIAS", "30")) * 24 * 3600
+        )
+    return _cache_padrao
+
+def _revisoes_ativas() -> bool:
+    return (os.environ.get("PDF_CACHE", "true").lower() != "false"
+            and os.environ.get("PDF_CACHE_PAGINAS", "true").lower() != "false")
+
+def obter_cache_paginas() -> Optional[CacheResultados]:
+    """
+    Tabelas extraídas por página, chaveadas pelo hash do conteúdo da página, para
+    que revisões de um PDF só extraiam as páginas alteradas
+    (PDF_CACHE=false ou PDF_CACHE_PAGINAS=false desativa; fica em PDF_CACHE_DIR/paginas, com
+    PDF_CACHE_PAGINAS_FRACAO do PDF_CACHE_MAX_MB)
+    """
+    global _cache_paginas
+    if not _revisoes_ativas():
+        return None
+    if _cache_paginas is None:
+        _cache_paginas = CacheResultados(
+            diretorio=os.path.join(_diretorio_cache(), "paginas"),
+            max_itens_memoria=int(os.environ.get("PDF_CACHE_PAGINAS_MEMORIA", "256")),
+            max_bytes_disco=_orcamento_disco_cache()[1],
+            max_idade_segundos=int(os.environ.get("PDF_CACHE_MAX_DIAS", "30")) * 24 * 3600
+        )
+    return _cache_paginas
+
+def obter_historico_versoes() -> Optional[HistoricoVersoes]:
+    """Histórico de documentos processados, usado para listar o que mudou numa revisão"""
+    global _historico_versoes
+    if not _revisoes_ativas():
+        return None
+    if _historico_versoes is None:
+        _historico_versoes = HistoricoVersoes(os.path.join(_diretorio_cache(), "revisoes", "historico.json"))
+    return _historico_versoes
+
+def obter_indice_receitas() -> Optional[IndiceReceitas]:
+    """
+    Índice SQLite de códigos de receita, atualizado a cada cardápio processado
+    (PDF_INDICE_RECEITAS=false desativa; PDF_INDICE_RECEITAS_ARQUIVO indica outro arquivo)
+    """
+    global _indice_receitas
+    if not indice_receitas_ativo():
+        return None
+    if _indice_receitas is None:
+        _indice_receitas = IndiceReceitas(caminho_indice_padrao())
+    return _indice_receitas
+
+def obter_gravador_resultados(diretorio: str) -> GravadorResultados:
+    """
+    Gravador em segundo plano das cópias dos resultados (um por diretório); retenção por
+    PDF_RESULTADOS_MAX_ARQUIVOS, PDF_RESULTADOS_MAX_DIAS e PDF_RESULTADOS_MAX_MB (0 = sem limite)
+    """
+    if diretorio not in _gravadores_resultados:
+        _gravadores_resultados[diretorio] = GravadorResultados(
+            diretorio,
+            max_arquivos=int(os.environ.get("PDF_RESULTADOS_MAX_ARQUIVOS", "500")),
+            max_idade_segundos=int(os.environ.get("PDF_RESULTADOS_MAX_DIAS", "30")) * 24 * 3600,
+            max_bytes=int(os.environ.get("PDF_RESULTADOS_MAX_MB", "512")) * 1024 * 1024
+        )
+    return _gravadores_resultados[diretorio]
+
+# PDF de entrada: caminho, conteúdo em memória ou arquivo binário (BytesIO, upload, stdin)
+FontePDF = Union[str, bytes, bytearray, memoryview, BinaryIO]
+
+
+def carregar_fonte_pdf(fonte: FontePDF) -> Union[str, bytes]:
+    """
+    Normaliza a entrada para caminho ou bytes, lendo streams uma única vez
+
+    Bytes chegam ao pdfplumber via BytesIO sem cópia; streams não posicionáveis
+    (stdin, pipes) precisam ser lidos, pois o pdfminer faz seek no arquivo.
+    """
+    if isinstance(fonte, (str, os.PathLike, bytes)):
+        return fonte
+    if isinstance(fonte, (bytearray, memoryview)):
+        return bytes(fonte)
+    if isinstance(fonte, io.BytesIO):
+        return fonte.getvalue()
+    if fonte.seekable():
+        fonte.seek(0)
+    return fonte.read()
+
+
+def abrir_pdf(fonte: Union[str, bytes]) -> pdfplumber.PDF:
+    """pdfplumber.open para caminho ou bytes (sem passar pelo disco)"""
+    if isinstance(fonte, bytes):
+        return pdfplumber.open(io.BytesIO(fonte))
+    return pdfplumber.open(fonte)
+
+
+def liberar_pagina(page):
+    """Descarta objetos, layout e mapas de texto já usados da página (o PDF continua aberto)"""
+    page.flush_cache()
+    if hasattr(page.get_textmap, "cache_clear"):
+        page.get_textmap.cache_clear()
+
+
+def texto_da_pagina(page) -> str:
+    """Texto corrido da página, aproveitando os caracteres já lidos para as tabelas"""
+    return page.extract_text() or ""
+
+
+def _extrair_tabelas_paginas(caminho_do_arquivo_pdf: Union[str, bytes], paginas: Sequence[int],
+                             aprender_layout: bool = False, incluir_texto: bool = False
+                             ) -> Tuple[List[List[List[List[Optional[str]]]]], Optional[List[str]]]:
+    """Extrai as tabelas (e o texto, se pedido) das páginas indicadas (índices base 0) em um processo do pool"""
+    # Cada bloco aprende o layout na sua primeira página
+    extrator = ExtratorTabelas(aprender=aprender_layout)
+    tabelas_por_pagina = []
+    textos = [] if incluir_texto else None
+    with abrir_pdf(caminho_do_arquivo_pdf) as pdf:
+        for i in paginas:
+            tabelas_por_pagina.append(extrator.extrair(pdf.pages[i]))
+            if incluir_texto:
+                textos.append(texto_da_pagina(pdf.pages[i]))
+            liberar_pagina(pdf.pages[i])
+    return tabelas_por_pagina, textos
+
+
+def _extrair_tabelas_em_paralelo(caminho_do_arquivo_pdf: Union[str, bytes], workers: int,
+                                 aprender_layout: bool = False,
+                                 paginas: Optional[Sequence[int]] = None, incluir_texto: bool = False
+                                 ) -> Tuple[List[List[List[List[Optional[str]]]]], Optional[List[str]]]:
+    """
+    Distribui as páginas do PDF em blocos contíguos por um pool de processos
+    
+    Args:
+        caminho_do_arquivo_pdf: Caminho ou conteúdo do PDF
+        workers: Número máximo de processos
+        aprender_layout: Restringe a extração à região da tabela aprendida em cada bloco
+        paginas: Índices (base 0) das páginas a extrair (padrão: todas)
+        incluir_texto: Devolve também o texto de cada página (extraído na mesma abertura)
+        
+    Returns:
+        (tabelas de cada página pedida, textos ou None), na ordem de paginas
+    """
+    if paginas is None:
+        with abrir_pdf(caminho_do_arquivo_pdf) as pdf:
+            paginas = range(len(pdf.pages))
+    total_paginas = len(paginas)
+    
+    # Mais processos que CPUs só acrescenta custo de abertura do PDF
+    workers = min(workers, total_paginas, os.cpu_count() or 1)
+    if workers <= 1:
+        return _extrair_tabelas_paginas(caminho_do_arquivo_pdf, paginas, aprender_layout, incluir_texto)
+    
+    # Cada processo abre o PDF uma vez e extrai um bloco de páginas
+    tamanho_bloco = -(-total_paginas // workers)
+    blocos = [paginas[inicio:inicio + tamanho_bloco] for inicio in range(0, total_paginas, tamanho_bloco)]
+    
+    with ProcessPoolExecutor(max_workers=len(blocos)) as executor:
+        futuros = [executor.submit(_extrair_tabelas_paginas, caminho_do_arquivo_pdf, bloco, aprender_layout,
+                                   incluir_texto)
+                   for bloco in blocos]
+        tabelas_por_pagina = []
+        textos = [] if incluir_texto else None
+        for futuro in futuros:
+            tabelas_bloco, textos_bloco = futuro.result()
+            tabelas_por_pagina.extend(tabelas_bloco)
+            if incluir_texto:
+                textos.extend(textos_bloco)
+    
+    return tabelas_por_pagina, textos
+
 
 class PDFCardapioProcessor:
     """Processador de PDFs de cardápio usando pdfplumber"""
     
-    def __init__(self):
-        self.downloads_dir = "/home/luiznicolao/Downloads/testecardapio"
+    def __init__(self, workers_paginas: Optional[int] = None, usar_cache: bool = True,
+                 cache: Optional[CacheResultados] = None, instrumentar: Optional[bool] = None,
+                 aprender_layout: Optional[bool] = None, baixa_memoria: Optional[bool] = None,
+                 limite_memoria_mb: Optional[int] = None, triagem_paginas: Optional[bool] = None):
+        # Cópias dos resultados (PDF_RESULTADOS_DIR), gravadas em segundo plano com gzip e rotação
+        self.downloads_dir = os.environ.get("PDF_RESULTADOS_DIR", "/home/luiznicolao/Downloads/testecardapio")
+        # Extração paralela de páginas é opt-in (PDF_WORKERS_PAGINAS > 1 ou argumento)
+        if workers_paginas is None:
+            workers_paginas = int(os.environ.get("PDF_WORKERS_PAGINAS", "1"))
+        self.workers_paginas = workers_paginas
+        self._classificacoes: Dict[Optional[str], ClassificacaoCelula] = {}
+        self.cache = cache or (obter_cache_padrao() if usar_cache else None)
+        # Tabelas por página e histórico de versões para revisões do mesmo PDF
+        self.cache_paginas = obter_cache_paginas() if usar_cache else None
+        self.historico_versoes = obter_historico_versoes() if usar_cache else None
+        # Código de receita → (arquivo, data, turno), consultado sem reler os JSONs
+        self.indice_receitas = obter_indice_receitas() if usar_cache else None
+        # Métricas por etapa/página em metadados['instrumentacao'] (PDF_INSTRUMENTACAO=true)
+        if instrumentar is None:
+            instrumentar = os.environ.get("PDF_INSTRUMENTACAO", "false").lower() == "true"
+        self.instrumentar = instrumentar
+        # Layout da tabela aprendido na primeira página (opcional: PDF_APRENDER_LAYOUT=true ativa)
+        if aprender_layout is None:
+            aprender_layout = os.environ.get("PDF_APRENDER_LAYOUT", "false").lower() == "true"
+        self.aprender_layout = aprender_layout
+        # Libera o layout de cada página logo após a extração (PDF_BAIXA_MEMORIA=false desativa)
+        if baixa_memoria is None:
+            baixa_memoria = os.environ.get("PDF_BAIXA_MEMORIA", "true").lower() != "false"
+        self.baixa_memoria = baixa_memoria
+        # Memória residente máxima na extração; acima dela o resultado é parcial (0 = sem limite)
+        if limite_memoria_mb is None:
+            limite_memoria_mb = int(os.environ.get("PDF_LIMITE_MEMORIA_MB", "0"))
+        self.limite_memoria_mb = limite_memoria_mb
+        # Capas, assinaturas e páginas em branco não passam pelo extract_tables (PDF_TRIAGEM_PAGINAS=false desativa)
+        if triagem_paginas is None:
+            triagem_paginas = os.environ.get("PDF_TRIAGEM_PAGINAS", "true").lower() != "false"
+        self.triagem_paginas = triagem_paginas
         self._ensure_downloads_dir()
     
     def _ensure_downloads_dir(self):
@@ -24,68 +352,219 @@ class PDFCardapioProcessor:
         if not os.path.exists(self.downloads_dir):
             os.makedirs(self.downloads_dir)
     
-    def extrair_tabela_do_pdf(self, caminho_do_arquivo_pdf: str) -> Optional[List[List[str]]]:
+    def extrair_tabela_do_pdf(self, caminho_do_arquivo_pdf: FontePDF, workers: Optional[int] = None,
+                              instrumentacao: Instrumentacao = SEM_INSTRUMENTACAO,
+                              revisao: Optional[Dict[str, Any]] = None,
+                              monitor: Optional[MonitorMemoria] = None,
+                              paginas_ignoradas: Optional[List[Dict[str, Any]]] = None,
+                              textos: Optional[List[str]] = None) -> Optional[List[List[str]]]:
         """
         Extrai a tabela do PDF usando pdfplumber
         
+        Com o cache de páginas ativo, páginas com o mesmo conteúdo de uma
+        extração anterior (ex: semanas que não mudaram numa revisão) não passam
+        de novo pelo extract_tables.
+        
         Args:
-            caminho_do_arquivo_pdf: Caminho para o arquivo PDF
+            caminho_do_arquivo_pdf: Caminho, bytes ou arquivo binário do PDF
+            workers: Processos para extrair páginas em paralelo (padrão: self.workers_paginas; 1 = sequencial)
+            instrumentacao: Coletor de métricas por etapa e por página
+            revisao: Recebe "paginas" (hash de cada página) e "paginas_reaproveitadas"
+                     quando o cache de páginas está ativo
+            monitor: Amostra a memória a cada página; no modo sequencial, a extração
+                     para na página que ultrapassar o limite (tabela parcial)
+            paginas_ignoradas: Recebe {"pagina", "motivo"} de cada página descartada pela triagem
+            textos: Recebe o texto de cada página, lido na mesma abertura do PDF
+                    (inclusive das páginas descartadas pela triagem)
             
         Returns:
             Lista de listas representando a tabela extraída
         """
+        workers = workers if workers is not None else self.workers_paginas
+        revisao = revisao if revisao is not None else {}
+        monitor = monitor or MonitorMemoria()
+        paginas_ignoradas = paginas_ignoradas if paginas_ignoradas is not None else []
         try:
-            with pdfplumber.open(caminho_do_arquivo_pdf) as pdf:
-                # Processar todas as páginas
-                todas_tabelas = []
-                for i, page in enumerate(pdf.pages):
-                    # Extrair tabelas da página
-                    tabelas = page.extract_tables()
-                    
+            caminho_do_arquivo_pdf = carregar_fonte_pdf(caminho_do_arquivo_pdf)
+            if workers > 1:
+                # Páginas medidas em conjunto: a extração acontece nos processos do pool
+                with instrumentacao.etapa("extracao_tabelas_paralela"):
+                    tabelas_por_pagina = self._extrair_paginas_em_paralelo(caminho_do_arquivo_pdf, workers, revisao,
+                                                                           paginas_ignoradas, textos)
+                monitor.paginas_total = monitor.paginas_processadas = len(tabelas_por_pagina)
+                monitor.amostrar()
+            else:
+                with instrumentacao.etapa("abrir_pdf"):
+                    pdf = abrir_pdf(caminho_do_arquivo_pdf)
+                    paginas = pdf.pages
+                extrator = ExtratorTabelas(aprender=self.aprender_layout)
+                monitor.paginas_total = len(paginas)
+                with pdf, instrumentacao.etapa("extracao_tabelas"):
+                    tabelas_por_pagina = []
+                    for i, page in enumerate(paginas):
+                        with instrumentacao.etapa("triagem_paginas"):
+                            ignorada = self._triar_pagina(page, paginas_ignoradas)
+                        if ignorada:
+                            tabelas_por_pagina.append([])
+                            if textos is not None:
+                                textos.append(texto_da_pagina(page))
+                        else:
+                            with instrumentacao.etapa("extract_tables", pagina=i + 1):
+                                tabelas_por_pagina.append(self._extrair_pagina(extrator, page, revisao, textos))
+                        if self.baixa_memoria:
+                            liberar_pagina(page)
+                        monitor.paginas_processadas = i + 1
+                        if not monitor.amostrar():
+                            print(f"⚠️ Limite de memória excedido na página {i + 1} de {len(paginas)}")
+                            break
+                instrumentacao.anotar("layout_tabela", extrator.estatisticas())
+            
+            # Montagem sempre na ordem das páginas (marcadores e alinhamento iguais nos dois modos)
+            todas_tabelas = []
+            with instrumentacao.etapa("normalizacao_alinhamento"):
+                for i, tabelas in enumerate(tabelas_por_pagina):
                     if tabelas:
                         # Assumimos que o cardápio é a primeira tabela
-                        tabela_principal = tabelas[0]
-                        
-                        # Limpar e normalizar a tabela
-                        tabela_limpa = []
-                        max_colunas = 0
-                        
-                        # Primeiro, encontrar o número máximo de colunas
-                        for linha in tabela_principal:
-                            if linha:
-                                max_colunas = max(max_colunas, len(linha))
-                        
-                        
-                        # Normalizar todas as linhas para ter o mesmo número de colunas
-                        for linha in tabela_principal:
-                            if linha:  # Verificar se a linha não está vazia
-                                # Normalizar o número de colunas
-                                linha_normalizada = [celula or "" for celula in linha]
-                                
-                                # Garantir que todas as linhas tenham o mesmo número de colunas
-                                while len(linha_normalizada) < max_colunas:
-                                    linha_normalizada.append("")
-                                
-                                # Truncar se tiver mais colunas que o máximo
-                                if len(linha_normalizada) > max_colunas:
-                                    linha_normalizada = linha_normalizada[:max_colunas]
-                                
-                                tabela_limpa.append(linha_normalizada)
-                        
-                        # Aplicar correção de alinhamento se necessário
-                        tabela_limpa = self._corrigir_alinhamento_datas(tabela_limpa)
-                        
-                        # Adicionar marcador de página para identificar datas específicas
-                        tabela_limpa.append([f"PAGE_MARKER_{i+1}"] + [""] * (max_colunas - 1))
-                        
-                        todas_tabelas.extend(tabela_limpa)
-                
-                return todas_tabelas
+                        with instrumentacao.etapa("normalizacao_alinhamento", pagina=i + 1):
+                            todas_tabelas.extend(self._normalizar_tabela_pagina(tabelas[0], i + 1))
+            
+            return todas_tabelas
                 
         except Exception as e:
             print(f"❌ Erro ao extrair tabela do PDF: {str(e)}")
             return None
     
+    def _triar_pagina(self, page, paginas_ignoradas: List[Dict[str, Any]]) -> bool:
+        """True se a triagem descartou a página (registrada em paginas_ignoradas)"""
+        if not self.triagem_paginas:
+            return False
+        motivo = motivo_para_ignorar(page)
+        if motivo is None:
+            return False
+        paginas_ignoradas.append({"pagina": page.page_number, "motivo": motivo})
+        return True
+    
+    def _chave_pagina(self, hash_conteudo: str) -> str:
+        # Com o layout aprendido a extração fica restrita à região da tabela: entradas separadas
+        modo = "layout" if self.aprender_layout else "padrao"
+        return f"pagina-{hash_conteudo}-{VERSAO_PROCESSADOR}-{modo}"
+    
+    def _extrair_pagina(self, extrator: ExtratorTabelas, page, revisao: Dict[str, Any],
+                        textos: Optional[List[str]] = None) -> List[List[List[Optional[str]]]]:
+        """extrator.extrair(page), passando pelo cache de páginas quando ativo; o texto vai para textos"""
+        if self.cache_paginas is None:
+            tabelas = extrator.extrair(page)
+            if textos is not None:
+                textos.append(texto_da_pagina(page))
+            return tabelas
+        hash_conteudo = hash_pagina(page)
+        revisao.setdefault("paginas", []).append(hash_conteudo)
+        em_cache = self.cache_paginas.obter(self._chave_pagina(hash_conteudo))
+        # Entradas gravadas sem o texto não servem quando ele é pedido
+        if em_cache is not None and (textos is None or "texto" in em_cache):
+            revisao["paginas_reaproveitadas"] = revisao.get("paginas_reaproveitadas", 0) + 1
+            if textos is not None:
+                textos.append(em_cache["texto"])
+            return em_cache["tabelas"]
+        tabelas = extrator.extrair(page)
+        # Só a primeira tabela da página é usada
+        entrada = {"tabelas": tabelas[:1]}
+        if textos is not None:
+            entrada["texto"] = texto_da_pagina(page)
+            textos.append(entrada["texto"])
+        self.cache_paginas.salvar(self._chave_pagina(hash_conteudo), entrada)
+        return tabelas
+    
+    def _extrair_paginas_em_paralelo(self, fonte: Union[str, bytes], workers: int, revisao: Dict[str, Any],
+                                     paginas_ignoradas: List[Dict[str, Any]],
+                                     textos: Optional[List[str]] = None) -> List[List[List[List[Optional[str]]]]]:
+        """
+        Extração paralela; a triagem roda aqui e só as páginas selecionadas
+        (e, com o cache de páginas, ainda sem cache) vão para o pool
+        """
+        incluir_texto = textos is not None
+        with abrir_pdf(fonte) as pdf:
+            total = len(pdf.pages)
+            selecionadas = [i for i, page in enumerate(pdf.pages) if not self._triar_pagina(page, paginas_ignoradas)]
+            hashes = {i: hash_pagina(pdf.pages[i]) for i in selecionadas} if self.cache_paginas is not None else {}
+            # Páginas descartadas pela triagem não vão para o pool; o texto delas sai daqui
+            textos_por_pagina = [None] * total
+            if incluir_texto:
+                for ignorada in paginas_ignoradas:
+                    page = pdf.pages[ignorada["pagina"] - 1]
+                    textos_por_pagina[ignorada["pagina"] - 1] = texto_da_pagina(page)
+        tabelas_por_pagina = [[] for _ in range(total)]
+        faltando = selecionadas
+        if self.cache_paginas is not None:
+            faltando = []
+            for i in selecionadas:
+                em_cache = self.cache_paginas.obter(self._chave_pagina(hashes[i]))
+                if em_cache is not None and (not incluir_texto or "texto" in em_cache):
+                    tabelas_por_pagina[i] = em_cache["tabelas"]
+                    textos_por_pagina[i] = em_cache.get("texto")
+                else:
+                    faltando.append(i)
+            revisao["paginas"] = list(hashes.values())
+            revisao["paginas_reaproveitadas"] = len(selecionadas) - len(faltando)
+        if faltando:
+            extraidas, textos_extraidos = _extrair_tabelas_em_paralelo(
+                fonte, workers, self.aprender_layout, paginas=faltando, incluir_texto=incluir_texto)
+            for k, (i, tabelas) in enumerate(zip(faltando, extraidas)):
+                tabelas_por_pagina[i] = tabelas
+                entrada = {"tabelas": tabelas[:1]}
+                if incluir_texto:
+                    textos_por_pagina[i] = entrada["texto"] = textos_extraidos[k]
+                if self.cache_paginas is not None:
+                    self.cache_paginas.salvar(self._chave_pagina(hashes[i]), entrada)
+        if incluir_texto:
+            textos.extend(textos_por_pagina)
+        return tabelas_por_pagina
+    
+    def _normalizar_tabela_pagina(self, tabela_principal: List[List[Optional[str]]], numero_pagina: int) -> List[List[str]]:
+        """
+        Normaliza a tabela de uma página e acrescenta o marcador de página
+        
+        Args:
+            tabela_principal: Tabela como devolvida por page.extract_tables()
+            numero_pagina: Número da página (base 1)
+            
+        Returns:
+            Linhas normalizadas seguidas da linha PAGE_MARKER_n
+        """
+        # Limpar e normalizar a tabela
+        tabela_limpa = []
+        max_colunas = 0
+        
+        # Primeiro, encontrar o número máximo de colunas
+        for linha in tabela_principal:
+            if linha:
+                max_colunas = max(max_colunas, len(linha))
+        
+        
+        # Normalizar todas as linhas para ter o mesmo número de colunas
+        for linha in tabela_principal:
+            if linha:  # Verificar se a linha não está vazia
+                # Normalizar o número de colunas
+                linha_normalizada = [celula or "" for celula in linha]
+                
+                # Garantir que todas as linhas tenham o mesmo número de colunas
+                while len(linha_normalizada) < max_colunas:
+                    linha_normalizada.append("")
+                
+                # Truncar se tiver mais colunas que o máximo
+                if len(linha_normalizada) > max_colunas:
+                    linha_normalizada = linha_normalizada[:max_colunas]
+                
+                tabela_limpa.append(linha_normalizada)
+        
+        # Aplicar correção de alinhamento se necessário
+        tabela_limpa = self._corrigir_alinhamento_datas(tabela_limpa)
+        
+        # Adicionar marcador de página para identificar datas específicas
+        tabela_limpa.append([f"PAGE_MARKER_{numero_pagina}"] + [""] * (max_colunas - 1))
+        
+        return tabela_limpa
+    
     def _corrigir_alinhamento_datas(self, tabela: List[List[str]]) -> List[List[str]]:
         """
         Corrige o alinhamento das datas quando há deslocamento
@@ -103,10 +582,7 @@ class PDFCardapioProcessor:
         # Procurar por linha com datas
         linha_datas_idx = None
         for i, linha in enumerate(tabela[:3]):
-            datas_encontradas = 0
-            for celula in linha:
-                if celula and re.search(r'\d{1,2}/\d{1,2}/\d{4}', celula):
-                    datas_encontradas += 1
+            datas_encontradas = len(self._datas_da_linha(linha))
             
             if datas_encontradas >= 2:  # Pelo menos 2 datas na linha
                 linha_datas_idx = i
@@ -118,10 +594,7 @@ class PDFCardapioProcessor:
         linha_datas = tabela[linha_datas_idx]
         
         # Verificar se há desalinhamento (gap entre datas)
-        posicoes_datas = []
-        for i, celula in enumerate(linha_datas):
-            if celula and re.search(r'\d{1,2}/\d{1,2}/\d{4}', celula):
-                posicoes_datas.append(i)
+        posicoes_datas = list(self._datas_da_linha(linha_datas))
         
         
         # Se há gap entre as posições das datas, corrigir
@@ -141,6 +614,7 @@ class PDFCardapioProcessor:
                 
                 
                 # Criar nova tabela com alinhamento corrigido
+                colunas_datas = set(posicoes_datas)
                 tabela_corrigida = []
                 for linha_idx, linha in enumerate(tabela):
                     if linha_idx == linha_datas_idx:
@@ -159,7 +633,7 @@ class PDFCardapioProcessor:
                         
                         # Manter conteúdo das outras colunas
                         for i, celula in enumerate(linha):
-                            if i not in posicoes_datas:
+                            if i not in colunas_datas:
                                 nova_linha[i] = celula
                         
                         tabela_corrigida.append(nova_linha)
@@ -168,7 +642,7 @@ class PDFCardapioProcessor:
         
         return tabela
     
-    def processar_tabela_cardapio(self, tabela_extraida: List[List[str]]) -> List[Dict[str, Any]]:
+    def processar_tabela_cardapio(self, tabela_extraida: List[List[str]]) -> List[Refeicao]:
         """
         Processa a tabela extraída e transforma em dados estruturados
         
@@ -176,40 +650,68 @@ class PDFCardapioProcessor:
             tabela_extraida: Lista de listas da tabela extraída
             
         Returns:
-            Lista de dicionários com as refeições processadas
+            Lista de refeições processadas (registros Refeicao, lidos como dicionários)
         """
         if not tabela_extraida:
             return []
         
+        return list(self.iterar_refeicoes([tabela_extraida]))
+    
+    def iterar_refeicoes(self, blocos: Iterable[List[List[str]]]) -> Iterator[Refeicao]:
+        """
+        Gera as refeições à medida que os blocos de linhas chegam
+        
+        Aplica as mesmas regras de processar_tabela_cardapio sobre a concatenação
+        dos blocos (normalmente uma página cada, terminada em PAGE_MARKER_n).
+        Só ficam retidos os blocos necessários para achar a linha de datas inicial;
+        se não houver datas nas 3 primeiras linhas, a busca alternativa precisa
+        da tabela inteira e todos os blocos são lidos antes da primeira refeição.
+        A deduplicação guarda apenas chaves, não as refeições já geradas.
+        
+        Args:
+            blocos: Blocos consecutivos de linhas da tabela
+            
+        Yields:
+            Refeições (registros Refeicao), na mesma ordem de processar_tabela_cardapio
+        """
+        blocos = iter(blocos)
+        blocos_retidos = []
+        primeiras_linhas = []
+        for bloco in blocos:
+            if not bloco:
+                continue
+            blocos_retidos.append(bloco)
+            primeiras_linhas.extend(bloco[:3 - len(primeiras_linhas)])
+            if len(primeiras_linhas) >= 3:
+                break
+        
+        if not blocos_retidos:
+            return
         
-        refeicoes_processadas = []
+        # Índices de deduplicação: (codigo, data, descricao) e (codigo, data) -> turnos
+        receitas_existentes = set()
+        turnos_por_codigo_data = defaultdict(set)
         
         # Procurar por linha com datas (pode ser primeira ou segunda linha)
         mapa_datas = {}
         linha_datas = None
         
-        for linha_idx, linha in enumerate(tabela_extraida[:3]):  # Verificar primeiras 3 linhas
-            for col_idx, celula in enumerate(linha):
-                if celula and re.search(r'\d{1,2}/\d{1,2}/\d{4}', celula):
-                    # Extrair data da célula
-                    match = re.search(r'(\d{1,2}/\d{1,2}/\d{4})', celula)
-                    if match:
-                        data = match.group(1)
-                        mapa_datas[col_idx] = data
-                        if linha_datas is None:
-                            linha_datas = linha_idx
+        for linha_idx, linha in enumerate(primeiras_linhas):  # Verificar primeiras 3 linhas
+            datas = self._datas_da_linha(linha)
+            if datas:
+                mapa_datas.update(datas)
+                if linha_datas is None:
+                    linha_datas = linha_idx
         
         
         # Se não encontrou datas, tentar extrair do texto das receitas
         if not mapa_datas:
-            for linha_idx, linha in enumerate(tabela_extraida):
-                for col_idx, celula in enumerate(linha):
-                    if celula and re.search(r'\d{1,2}/\d{1,2}/\d{4}', celula):
-                        match = re.search(r'(\d{1,2}/\d{1,2}/\d{4})', celula)
-                        if match:
-                            data = match.group(1)
-                            if col_idx not in mapa_datas:
-                                mapa_datas[col_idx] = data
+            blocos_retidos.extend(blocos)
+            for bloco in blocos_retidos:
+                for linha in bloco:
+                    for col_idx, data in self._datas_da_linha(linha).items():
+                        if col_idx not in mapa_datas:
+                            mapa_datas[col_idx] = data
         
         # Processar por blocos de páginas
         pagina_atual = 1
@@ -218,133 +720,198 @@ class PDFCardapioProcessor:
         if linha_datas is not None and linha_datas > 0:
             inicio_linhas = linha_datas + 1
         
-        for linha_idx, linha in enumerate(tabela_extraida[inicio_linhas:], start=inicio_linhas):
-            # Verificar se é um marcador de página
-            if linha and linha[0] and linha[0].startswith("PAGE_MARKER_"):
-                # Processar página anterior se houver dados
-                if mapa_datas_atual:
-                    # Usar o mapa de datas da página atual
-                    mapa_datas = mapa_datas_atual
-                
-                # Resetar para nova página
-                pagina_atual += 1
-                mapa_datas_atual = {}
-                continue
-            
-            # Procurar por linha com datas (primeiras 3 linhas de cada página)
-            if linha_idx < 3 or not mapa_datas_atual:
-                for col_idx, celula in enumerate(linha):
-                    if celula and re.search(r'\d{1,2}/\d{1,2}/\d{4}', celula):
-                        # Extrair data da célula
-                        match = re.search(r'(\d{1,2}/\d{1,2}/\d{4})', celula)
-                        if match:
-                            data = match.group(1)
-                            mapa_datas_atual[col_idx] = data
-            
-            
-            if not linha or len(linha) < 2:
-                continue
-            
-            # Extrair e limpar o turno
-            turno_bruto = linha[0] if linha[0] else ""
-            
-            if not turno_bruto.strip():
-                continue
-            
-            # Processar turnos (pode ter múltiplos turnos na mesma célula)
-            turnos = self._extrair_turnos(turno_bruto)
-            
-            # Se não encontrou turnos válidos, usar turnos padrão
-            if not turnos or turnos == ['Não identificado']:
-                turnos = ['Matutino', 'Vespertino', 'Noturno']
-            
-            # Garantir que sempre temos os 3 turnos
-            if len(turnos) < 3:
-                turnos_completos = ['Matutino', 'Vespertino', 'Noturno']
-                for turno in turnos_completos:
-                    if turno not in turnos:
-                        turnos.append(turno)
+        # Índice global da primeira linha do bloco e linhas anteriores usadas como contexto
+        inicio_bloco = 0
+        linhas_anteriores = []
+        
+        for bloco in chain(blocos_retidos, blocos):
+            contexto = linhas_anteriores + bloco
+            inicio_contexto = inicio_bloco - len(linhas_anteriores)
+            # Índice de datas por linha, calculado uma vez por bloco
+            datas_por_linha = [self._datas_da_linha(linha) for linha in contexto]
             
-            # Iterar sobre as células da refeição na linha
-            for i, texto_celula in enumerate(linha[1:], start=1):
-                if i not in mapa_datas:
+            for linha_idx, linha in enumerate(bloco, start=inicio_bloco):
+                if linha_idx < inicio_linhas:
                     continue
                 
-                if not texto_celula or not texto_celula.strip():
+                # Verificar se é um marcador de página
+                if linha and linha[0] and linha[0].startswith("PAGE_MARKER_"):
+                    # Processar página anterior se houver dados
+                    if mapa_datas_atual:
+                        # Usar o mapa de datas da página atual
+                        mapa_datas = mapa_datas_atual
+                    
+                    # Resetar para nova página
+                    pagina_atual += 1
+                    mapa_datas_atual = {}
                     continue
                 
-                # Associar dados
-                data_atual = mapa_datas[i]
-                texto_refeicao = texto_celula.replace('\n', ' ').strip()
+                # Procurar por linha com datas (primeiras 3 linhas de cada página)
+                if linha_idx < 3 or not mapa_datas_atual:
+                    mapa_datas_atual.update(datas_por_linha[linha_idx - inicio_contexto])
                 
                 
-                # Extrair código e descrição
-                codigo, descricao = self._extrair_codigo_descricao(texto_refeicao)
+                if not linha or len(linha) < 2:
+                    continue
                 
-                # Só adicionar se tiver código ou descrição válida
-                if codigo or (descricao and descricao.strip() and not re.match(r'^[A-Za-z]+\s*[–-]\s*feira\s+\d{1,2}/\d{1,2}/\d{4}$', descricao.strip())):
-                    # Se a data estiver vazia, tentar extrair do contexto da linha
-                    if not data_atual:
-                        # Procurar por datas no texto da receita
-                        match_data = re.search(r'(\d{1,2}/\d{1,2}/\d{4})', texto_refeicao)
-                        if match_data:
-                            data_atual = match_data.group(1)
-                        
-                        # Se ainda não encontrou, tentar extrair do contexto da tabela
-                        if not data_atual:
-                            # Procurar em linhas próximas por datas
-                            for offset in range(-2, 3):
-                                linha_contexto_idx = linha_idx + offset
-                                if 0 <= linha_contexto_idx < len(tabela_extraida):
-                                    linha_contexto = tabela_extraida[linha_contexto_idx]
-                                    for celula_contexto in linha_contexto:
-                                        if celula_contexto and re.search(r'\d{1,2}/\d{1,2}/\d{4}', celula_contexto):
-                                            match_contexto = re.search(r'(\d{1,2}/\d{1,2}/\d{4})', celula_contexto)
-                                            if match_contexto:
-                                                data_atual = match_contexto.group(1)
-                                                break
-                                    if data_atual:
-                                        break
+                # Extrair e limpar o turno
+                turno_bruto = linha[0] if linha[0] else ""
+                
+                if not turno_bruto.strip():
+                    continue
+                
+                # Processar turnos (pode ter múltiplos turnos na mesma célula)
+                turnos = self._extrair_turnos(turno_bruto)
+                
+                # Se não encontrou turnos válidos, usar turnos padrão
+                if not turnos or turnos == ['Não identificado']:
+                    turnos = ['Matutino', 'Vespertino', 'Noturno']
+                
+                # Garantir que sempre temos os 3 turnos
+                if len(turnos) < 3:
+                    turnos_completos = ['Matutino', 'Vespertino', 'Noturno']
+                    for turno in turnos_completos:
+                        if turno not in turnos:
+                            turnos.append(turno)
+                
+                # Iterar sobre as células da refeição na linha
+                for i, texto_celula in enumerate(linha[1:], start=1):
+                    if i not in mapa_datas:
+                        continue
                     
-                    # Verificar se já existe uma receita similar para evitar duplicatas
-                    receita_existente = None
-                    for ref_existente in refeicoes_processadas:
-                        if (ref_existente['codigo'] == codigo and 
-                            ref_existente['data'] == data_atual and 
-                            ref_existente['descricao'] == descricao):
-                            receita_existente = ref_existente
-                            break
+                    celula = self.classificar_celula(texto_celula)
+                    if celula.ruido:
+                        continue
+                    
+                    # Associar dados
+                    data_atual = mapa_datas[i]
+                    texto_refeicao = celula.texto
+                    
+                    
+                    # Código e descrição já extraídos na classificação
+                    codigo, descricao = celula.codigo, celula.descricao
                     
-                    if receita_existente:
-                        # Adicionar turnos que ainda não existem
-                        turnos_existentes = [ref['turno'] for ref in refeicoes_processadas 
-                                           if ref['codigo'] == codigo and ref['data'] == data_atual]
+                    # Só adicionar se tiver código ou descrição válida
+                    if celula.refeicao:
+                        # Se a data estiver vazia, tentar extrair do contexto da linha
+                        if not data_atual:
+                            # Procurar por datas no texto da receita
+                            if celula.data:
+                                data_atual = celula.data
+                            
+                            # Se ainda não encontrou, tentar extrair do contexto da tabela
+                            if not data_atual:
+                                # Procurar em linhas próximas por datas
+                                for offset in range(-2, 3):
+                                    linha_contexto_idx = linha_idx + offset - inicio_contexto
+                                    if 0 <= linha_contexto_idx < len(contexto) and datas_por_linha[linha_contexto_idx]:
+                                        data_atual = next(iter(datas_por_linha[linha_contexto_idx].values()))
+                                        break
                         
-                        for turno in turnos:
-                            if turno not in turnos_existentes:
-                                refeicao = {
-                                    'data': data_atual or 'Data não identificada',
-                                    'turno': turno,
-                                    'codigo': codigo,
-                                    'descricao': descricao,
-                                    'texto_original': texto_refeicao
-                                }
-                                refeicoes_processadas.append(refeicao)
+                        # Verificar se já existe uma receita similar para evitar duplicatas
+                        # (índices pela data gravada, como a comparação com as refeições já geradas)
+                        data_refeicao = data_atual or 'Data não identificada'
+                        if (codigo, data_atual, descricao) in receitas_existentes:
+                            # Adicionar turnos que ainda não existem
+                            turnos_existentes = frozenset(turnos_por_codigo_data.get((codigo, data_atual), ()))
+                            turnos_novos = [turno for turno in turnos if turno not in turnos_existentes]
+                        else:
+                            # Adicionar aos resultados para cada turno
+                            turnos_novos = turnos
+                        
+                        for turno in turnos_novos:
+                            refeicao = Refeicao(data_refeicao, turno, codigo, descricao, texto_refeicao)
+                            receitas_existentes.add((codigo, data_refeicao, descricao))
+                            turnos_por_codigo_data[(codigo, data_refeicao)].add(turno)
+                            yield refeicao
                     else:
-                        # Adicionar aos resultados para cada turno
-                        for turno in turnos:
-                            refeicao = {
-                                'data': data_atual or 'Data não identificada',
-                                'turno': turno,
-                                'codigo': codigo,
-                                'descricao': descricao,
-                                'texto_original': texto_refeicao
-                            }
-                            refeicoes_processadas.append(refeicao)
-                else:
-                    pass  # Não há código ou descrição válida, pular
+                        pass  # Não há código ou descrição válida, pular
+            
+            inicio_bloco += len(bloco)
+            linhas_anteriores = contexto[-2:]
+    
+    def iterar_tabelas_pdf(self, caminho_do_arquivo_pdf: FontePDF) -> Iterator[List[List[str]]]:
+        """
+        Extrai e normaliza a tabela de uma página por vez
+        
+        O cache de layout de cada página é descartado logo após a extração,
+        então só uma página fica carregada por vez.
         
-        return refeicoes_processadas
+        Args:
+            caminho_do_arquivo_pdf: Caminho, bytes ou arquivo binário do PDF
+            
+        Yields:
+            Linhas normalizadas de cada página, terminadas em PAGE_MARKER_n
+        """
+        extrator = ExtratorTabelas(aprender=self.aprender_layout)
+        with abrir_pdf(carregar_fonte_pdf(caminho_do_arquivo_pdf)) as pdf:
+            for i, page in enumerate(pdf.pages):
+                if self._triar_pagina(page, []):
+                    continue
+                tabelas = self._extrair_pagina(extrator, page, {})
+                liberar_pagina(page)
+                if tabelas:
+                    yield self._normalizar_tabela_pagina(tabelas[0], i + 1)
+    
+    def iterar_refeicoes_pdf(self, caminho_do_arquivo_pdf: FontePDF) -> Iterator[Refeicao]:
+        """
+        Processa o PDF em streaming: as refeições de cada página são geradas
+        assim que a página é extraída, sem montar tabela_bruta nem cardapio_por_data
+        
+        Args:
+            caminho_do_arquivo_pdf: Caminho, bytes ou arquivo binário do PDF
+            
+        Yields:
+            Refeições (registros Refeicao), na mesma ordem de processar_tabela_cardapio
+        """
+        return self.iterar_refeicoes(self.iterar_tabelas_pdf(caminho_do_arquivo_pdf))
+    
+    def classificar_celula(self, celula: Optional[str]) -> ClassificacaoCelula:
+        """
+        Classifica uma célula uma única vez por texto (data, código, cabeçalho, ruído)
+        
+        Alinhamento, processamento das refeições e agrupamento por data leem
+        este resultado em vez de repetir as regex sobre a mesma célula.
+        
+        Args:
+            celula: Texto da célula
+            
+        Returns:
+            Classificação da célula
+        """
+        classificacao = self._classificacoes.get(celula)
+        if classificacao is None:
+            if len(self._classificacoes) >= LIMITE_CLASSIFICACOES:
+                self._classificacoes.clear()
+            classificacao = self._classificar(celula)
+            self._classificacoes[celula] = classificacao
+        return classificacao
+    
+    def _classificar(self, celula: Optional[str]) -> ClassificacaoCelula:
+        """Aplica as regex de data, código e cabeçalho a uma célula"""
+        texto = celula.replace('\n', ' ').strip() if celula else ""
+        match_data = REGEX_DATA.search(celula) if celula else None
+        codigo, descricao = self._extrair_codigo_descricao(texto)
+        descricao_limpa = descricao.strip() if descricao else ""
+        return ClassificacaoCelula(
+            texto=texto,
+            data=match_data.group(1) if match_data else None,
+            codigo=codigo,
+            descricao=descricao,
+            refeicao=bool(codigo or (descricao_limpa and not REGEX_DIA_SEMANA_DATA.match(descricao_limpa))),
+            cabecalho=bool(REGEX_DIA_SEMANA_DATA.match(texto)) or texto.upper().startswith("TURNOS"),
+            ruido=not texto
+        )
+    
+    def _datas_da_linha(self, linha: List[str]) -> Dict[int, str]:
+        """Retorna {coluna: data} das células da linha que contêm data"""
+        datas = {}
+        for col_idx, celula in enumerate(linha):
+            if celula:
+                data = self.classificar_celula(celula).data
+                if data:
+                    datas[col_idx] = data
+        return datas
     
     def _extrair_turnos(self, turno_bruto: str) -> List[str]:
         """
@@ -359,27 +926,8 @@ class PDFCardapioProcessor:
         if not turno_bruto:
             return []
         
-        # Dividir por quebras de linha e limpar
-        turnos_brutos = [t.strip() for t in turno_bruto.split('\n') if t.strip()]
-        
-        # Filtrar apenas turnos válidos
-        turnos_validos = []
-        for turno in turnos_brutos:
-            # Ignorar cabeçalhos e strings inválidas
-            if any(palavra in turno.lower() for palavra in [
-                'semana', 'pág', 'documento', 'secretaria', 'turnos', 'cardápio', 'parcial'
-            ]):
-                continue
-            
-            # Ignorar strings muito curtas ou que parecem datas
-            if len(turno) <= 2 or re.match(r'\d{1,2}/\d{1,2}/\d{4}', turno):
-                continue
-                
-            # Verificar se é um turno válido
-            if any(turno_valido in turno.lower() for turno_valido in [
-                'matutino', 'vespertino', 'noturno', 'manhã', 'tarde', 'noite'
-            ]):
-                turnos_validos.append(turno)
+        # Lista nova a cada chamada: quem chama completa os turnos nela
+        turnos_validos = list(_turnos_validos(turno_bruto))
         
         # Se não encontrou turnos válidos, tentar extrair do contexto
         if not turnos_validos:
@@ -410,54 +958,97 @@ class PDFCardapioProcessor:
         Returns:
             Tupla (codigo, descricao)
         """
-        if not texto_refeicao or not texto_refeicao.strip():
-            return None, ""
-        
-        # Limpar o texto
-        texto_limpo = texto_refeicao.strip()
-        
-        # Regex para códigos de receita (ex: LL25.228, R25.375, LL24.22)
-        pattern = r'([A-Z]{1,2}\d{2}\.\d{2,3})\s*(.*)'
-        match = re.search(pattern, texto_limpo)
-        
-        if match:
-            codigo = match.group(1)
-            descricao = match.group(2).strip()
-            
-            # Limpar descrição de quebras de linha e espaços extras
-            descricao = re.sub(r'\s+', ' ', descricao)
-            
-            return codigo, descricao
-        else:
-            # Se não encontrar código, verificar se é apenas uma data
-            if re.match(r'^[A-Za-z]+\s*[–-]\s*feira\s+\d{1,2}/\d{1,2}/\d{4}$', texto_limpo):
-                return None, ""
-            
-            # Se não encontrar código, usar o texto inteiro como descrição
-            return None, texto_limpo
+        return _codigo_descricao(texto_refeicao)
     
-    def processar_pdf_completo(self, caminho_do_arquivo_pdf: str) -> Dict[str, Any]:
+    def processar_pdf_completo(self, caminho_do_arquivo_pdf: FontePDF, imprimir_json: bool = True,
+                               instrumentar: Optional[bool] = None, nome_arquivo: Optional[str] = None,
+                               salvar_json: bool = True, compacto: bool = False,
+                               tabela_bruta: bool = False, texto: bool = False) -> Dict[str, Any]:
         """
         Processa um PDF completo e retorna dados estruturados
         
         Args:
-            caminho_do_arquivo_pdf: Caminho para o arquivo PDF
+            caminho_do_arquivo_pdf: Caminho, bytes ou arquivo binário do PDF (BytesIO, upload, stdin)
+            imprimir_json: Imprime o resultado (JSON compacto) entre os marcadores JSON_RESULTADO_* (modo processo único)
+            instrumentar: Grava tempos e pico de memória por etapa/página (padrão: self.instrumentar)
+            nome_arquivo: Nome gravado em metadados (padrão: nome do caminho ou do arquivo aberto)
+            salvar_json: Grava (em segundo plano) a cópia do resultado em downloads_dir, com os mesmos bytes impressos
+            compacto: Devolve (e imprime) o formato compacto, sem refeições duplicadas
+            tabela_bruta: No formato compacto, inclui tabela_bruta (omitida por padrão)
+            texto: Inclui texto_paginas (texto de cada página, lido na mesma abertura do PDF)
             
         Returns:
             Dicionário com dados processados
         """
+        if nome_arquivo is None:
+            nome_arquivo = os.path.basename(str(
+                caminho_do_arquivo_pdf if isinstance(caminho_do_arquivo_pdf, (str, os.PathLike))
+                else getattr(caminho_do_arquivo_pdf, "name", "")))
+        instrumentar = self.instrumentar if instrumentar is None else instrumentar
+        instrumentacao = Instrumentacao() if instrumentar else SEM_INSTRUMENTACAO
+        try:
+            with instrumentacao.etapa("leitura_entrada"):
+                fonte = carregar_fonte_pdf(caminho_do_arquivo_pdf)
+            resultado = self._processar_pdf_completo(fonte, nome_arquivo, instrumentacao, texto)
+        finally:
+            instrumentacao.encerrar()
+        
+        if compacto:
+            resultado = compactar_resultado(resultado, incluir_tabela_bruta=tabela_bruta)
+        
+        # Serializado uma vez: os mesmos bytes vão para a cópia em disco e para o stdout
+        salvar = salvar_json and resultado.get("sucesso") and not resultado["metadados"].get("cache")
+        imprimir = imprimir_json and (resultado.get("sucesso") or resultado.get("parcial"))
+        if salvar or imprimir:
+            conteudo = serializar_resultado(resultado)
+            if salvar:
+                self._salvar_resultado_json(conteudo)
+            if imprimir:
+                self._imprimir_resultado(conteudo)
+        return resultado
+    
+    def _processar_pdf_completo(self, fonte: Union[str, bytes], nome_arquivo: str,
+                                instrumentacao: Instrumentacao, texto: bool = False) -> Dict[str, Any]:
         print("=" * 60)
         
-        # Extrair tabela
-        tabela_extraida = self.extrair_tabela_do_pdf(caminho_do_arquivo_pdf)
+        # O PDF é lido e hasheado uma vez: chave do cache e do índice de receitas (gravada em
+        # metadados para o --reindexar usar a mesma)
+        hash_pdf = self._hash_pdf(fonte)
+        
+        # Resultado já processado para o mesmo conteúdo (e mesma versão do processador)
+        with instrumentacao.etapa("consulta_cache"):
+            chave_cache = self._chave_cache(hash_pdf, texto)
+            resultado = self.cache.obter(chave_cache) if chave_cache else None
+        if resultado is not None:
+            resultado["metadados"]["arquivo_original"] = nome_arquivo
+            resultado["metadados"]["cache"] = True
+            resultado["metadados"]["sha256_pdf"] = hash_pdf
+            self._indexar_receitas(hash_pdf, nome_arquivo, resultado["refeicoes"], instrumentacao)
+            if instrumentacao.ativa:
+                resultado["metadados"]["instrumentacao"] = instrumentacao.resumo()
+            return resultado
+        
+        # Extrair tabela (páginas já vistas em outra versão do PDF vêm do cache de páginas)
+        revisao = {}
+        paginas_ignoradas = []
+        textos = [] if texto else None
+        monitor = MonitorMemoria(self.limite_memoria_mb * 1024 if self.limite_memoria_mb else None)
+        tabela_extraida = self.extrair_tabela_do_pdf(fonte, instrumentacao=instrumentacao, revisao=revisao,
+                                                     monitor=monitor, paginas_ignoradas=paginas_ignoradas,
+                                                     textos=textos)
         if not tabela_extraida:
+            if monitor.excedido:
+                return {"erro": f"Limite de memória de {self.limite_memoria_mb} MB excedido antes da primeira tabela",
+                        "metadados": {"memoria": monitor.resumo()}}
             return {"erro": "Não foi possível extrair tabela do PDF"}
         
         # Processar tabela
-        refeicoes_processadas = self.processar_tabela_cardapio(tabela_extraida)
+        with instrumentacao.etapa("processar_refeicoes"):
+            refeicoes_processadas = self.processar_tabela_cardapio(tabela_extraida)
         
         # Organizar por data
-        cardapio_por_data = self._organizar_por_data(refeicoes_processadas)
+        with instrumentacao.etapa("organizar_por_data"):
+            cardapio_por_data = self._organizar_por_data(refeicoes_processadas)
         
         # Gerar resultado final
         resultado = {
@@ -467,25 +1058,107 @@ class PDFCardapioProcessor:
             "refeicoes": refeicoes_processadas,
             "cardapio_por_data": cardapio_por_data,
             "tabela_bruta": tabela_extraida,  # Adicionar estrutura bruta da tabela
+            **({"texto_paginas": textos} if texto else {}),
             "metadados": {
-                "arquivo_original": os.path.basename(caminho_do_arquivo_pdf),
+                "arquivo_original": nome_arquivo,
                 "data_processamento": datetime.now().isoformat(),
                 "metodo": "pdfplumber",
-                "dimensoes_tabela": f"{len(tabela_extraida)} linhas x {len(tabela_extraida[0]) if tabela_extraida else 0} colunas"
+                "dimensoes_tabela": f"{len(tabela_extraida)} linhas x {len(tabela_extraida[0]) if tabela_extraida else 0} colunas",
+                "cache": False,
+                "paginas_ignoradas": paginas_ignoradas,
+                "sha256_pdf": hash_pdf
             }
         }
         
-        # Salvar arquivo JSON
-        self._salvar_resultado_json(resultado)
+        # Limite de memória: devolve o que foi extraído até ali, sem gravar cache, índice nem histórico
+        if monitor.excedido:
+            resultado = {
+                "sucesso": False,
+                "parcial": True,
+                "erro": (f"Limite de memória de {self.limite_memoria_mb} MB excedido na página "
+                         f"{monitor.paginas_processadas} de {monitor.paginas_total}"),
+                **{campo: valor for campo, valor in resultado.items() if campo != "sucesso"},
+            }
+            resultado["metadados"]["memoria"] = monitor.resumo()
+            if instrumentacao.ativa:
+                resultado["metadados"]["instrumentacao"] = instrumentacao.resumo()
+            return resultado
         
-        # Imprimir JSON de forma clara para o Node.js capturar
-        print("JSON_RESULTADO_START")
-        print(json.dumps(resultado, ensure_ascii=False, indent=2))
-        print("JSON_RESULTADO_END")
+        # Páginas reaproveitadas e datas/turnos alterados em relação à versão anterior
+        if "paginas" in revisao:
+            with instrumentacao.etapa("historico_versoes"):
+                resultado["metadados"]["revisao"] = self._resumo_revisao(nome_arquivo, revisao, refeicoes_processadas)
+        
+        self._indexar_receitas(hash_pdf, nome_arquivo, refeicoes_processadas, instrumentacao)
+        
+        if chave_cache:
+            with instrumentacao.etapa("gravacao_cache"):
+                self.cache.salvar(chave_cache, resultado, padrao=json_padrao)
+        
+        # Entra depois da gravação: o resultado em cache não carrega métricas de outra execução
+        resultado["metadados"]["memoria"] = monitor.resumo()
+        if instrumentacao.ativa:
+            resultado["metadados"]["instrumentacao"] = instrumentacao.resumo()
         
         return resultado
     
-    def _organizar_por_data(self, refeicoes: List[Dict[str, Any]]) -> Dict[str, List[Dict[str, Any]]]:
+    def _resumo_revisao(self, nome_arquivo: str, revisao: Dict[str, Any],
+                        refeicoes: List[Refeicao]) -> Dict[str, Any]:
+        paginas = revisao["paginas"]
+        resumo = {
+            "paginas": len(paginas),
+            "paginas_reaproveitadas": revisao.get("paginas_reaproveitadas", 0),
+            "versao_anterior": None,
+            "datas_alteradas": [],
+            "alteracoes": [],
+        }
+        if self.historico_versoes is not None:
+            resumo.update(self.historico_versoes.registrar(nome_arquivo, paginas, refeicoes) or {})
+        return resumo
+    
+    def _hash_pdf(self, fonte: Union[str, bytes]) -> Optional[str]:
+        """sha256 do conteúdo do PDF (None se o arquivo não puder ser lido)"""
+        if isinstance(fonte, bytes):
+            return hashlib.sha256(fonte).hexdigest()
+        try:
+            with open(fonte, 'rb') as f:
+                return hashlib.sha256(f.read()).hexdigest()
+        except OSError:
+            return None
+    
+    def _indexar_receitas(self, hash_pdf: Optional[str], nome_arquivo: str,
+                          refeicoes: Iterable[Dict[str, Any]], instrumentacao: Instrumentacao):
+        """Atualiza o índice de receitas com as refeições deste PDF (falhas não interrompem o processamento)"""
+        if self.indice_receitas is None or hash_pdf is None:
+            return
+        with instrumentacao.etapa("indice_receitas"):
+            try:
+                self.indice_receitas.registrar(hash_pdf, nome_arquivo, refeicoes)
+            except Exception as e:
+                print(f"❌ Erro ao atualizar índice de receitas: {str(e)}")
+    
+    def _chave_cache(self, hash_pdf: Optional[str], texto: bool = False) -> Optional[str]:
+        """Chave do cache a partir do sha256 do PDF (None sem cache ou se o arquivo não pôde ser lido)"""
+        if not self.cache or hash_pdf is None:
+            return None
+        # Resultados com texto_paginas ficam numa entrada própria
+        versao = f"{VERSAO_PROCESSADOR}-texto" if texto else VERSAO_PROCESSADOR
+        return CacheResultados.calcular_chave(hash_pdf, versao)
+    
+    def _imprimir_resultado(self, conteudo: bytes):
+        """Imprime o JSON já serializado, numa linha, entre os marcadores que o Node.js procura"""
+        print("JSON_RESULTADO_START")
+        saida = getattr(sys.stdout, "buffer", None)
+        if saida is None:
+            # stdout redirecionado para um objeto só de texto (StringIO)
+            print(conteudo.decode("utf-8"))
+        else:
+            sys.stdout.flush()
+            saida.write(conteudo + b"\n")
+            saida.flush()
+        print("JSON_RESULTADO_END")
+    
+    def _organizar_por_data(self, refeicoes: List[Refeicao]) -> Dict[str, List[Refeicao]]:
         """Organiza refeições por data"""
         cardapio_por_data = {}
         
@@ -493,9 +1166,9 @@ class PDFCardapioProcessor:
             data = refeicao.get('data', '')
             # Se a data estiver vazia, tentar extrair do texto original
             if not data and refeicao.get('texto_original'):
-                match = re.search(r'(\d{1,2}/\d{1,2}/\d{4})', refeicao['texto_original'])
-                if match:
-                    data = match.group(1)
+                data_texto = self.classificar_celula(refeicao['texto_original']).data
+                if data_texto:
+                    data = data_texto
                     refeicao['data'] = data
             
             if data not in cardapio_por_data:
@@ -504,37 +1177,260 @@ class PDFCardapioProcessor:
         
         return cardapio_por_data
     
-    def _salvar_resultado_json(self, resultado: Dict[str, Any]):
-        """Salva o resultado em arquivo JSON"""
-        timestamp = datetime.now().strftime("%Y-%m-%dT%H-%M-%S")
-        filename = f"cardapio-pdfplumber-{timestamp}.json"
-        filepath = os.path.join(self.downloads_dir, filename)
+    def _salvar_resultado_json(self, conteudo: bytes):
+        """
+        Salva o resultado já serializado em downloads_dir (cardapio-pdfplumber-*.json.gz)
         
+        Compressão, escrita e retenção ficam com o gravador em segundo plano.
+        """
         try:
-            with open(filepath, 'w', encoding='utf-8') as f:
-                json.dump(resultado, f, ensure_ascii=False, indent=2)
+            obter_gravador_resultados(self.downloads_dir).gravar(conteudo)
         except Exception as e:
             print(f"❌ Erro ao salvar resultado: {str(e)}")
 
 # Função principal para uso externo
-def processar_cardapio_pdf(caminho_do_arquivo_pdf: str) -> Dict[str, Any]:
+def processar_cardapio_pdf(caminho_do_arquivo_pdf: FontePDF, workers_paginas: Optional[int] = None,
+                           instrumentar: Optional[bool] = None, nome_arquivo: Optional[str] = None,
+                           compacto: bool = False, tabela_bruta: bool = False, texto: bool = False) -> Dict[str, Any]:
     """
     Função principal para processar PDF de cardápio
     
     Args:
-        caminho_do_arquivo_pdf: Caminho para o arquivo PDF
+        caminho_do_arquivo_pdf: Caminho, bytes ou arquivo binário do PDF
+        workers_paginas: Processos para extração paralela de páginas (1 = sequencial)
+        instrumentar: Inclui tempos e pico de memória por etapa em metadados
+        nome_arquivo: Nome gravado em metadados quando o PDF não vem de um caminho
+        compacto: Resultado no formato compacto (ver formato_resultado.py)
+        tabela_bruta: Inclui tabela_bruta no formato compacto
+        texto: Inclui o texto de cada página (texto_paginas)
         
     Returns:
         Dicionário com dados processados
     """
+    processor = PDFCardapioProcessor(workers_paginas=workers_paginas, instrumentar=instrumentar)
+    return processor.processar_pdf_completo(caminho_do_arquivo_pdf, nome_arquivo=nome_arquivo,
+                                            compacto=compacto, tabela_bruta=tabela_bruta, texto=texto)
+
+def emitir_refeicoes_ndjson(caminho_do_arquivo_pdf: FontePDF, saida=None) -> int:
+    """
+    Escreve uma refeição por linha (NDJSON) à medida que as páginas são processadas
+    
+    Args:
+        caminho_do_arquivo_pdf: Caminho, bytes ou arquivo binário do PDF
+        saida: Stream de saída (padrão: stdout)
+        
+    Returns:
+        Código de saída do processo (0 = sucesso)
+    """
+    saida = saida or sys.stdout
     processor = PDFCardapioProcessor()
-    return processor.processar_pdf_completo(caminho_do_arquivo_pdf)
+    try:
+        for refeicao in processor.iterar_refeicoes_pdf(caminho_do_arquivo_pdf):
+            saida.write(json.dumps(refeicao.para_dict(), ensure_ascii=False) + "\n")
+            saida.flush()
+    except Exception as e:
+        saida.write(json.dumps({"erro": f"Falha ao processar PDF: {str(e)}"}, ensure_ascii=False) + "\n")
+        saida.flush()
+        return 1
+    return 0
+
+def expandir_entradas_lote(entradas: Iterable[str]) -> List[str]:
+    """
+    Lista os PDFs de caminhos, diretórios (recursivo) e globs, sem repetições
+    
+    Args:
+        entradas: Arquivos, diretórios ou padrões glob (ex: "cardapios/**/*.pdf")
+        
+    Returns:
+        Caminhos dos PDFs, na ordem das entradas (cada diretório/glob ordenado)
+    """
+    arquivos = []
+    for entrada in entradas:
+        if os.path.isdir(entrada):
+            encontrados = sorted(
+                os.path.join(raiz, nome)
+                for raiz, _, nomes in os.walk(entrada)
+                for nome in nomes if nome.lower().endswith(".pdf")
+            )
+        elif glob.has_magic(entrada):
+            encontrados = sorted(c for c in glob.glob(entrada, recursive=True) if os.path.isfile(c))
+        else:
+            encontrados = [entrada]
+        arquivos.extend(encontrados)
+    return list(dict.fromkeys(arquivos))
+
+
+# Um processador por processo do pool (regex, classificações e cache reaproveitados entre arquivos)
+_processador_lote: Optional["PDFCardapioProcessor"] = None
+
+
+def _processar_arquivo_lote(caminho: str, destino: str) -> Dict[str, Any]:
+    """Processa um PDF do lote no processo do pool e grava o resultado em destino"""
+    global _processador_lote
+    if _processador_lote is None:
+        _processador_lote = PDFCardapioProcessor()
+    
+    item = {"arquivo": caminho, "saida": destino}
+    inicio = time.perf_counter()
+    try:
+        # Logs do processador no stderr: o stdout do lote fica com o progresso
+        with contextlib.redirect_stdout(sys.stderr):
+            resultado = _processador_lote.processar_pdf_completo(caminho, imprimir_json=False, salvar_json=False)
+        if not resultado.get("sucesso"):
+            raise ValueError(resultado.get("erro", "Falha ao processar PDF"))
+        
+        # Gravação atômica: um resultado interrompido não conta como processado
+        temporario = f"{destino}.{os.getpid()}.tmp"
+        with open(temporario, "w", encoding="utf-8") as f:
+            json.dump(resultado, f, ensure_ascii=False, indent=2, default=json_padrao)
+        os.replace(temporario, destino)
+        
+        item.update({
+            "status": "processado",
+            "paginas": sum(1 for linha in resultado["tabela_bruta"]
+                           if linha and linha[0] and linha[0].startswith("PAGE_MARKER_")),
+            "refeicoes": resultado["total_refeicoes"],
+            "cache": resultado["metadados"]["cache"],
+        })
+    except Exception as e:
+        item.update({"status": "erro", "erro": str(e)})
+    item["segundos"] = round(time.perf_counter() - inicio, 3)
+    return item
+
+
+def _destinos_lote(arquivos: List[str], diretorio_saida: str) -> List[str]:
+    """Um JSON por PDF; nomes repetidos em diretórios diferentes recebem sufixo -2, -3..."""
+    usados: Dict[str, int] = {}
+    destinos = []
+    for caminho in arquivos:
+        base = os.path.splitext(os.path.basename(caminho))[0]
+        usados[base] = usados.get(base, 0) + 1
+        nome = base if usados[base] == 1 else f"{base}-{usados[base]}"
+        destinos.append(os.path.join(diretorio_saida, f"{nome}.json"))
+    return destinos
+
+
+def processar_lote(entradas: Iterable[str], diretorio_saida: str, processos: Optional[int] = None,
+                   reprocessar: bool = False) -> Dict[str, Any]:
+    """
+    Processa vários PDFs em um pool de processos
+    
+    Grava um JSON por PDF e o resumo consolidado (resumo_lote.json) em
+    diretorio_saida. PDFs cujo resultado já existe e é mais novo que o PDF
+    são ignorados, a menos que reprocessar=True.
+    
+    Args:
+        entradas: Arquivos, diretórios ou padrões glob
+        diretorio_saida: Diretório dos resultados
+        processos: Tamanho do pool (padrão: número de CPUs)
+        reprocessar: Processa de novo mesmo com resultado atualizado
+        
+    Returns:
+        Resumo do lote, com vazão em arquivos e páginas por segundo
+    """
+    os.makedirs(diretorio_saida, exist_ok=True)
+    arquivos = expandir_entradas_lote(entradas)
+    destinos = _destinos_lote(arquivos, diretorio_saida)
+    
+    itens: List[Dict[str, Any]] = []
+    pendentes = []
+    for caminho, destino in zip(arquivos, destinos):
+        if not os.path.isfile(caminho):
+            itens.append({"arquivo": caminho, "saida": destino, "status": "erro", "erro": "Arquivo não encontrado"})
+        elif (not reprocessar and os.path.exists(destino)
+              and os.path.getmtime(destino) >= os.path.getmtime(caminho)):
+            itens.append({"arquivo": caminho, "saida": destino, "status": "ignorado"})
+        else:
+            pendentes.append((caminho, destino))
+    
+    processos = max(1, min(processos or os.cpu_count() or 1, len(pendentes) or 1))
+    inicio = time.perf_counter()
+    if processos == 1:
+        concluidos = (_processar_arquivo_lote(caminho, destino) for caminho, destino in pendentes)
+    else:
+        executor = ProcessPoolExecutor(max_workers=processos)
+        futuros = [executor.submit(_processar_arquivo_lote, caminho, destino) for caminho, destino in pendentes]
+        concluidos = (futuro.result() for futuro in as_completed(futuros))
+    try:
+        for n, item in enumerate(concluidos, start=1):
+            itens.append(item)
+            if item["status"] == "processado":
+                print(f"✅ [{n}/{len(pendentes)}] {item['arquivo']}: {item['paginas']} páginas, "
+                      f"{item['refeicoes']} refeições em {item['segundos']}s")
+            else:
+                print(f"❌ [{n}/{len(pendentes)}] {item['arquivo']}: {item['erro']}")
+    finally:
+        if processos > 1:
+            executor.shutdown()
+    duracao = time.perf_counter() - inicio
+    
+    # Resumo na ordem das entradas, independente da ordem de conclusão
+    ordem = {caminho: i for i, caminho in enumerate(arquivos)}
+    itens.sort(key=lambda item: ordem[item["arquivo"]])
+    processados = [item for item in itens if item["status"] == "processado"]
+    paginas = sum(item["paginas"] for item in processados)
+    resumo = {
+        "total_arquivos": len(itens),
+        "processados": len(processados),
+        "ignorados": sum(1 for item in itens if item["status"] == "ignorado"),
+        "erros": sum(1 for item in itens if item["status"] == "erro"),
+        "paginas": paginas,
+        "refeicoes": sum(item["refeicoes"] for item in processados),
+        "processos": processos,
+        "segundos": round(duracao, 3),
+        "arquivos_por_segundo": round(len(processados) / duracao, 3) if duracao > 0 else 0.0,
+        "paginas_por_segundo": round(paginas / duracao, 3) if duracao > 0 else 0.0,
+        "data_processamento": datetime.now().isoformat(),
+        "arquivos": itens,
+    }
+    with open(os.path.join(diretorio_saida, "resumo_lote.json"), "w", encoding="utf-8") as f:
+        json.dump(resumo, f, ensure_ascii=False, indent=2)
+    return resumo
 
 if __name__ == "__main__":
     # Teste local
-    import sys
-    if len(sys.argv) > 1:
-        pdf_path = sys.argv[1]
-        resultado = processar_cardapio_pdf(pdf_path)
+    import argparse
+    parser = argparse.ArgumentParser(description="Processa um PDF de cardápio",
+                                     usage="python pdf_processor.py <caminho_do_pdf | -> [--workers N] [--ndjson] [--instrumentar] [--nome NOME] [--compacto [--tabela-bruta]] [--texto]\n"
+                                           "       python pdf_processor.py --lote DIR_SAIDA <pdfs, diretórios ou globs...> [--processos N] [--reprocessar]")
+    parser.add_argument("pdf_path", nargs="*", help="Caminho do PDF ou '-' para ler o PDF do stdin (com --lote: vários PDFs, diretórios ou globs)")
+    parser.add_argument("--workers", type=int, default=None,
+                        help="Processos para extrair páginas em paralelo (padrão: PDF_WORKERS_PAGINAS ou 1)")
+    parser.add_argument("--ndjson", action="store_true",
+                        help="Emite uma refeição por linha assim que cada página é processada")
+    parser.add_argument("--instrumentar", action="store_true", default=None,
+                        help="Inclui tempos e pico de memória por etapa/página em metadados")
+    parser.add_argument("--nome", default=None,
+                        help="Nome do arquivo gravado em metadados (útil com '-')")
+    parser.add_argument("--compacto", action="store_true",
+                        help="Imprime o resultado no formato compacto (refeições uma vez, índices por data)")
+    parser.add_argument("--tabela-bruta", action="store_true",
+                        help="Com --compacto, inclui tabela_bruta")
+    parser.add_argument("--texto", action="store_true",
+                        help="Inclui texto_paginas (texto de cada página) no resultado")
+    parser.add_argument("--lote", metavar="DIR_SAIDA", default=None,
+                        help="Processa vários PDFs e grava um JSON por arquivo e resumo_lote.json em DIR_SAIDA")
+    parser.add_argument("--processos", type=int, default=None,
+                        help="Processos do lote (padrão: número de CPUs)")
+    parser.add_argument("--reprocessar", action="store_true",
+                        help="No lote, processa também os PDFs com resultado já gravado")
+    args = parser.parse_args()
+    if args.lote:
+        resumo = processar_lote(args.pdf_path, args.lote, processos=args.processos, reprocessar=args.reprocessar)
+        print(f"📦 {resumo['processados']} processados, {resumo['ignorados']} ignorados, {resumo['erros']} com erro "
+              f"em {resumo['segundos']}s ({resumo['arquivos_por_segundo']} arquivos/s, "
+              f"{resumo['paginas_por_segundo']} páginas/s)")
+        sys.exit(1 if resumo["erros"] else 0)
+    if len(args.pdf_path) > 1:
+        parser.error("vários PDFs exigem --lote DIR_SAIDA")
+    args.pdf_path = args.pdf_path[0] if args.pdf_path else None
+    # '-' lê o PDF do stdin, sem arquivo temporário
+    fonte = sys.stdin.buffer.read() if args.pdf_path == "-" else args.pdf_path
+    if args.pdf_path and args.ndjson:
+        sys.exit(emitir_refeicoes_ndjson(fonte))
+    elif args.pdf_path:
+        resultado = processar_cardapio_pdf(fonte, workers_paginas=args.workers, instrumentar=args.instrumentar,
+                                           nome_arquivo=args.nome, compacto=args.compacto,
+                                           tabela_bruta=args.tabela_bruta, texto=args.texto)
     else:
-        print("Uso: python pdf_processor.py <caminho_do_pdf>")
+        parser.print_usage()
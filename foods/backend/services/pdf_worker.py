@@ -0,0 +1,227 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Worker persistente do processador de PDFs de cardápio
+Mantém o interpretador, o pdfplumber e as regex carregados e atende vários
+PDFs em sequência, via stdin/stdout (JSON por linha) ou socket Unix local.
+"saude" é respondida na hora, mesmo com um PDF em processamento.
+"""
+
+import argparse
+import base64
+import binascii
+import contextlib
+import json
+import os
+import queue
+import socketserver
+import sys
+import threading
+import time
+from datetime import datetime
+from typing import Dict, Any, Optional
+
+from formato_resultado import json_padrao
+from memoizacao import estatisticas as estatisticas_memoizacao
+from pdf_processor import PDFCardapioProcessor
+
+
+class PDFCardapioWorker:
+    """Atende requisições JSON reaproveitando um único PDFCardapioProcessor"""
+
+    def __init__(self):
+        self.processor = PDFCardapioProcessor()
+        self.iniciado_em = time.time()
+        self.requisicoes = 0
+        self.erros = 0
+        self._lock = threading.Lock()
+
+    def saude(self) -> Dict[str, Any]:
+        """Retorna o estado do worker, o total de requisições atendidas e o uso do cache e da memoização"""
+        return {
+            "status": "ok",
+            "pid": os.getpid(),
+            "requisicoes": self.requisicoes,
+            "erros": self.erros,
+            "iniciado_em": datetime.fromtimestamp(self.iniciado_em).isoformat(),
+            "uptime_segundos": round(time.time() - self.iniciado_em, 3),
+            "processando": self._lock.locked(),
+            "cache": self.processor.cache.estatisticas() if self.processor.cache else None,
+            "memoizacao": estatisticas_memoizacao()
+        }
+
+    def consultar_receitas(self, mensagem: Dict[str, Any]) -> Dict[str, Any]:
+        """Ocorrências de um código de receita e/ou data no índice"""
+        indice = self.processor.indice_receitas
+        if indice is None:
+            return {"sucesso": False, "erro": "Índice de receitas desativado"}
+        try:
+            ocorrencias = indice.consultar(mensagem.get("codigo"), mensagem.get("data"),
+                                           int(mensagem.get("limite") or 1000))
+        except ValueError as e:
+            return {"sucesso": False, "erro": str(e)}
+        return {"sucesso": True, "ocorrencias": ocorrencias, "total": len(ocorrencias)}
+
+    def atender(self, mensagem: Dict[str, Any]) -> Dict[str, Any]:
+        """
+        Executa uma requisição do protocolo
+
+        Args:
+            mensagem: {"id": ..., "acao": "processar" | "consultar_receitas" | "saude" | "encerrar",
+                       "instrumentar": bool, "pdf_base64": conteúdo do PDF, "nome": nome do arquivo}
+                      (ou "caminho" de um PDF em disco); "formato": "compacto" e "tabela_bruta": bool
+                      pedem o formato compacto; "texto": bool inclui texto_paginas;
+                      consultar_receitas recebe "codigo" e/ou "data"
+
+        Returns:
+            Resposta com o mesmo id da requisição
+        """
+        acao = mensagem.get("acao", "processar")
+        resposta = {"id": mensagem.get("id")}
+
+        if acao == "saude":
+            resposta.update(self.saude())
+            return resposta
+
+        if acao == "encerrar":
+            resposta["status"] = "encerrando"
+            return resposta
+
+        if acao == "consultar_receitas":
+            resposta.update(self.consultar_receitas(mensagem))
+            return resposta
+
+        if acao != "processar":
+            resposta.update({"sucesso": False, "erro": f"Ação desconhecida: {acao}"})
+            return resposta
+
+        # O PDF vem em memória (sem arquivo temporário) ou por caminho
+        fonte = mensagem.get("caminho")
+        if mensagem.get("pdf_base64"):
+            try:
+                fonte = base64.b64decode(mensagem["pdf_base64"], validate=True)
+            except (binascii.Error, ValueError) as e:
+                resposta.update({"sucesso": False, "erro": f"pdf_base64 inválido: {str(e)}"})
+                return resposta
+        if not fonte:
+            resposta.update({"sucesso": False, "erro": "Campo 'pdf_base64' ou 'caminho' é obrigatório"})
+            return resposta
+
+        # Um PDF por vez: o processamento é limitado por CPU
+        with self._lock:
+            self.requisicoes += 1
+            try:
+                # Logs do processador vão para o stderr para não misturar com o protocolo
+                with contextlib.redirect_stdout(sys.stderr):
+                    resultado = self.processor.processar_pdf_completo(
+                        fonte, imprimir_json=False, instrumentar=mensagem.get("instrumentar"),
+                        nome_arquivo=mensagem.get("nome"), compacto=mensagem.get("formato") == "compacto",
+                        tabela_bruta=bool(mensagem.get("tabela_bruta")), texto=bool(mensagem.get("texto")))
+                # Falhas do processador voltam como {"erro": ...}, sem "sucesso"; parciais com sucesso False
+                sucesso = resultado.get("sucesso", "erro" not in resultado)
+                resposta.update({"sucesso": sucesso, "resultado": resultado})
+                if not sucesso:
+                    self.erros += 1
+                    resposta["erro"] = resultado.get("erro", "Falha ao processar PDF")
+            except Exception as e:
+                self.erros += 1
+                resposta.update({"sucesso": False, "erro": str(e)})
+        return resposta
+
+    def atender_linha(self, linha: str) -> Optional[Dict[str, Any]]:
+        """Decodifica uma linha JSON e devolve a resposta (None para linhas vazias)"""
+        linha = linha.strip()
+        if not linha:
+            return None
+        try:
+            mensagem = json.loads(linha)
+        except ValueError as e:
+            return {"id": None, "sucesso": False, "erro": f"JSON inválido: {str(e)}"}
+        return self.atender(mensagem)
+
+    def servir_stdin(self):
+        """
+        Lê requisições do stdin e escreve uma resposta JSON por linha no stdout
+
+        As requisições são atendidas em ordem por uma thread; "saude" é
+        respondida direto pela leitura, sem esperar o PDF em processamento.
+        """
+        # O processamento redireciona sys.stdout para o stderr: as respostas usam o stdout original
+        saida = sys.stdout
+        lock_saida = threading.Lock()
+        fila: "queue.Queue[Dict[str, Any]]" = queue.Queue()
+
+        def responder(resposta: Dict[str, Any]):
+            with lock_saida:
+                saida.write(json.dumps(resposta, ensure_ascii=False, separators=(",", ":"), default=json_padrao) + "\n")
+                saida.flush()
+
+        def trabalhar():
+            while True:
+                mensagem = fila.get()
+                try:
+                    responder(self.atender(mensagem))
+                finally:
+                    fila.task_done()
+
+        threading.Thread(target=trabalhar, name="pdf-worker", daemon=True).start()
+        for linha in sys.stdin:
+            linha = linha.strip()
+            if not linha:
+                continue
+            try:
+                mensagem = json.loads(linha)
+            except ValueError as e:
+                responder({"id": None, "sucesso": False, "erro": f"JSON inválido: {str(e)}"})
+                continue
+            acao = mensagem.get("acao", "processar")
+            if acao == "saude":
+                responder(self.atender(mensagem))
+            elif acao == "encerrar":
+                fila.join()
+                responder(self.atender(mensagem))
+                return
+            else:
+                fila.put(mensagem)
+        # Fim do stdin: termina o que já foi recebido
+        fila.join()
+
+    def servir_socket(self, caminho_socket: str):
+        """Atende conexões em um socket Unix local, uma requisição JSON por linha"""
+        worker = self
+
+        class _Handler(socketserver.StreamRequestHandler):
+            def handle(self):
+                for linha in self.rfile:
+                    resposta = worker.atender_linha(linha.decode("utf-8"))
+                    if resposta is None:
+                        continue
+                    self.wfile.write((json.dumps(resposta, ensure_ascii=False, separators=(",", ":"), default=json_padrao) + "\n").encode("utf-8"))
+                    self.wfile.flush()
+                    if resposta.get("status") == "encerrando":
+                        threading.Thread(target=self.server.shutdown, daemon=True).start()
+                        break
+
+        if os.path.exists(caminho_socket):
+            os.unlink(caminho_socket)
+
+        with socketserver.ThreadingUnixStreamServer(caminho_socket, _Handler) as servidor:
+            servidor.daemon_threads = True
+            print(f"🐍 Worker PDF ouvindo em {caminho_socket}", file=sys.stderr)
+            try:
+                servidor.serve_forever()
+            finally:
+                if os.path.exists(caminho_socket):
+                    os.unlink(caminho_socket)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Worker persistente de processamento de cardápios")
+    parser.add_argument("--socket", help="Caminho do socket Unix (padrão: stdin/stdout)")
+    args = parser.parse_args()
+
+    worker = PDFCardapioWorker()
+    if args.socket:
+        worker.servir_socket(args.socket)
+    else:
+        worker.servir_stdin()
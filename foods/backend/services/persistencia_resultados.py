@@ -0,0 +1,173 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Cópias em disco dos resultados processados, fora do caminho crítico
+O processamento só entrega os bytes do JSON compacto a uma fila; uma thread
+comprime (gzip), grava de forma atômica e aplica a retenção por quantidade,
+idade e tamanho total, a partir dos arquivos registrados a cada gravação (o
+diretório só é relido periodicamente). Na saída do processo a fila é
+esvaziada antes de encerrar.
+"""
+
+import atexit
+import gzip
+import os
+import queue
+import threading
+import time
+from collections import OrderedDict
+from datetime import datetime
+from typing import Any, Dict, Optional, Tuple
+
+from cache_resultados import INTERVALO_VARREDURA_SEGUNDOS
+
+PREFIXO_ARQUIVO = "cardapio-pdfplumber-"
+# Limite da fila: acima dele a gravação mais antiga pendente é descartada
+MAX_PENDENTES = 64
+
+
+class GravadorResultados:
+    """Grava resultados serializados em segundo plano (gzip + rotação)"""
+
+    def __init__(self, diretorio: str, max_arquivos: int = 500, max_idade_segundos: int = 30 * 24 * 3600,
+                 max_bytes: int = 512 * 1024 * 1024, nivel_compressao: int = 6):
+        """
+        Args:
+            diretorio: Onde os arquivos cardapio-pdfplumber-*.json.gz ficam
+            max_arquivos: Quantidade máxima de arquivos mantidos (0 = sem limite)
+            max_idade_segundos: Idade máxima de um arquivo (0 = sem limite)
+            max_bytes: Tamanho total máximo dos arquivos (0 = sem limite)
+            nivel_compressao: Nível do gzip (1 = mais rápido, 9 = menor)
+        """
+        self.diretorio = diretorio
+        self.max_arquivos = max_arquivos
+        self.max_idade_segundos = max_idade_segundos
+        self.max_bytes = max_bytes
+        self.nivel_compressao = nivel_compressao
+        self._fila: "queue.Queue[Optional[Tuple[str, bytes]]]" = queue.Queue(maxsize=MAX_PENDENTES)
+        self._lock = threading.Lock()
+        self._thread: Optional[threading.Thread] = None
+        self._pid: Optional[int] = None
+        self._estatisticas = {"enfileirados": 0, "gravados": 0, "descartados": 0, "erros": 0, "removidos": 0}
+        # Arquivos gravados, do mais antigo ao mais novo: caminho → (mtime, tamanho); só a thread mexe
+        self._arquivos: "OrderedDict[str, Tuple[float, int]]" = OrderedDict()
+        self._bytes = 0
+        self._ultima_varredura = 0.0
+
+    def gravar(self, conteudo: bytes) -> str:
+        """
+        Enfileira o JSON já serializado; a compressão e a escrita acontecem na thread
+
+        Returns:
+            Caminho do arquivo que será gravado
+        """
+        nome = f"{PREFIXO_ARQUIVO}{datetime.now().strftime('%Y-%m-%dT%H-%M-%S-%f')}.json.gz"
+        caminho = os.path.join(self.diretorio, nome)
+        with self._lock:
+            self._iniciar_thread()
+            self._estatisticas["enfileirados"] += 1
+            while True:
+                try:
+                    self._fila.put_nowait((caminho, conteudo))
+                    break
+                except queue.Full:
+                    # Disco lento: perde-se a cópia mais antiga, nunca o tempo de quem chamou
+                    try:
+                        self._fila.get_nowait()
+                        self._fila.task_done()
+                        self._estatisticas["descartados"] += 1
+                    except queue.Empty:
+                        pass
+        return caminho
+
+    def aguardar(self):
+        """Bloqueia até todas as gravações pendentes terminarem"""
+        if self._thread is not None and self._pid == os.getpid():
+            self._fila.join()
+
+    def estatisticas(self) -> Dict[str, Any]:
+        with self._lock:
+            return {**self._estatisticas, "pendentes": self._fila.qsize(), "diretorio": self.diretorio}
+
+    def _iniciar_thread(self):
+        # Threads não sobrevivem ao fork: cada processo inicia a sua
+        if self._pid == os.getpid():
+            return
+        self._pid = os.getpid()
+        self._fila = queue.Queue(maxsize=MAX_PENDENTES)
+        # A primeira retenção do processo relê o diretório
+        self._ultima_varredura = 0.0
+        self._thread = threading.Thread(target=self._trabalhar, name="gravador-resultados", daemon=True)
+        self._thread.start()
+        atexit.register(self.aguardar)
+
+    def _trabalhar(self):
+        while True:
+            caminho, conteudo = self._fila.get()
+            try:
+                self._escrever(caminho, conteudo)
+                self._aplicar_retencao()
+            except Exception as e:
+                with self._lock:
+                    self._estatisticas["erros"] += 1
+                print(f"❌ Erro ao salvar resultado: {str(e)}")
+            finally:
+                self._fila.task_done()
+
+    def _escrever(self, caminho: str, conteudo: bytes):
+        os.makedirs(self.diretorio, exist_ok=True)
+        caminho_temporario = f"{caminho}.{os.getpid()}.tmp"
+        with open(caminho_temporario, "wb") as f:
+            f.write(gzip.compress(conteudo, compresslevel=self.nivel_compressao, mtime=0))
+        os.replace(caminho_temporario, caminho)
+        info = os.stat(caminho)
+        self._arquivos[caminho] = (info.st_mtime, info.st_size)
+        self._bytes += info.st_size
+        with self._lock:
+            self._estatisticas["gravados"] += 1
+
+    def _varrer_disco(self):
+        """Relê o diretório (arquivos de outros processos ou removidos por fora)"""
+        arquivos = []
+        for nome in os.listdir(self.diretorio):
+            if not nome.startswith(PREFIXO_ARQUIVO) or nome.endswith(".tmp"):
+                continue
+            caminho = os.path.join(self.diretorio, nome)
+            try:
+                info = os.stat(caminho)
+            except OSError:
+                continue
+            arquivos.append((info.st_mtime, info.st_size, caminho))
+        arquivos.sort()
+        self._arquivos = OrderedDict((caminho, (mtime, tamanho)) for mtime, tamanho, caminho in arquivos)
+        self._bytes = sum(tamanho for _, tamanho, _ in arquivos)
+        self._ultima_varredura = time.time()
+
+    def _aplicar_retencao(self):
+        """
+        Remove os arquivos vencidos e, dos mais antigos para os mais novos, o que passar dos limites
+
+        Usa o registro mantido a cada gravação; o diretório só é relido a cada
+        INTERVALO_VARREDURA_SEGUNDOS.
+        """
+        agora = time.time()
+        if agora - self._ultima_varredura > INTERVALO_VARREDURA_SEGUNDOS:
+            self._varrer_disco()
+        while self._arquivos:
+            caminho, (mtime, _) = next(iter(self._arquivos.items()))
+            vencido = self.max_idade_segundos and agora - mtime > self.max_idade_segundos
+            excedente = self.max_arquivos and len(self._arquivos) > self.max_arquivos
+            grande = self.max_bytes and self._bytes > self.max_bytes
+            if not (vencido or excedente or grande):
+                break
+            self._remover(caminho)
+
+    def _remover(self, caminho: str):
+        _, tamanho = self._arquivos.pop(caminho, (0.0, 0))
+        self._bytes -= tamanho
+        try:
+            os.unlink(caminho)
+            with self._lock:
+                self._estatisticas["removidos"] += 1
+        except OSError:
+            pass
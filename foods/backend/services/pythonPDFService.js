@@ -1,16 +1,287 @@
-const { spawn } = require('child_process');
+const { spawn, execFile } = require('child_process');
 const path = require('path');
-const fs = require('fs');
+
+/**
+ * Processo Python de longa duração (pdf_worker.py) que atende vários PDFs
+ * sem pagar a inicialização do interpretador e do pdfplumber a cada upload.
+ * Uma requisição JSON por linha no stdin, uma resposta JSON por linha no stdout.
+ * O worker processa um PDF por vez: as requisições esperam numa fila aqui no
+ * Node e o timeout só começa a contar quando a requisição é enviada.
+ */
+class PythonPDFWorker {
+    constructor(pythonBinPath, workerScriptPath) {
+        this.pythonBinPath = pythonBinPath;
+        this.workerScriptPath = workerScriptPath;
+        this.timeoutMs = parseInt(process.env.PYTHON_PDF_WORKER_TIMEOUT_MS || '120000', 10);
+        this.timeoutSaudeMs = parseInt(process.env.PYTHON_PDF_WORKER_SAUDE_TIMEOUT_MS || '5000', 10);
+        this.processo = null;
+        // Requisições esperando a vez (uma em processamento por vez no worker)
+        this.fila = [];
+        this.emAndamento = false;
+        // Requisições em andamento do processo atual (cada processo tem o seu mapa)
+        this.pendentes = new Map();
+        this.proximoId = 1;
+    }
+
+    iniciar() {
+        if (this.processo) {
+            return;
+        }
+
+        console.log('🐍 Iniciando worker Python persistente...');
+        const processo = spawn(this.pythonBinPath, [this.workerScriptPath], {
+            stdio: ['pipe', 'pipe', 'pipe']
+        });
+        // Estado deste processo: um processo antigo (encerrado por timeout) que ainda
+        // emita 'close' não mexe no processo novo nem nas requisições dele
+        const pendentes = new Map();
+        let bufferSaida = '';
+        let ultimoStderr = '';
+
+        // Decodifica o fluxo inteiro: caracteres UTF-8 divididos entre chunks não viram U+FFFD
+        processo.stdout.setEncoding('utf8');
+        processo.stdout.on('data', (data) => {
+            bufferSaida += data;
+            let fimLinha = bufferSaida.indexOf('\n');
+            while (fimLinha !== -1) {
+                const linha = bufferSaida.substring(0, fimLinha).trim();
+                bufferSaida = bufferSaida.substring(fimLinha + 1);
+                if (linha) {
+                    this.tratarResposta(pendentes, linha);
+                }
+                fimLinha = bufferSaida.indexOf('\n');
+            }
+        });
+
+        processo.stderr.on('data', (data) => {
+            ultimoStderr = (ultimoStderr + data.toString()).slice(-4000);
+        });
+
+        processo.on('close', (code) => {
+            if (this.processo === processo) {
+                this.processo = null;
+            }
+            this.rejeitarPendentes(pendentes, new Error(`Worker Python encerrado (código ${code}): ${ultimoStderr}`));
+        });
+
+        processo.on('error', (err) => {
+            if (this.processo === processo) {
+                this.processo = null;
+            }
+            this.rejeitarPendentes(pendentes, err);
+        });
+
+        processo.stdin.on('error', (err) => {
+            // EPIPE quando o worker morre com requisições em andamento; tratado no 'close'
+            ultimoStderr = (ultimoStderr + err.message).slice(-4000);
+        });
+
+        this.processo = processo;
+        this.pendentes = pendentes;
+    }
+
+    tratarResposta(pendentes, linha) {
+        let resposta;
+        try {
+            resposta = JSON.parse(linha);
+        } catch (e) {
+            // Linha fora do protocolo
+            return;
+        }
+
+        const pendente = pendentes.get(resposta.id);
+        if (!pendente) {
+            return;
+        }
+        clearTimeout(pendente.timer);
+        pendentes.delete(resposta.id);
+        pendente.resolve(resposta);
+    }
+
+    rejeitarPendentes(pendentes, err) {
+        for (const pendente of pendentes.values()) {
+            clearTimeout(pendente.timer);
+            pendente.reject(err);
+        }
+        pendentes.clear();
+    }
+
+    /**
+     * Enfileira uma requisição e aguarda a resposta com o mesmo id
+     * @param {Object} mensagem - Requisição ({ acao, pdf_base64, nome })
+     * @returns {Promise<Object>} Resposta do worker
+     */
+    enviar(mensagem) {
+        return new Promise((resolve, reject) => {
+            this.fila.push({ mensagem, resolve, reject });
+            this.despachar();
+        });
+    }
+
+    /**
+     * Envia a próxima requisição da fila se o worker estiver livre
+     */
+    despachar() {
+        if (this.emAndamento || this.fila.length === 0) {
+            return;
+        }
+        const { mensagem, resolve, reject } = this.fila.shift();
+        this.emAndamento = true;
+        let concluida = false;
+        const concluir = () => {
+            if (!concluida) {
+                concluida = true;
+                this.emAndamento = false;
+                this.despachar();
+            }
+        };
+
+        // Worker travado: encerra só este processo; a fila segue para um processo novo
+        this.transmitir(mensagem, this.timeoutMs, true).then(
+            (resposta) => { concluir(); resolve(resposta); },
+            (err) => { concluir(); reject(err); }
+        );
+    }
+
+    /**
+     * Escreve a requisição no worker e inicia o timeout a partir daqui
+     * @param {boolean} encerrarNoTimeout - Reinicia o worker se ele não responder
+     */
+    transmitir(mensagem, timeoutMs, encerrarNoTimeout) {
+        return new Promise((resolve, reject) => {
+            try {
+                this.iniciar();
+            } catch (err) {
+                reject(err);
+                return;
+            }
+
+            const processo = this.processo;
+            const pendentes = this.pendentes;
+            const id = this.proximoId++;
+            const timer = setTimeout(() => {
+                pendentes.delete(id);
+                reject(new Error(`Worker Python não respondeu em ${timeoutMs} ms`));
+                if (encerrarNoTimeout) {
+                    this.encerrar(processo);
+                }
+            }, timeoutMs);
+
+            pendentes.set(id, { resolve, reject, timer });
+            processo.stdin.write(JSON.stringify({ ...mensagem, id }) + '\n');
+        });
+    }
+
+    /**
+     * Retorna status e total de requisições atendidas pelo worker; não espera
+     * na fila (o worker responde mesmo com um PDF em processamento)
+     */
+    async saude() {
+        const resposta = await this.transmitir({ acao: 'saude' }, this.timeoutSaudeMs, false);
+        return { ...resposta, fila_node: this.fila.length, em_andamento: this.emAndamento };
+    }
+
+    /**
+     * Encerra o processo atual (ou `processo`, se ainda for o atual); as
+     * requisições dele são rejeitadas no 'close'
+     */
+    encerrar(processo = this.processo) {
+        if (processo && this.processo === processo) {
+            processo.kill();
+            this.processo = null;
+        }
+    }
+}
+
+// Worker único compartilhado por todas as instâncias do serviço
+let workerCompartilhado = null;
+
+const FORMATO_COMPACTO = 'compacto-v1';
+
+/**
+ * Reconstrói refeicoes/cardapio_por_data a partir do formato compacto do
+ * Python (refeições uma vez, índices para datas, turnos e receitas)
+ * @param {Object} compacto - Resultado no formato compacto
+ * @returns {Object} Resultado no formato completo
+ */
+function expandirResultadoCompacto(compacto) {
+    if (!compacto || compacto.formato !== FORMATO_COMPACTO) {
+        return compacto;
+    }
+
+    const { datas, turnos, receitas } = compacto;
+    const refeicoes = compacto.refeicoes.map(([indiceData, indiceTurno, indiceReceita]) => {
+        const [codigo, descricao, textoOriginal] = receitas[indiceReceita];
+        return {
+            data: datas[indiceData],
+            turno: turnos[indiceTurno],
+            codigo,
+            descricao,
+            texto_original: textoOriginal
+        };
+    });
+
+    const cardapioPorData = {};
+    datas.forEach((data, i) => {
+        cardapioPorData[data] = compacto.cardapio_por_data[i].map((indice) => refeicoes[indice]);
+    });
+
+    const resultado = {
+        sucesso: compacto.sucesso,
+        total_refeicoes: compacto.total_refeicoes,
+        total_dias: compacto.total_dias,
+        refeicoes,
+        cardapio_por_data: cardapioPorData
+    };
+    if (compacto.tabela_bruta !== undefined) {
+        resultado.tabela_bruta = compacto.tabela_bruta;
+    }
+    if (compacto.texto_paginas !== undefined) {
+        resultado.texto_paginas = compacto.texto_paginas;
+    }
+    resultado.metadados = compacto.metadados;
+    return resultado;
+}
+
+/**
+ * Monta a resposta do serviço a partir do resultado do Python; resultados
+ * com erro (ex.: PDF sem tabela) e parciais (limite de memória excedido)
+ * voltam com success false, os parciais com os dados extraídos até ali
+ * @param {Object} resultado - Resultado do processador (compacto ou completo)
+ * @returns {Object} { success, data } ou { success: false, error, data }
+ */
+function respostaProcessamento(resultado) {
+    const data = expandirResultadoCompacto(resultado);
+    if (data && (data.sucesso === false || data.erro)) {
+        return { success: false, error: data.erro, data };
+    }
+    return { success: true, data };
+}
 
 class PythonPDFService {
     constructor() {
         this.pythonScriptPath = path.join(__dirname, 'pdf_processor.py');
+        this.workerScriptPath = path.join(__dirname, 'pdf_worker.py');
+        this.indiceScriptPath = path.join(__dirname, 'indice_receitas.py');
         this.requirementsPath = path.join(__dirname, '..', 'requirements.txt');
         this.venvDir = process.env.PYTHON_VENV_DIR || path.join(__dirname, '..', 'venv');
         this.pythonBinPath = process.env.PYTHON_BIN_PATH 
             || path.join(this.venvDir, 'bin', process.env.PYTHON_BIN_NAME || 'python');
         this.pipBinPath = process.env.PIP_BIN_PATH 
             || path.join(this.venvDir, 'bin', process.env.PIP_BIN_NAME || 'pip');
+        this.usarWorkerPersistente = process.env.PYTHON_PDF_WORKER !== 'false';
+        // Formato compacto entre Python e Node (PYTHON_PDF_FORMATO=completo desativa)
+        this.usarFormatoCompacto = process.env.PYTHON_PDF_FORMATO !== 'completo';
+    }
+
+    /**
+     * Retorna o worker persistente compartilhado, criando-o se necessário
+     */
+    obterWorker() {
+        if (!workerCompartilhado) {
+            workerCompartilhado = new PythonPDFWorker(this.pythonBinPath, this.workerScriptPath);
+        }
+        return workerCompartilhado;
     }
 
     /**
@@ -43,27 +314,87 @@ class PythonPDFService {
 
     /**
      * Processa um PDF usando o serviço Python
+     * Usa o worker persistente por padrão (PYTHON_PDF_WORKER=false desativa)
+     * e recorre a um processo por PDF se o worker falhar
      * @param {Buffer} pdfBuffer - Buffer do arquivo PDF
      * @param {string} filename - Nome do arquivo PDF
+     * @param {Object} [opcoes]
+     * @param {boolean} [opcoes.tabelaBruta] - Inclui tabela_bruta no resultado
+     *   (no formato compacto ela só é enviada quando pedida)
+     * @param {boolean} [opcoes.texto] - Inclui texto_paginas (texto de cada página),
+     *   lido na mesma abertura do PDF que extrai as tabelas
      * @returns {Promise<Object>} Resultado do processamento
      */
-    async processarPDF(pdfBuffer, filename) {
+    async processarPDF(pdfBuffer, filename, opcoes = {}) {
+        if (!this.usarWorkerPersistente) {
+            return this.processarPDFProcessoUnico(pdfBuffer, filename, opcoes);
+        }
+
+        // PDF enviado em memória: sem gravação e limpeza de arquivo em /tmp
+        let resposta;
+        try {
+            resposta = await this.obterWorker().enviar({
+                acao: 'processar',
+                pdf_base64: pdfBuffer.toString('base64'),
+                nome: filename,
+                formato: this.usarFormatoCompacto ? 'compacto' : 'completo',
+                tabela_bruta: Boolean(opcoes.tabelaBruta),
+                texto: Boolean(opcoes.texto)
+            });
+        } catch (err) {
+            console.error('⚠️ Worker Python indisponível, usando processo único:', err.message);
+            return this.processarPDFProcessoUnico(pdfBuffer, filename, opcoes);
+        }
+
+        // Resultados parciais chegam com sucesso false e os dados extraídos em resultado
+        if (!resposta.sucesso && !resposta.resultado) {
+            return {
+                success: false,
+                error: resposta.erro || 'Falha no worker Python'
+            };
+        }
+
+        return respostaProcessamento(resposta.resultado);
+    }
+
+    /**
+     * Retorna o status do worker persistente (requisições atendidas, uptime)
+     */
+    async verificarWorker() {
+        return this.obterWorker().saude();
+    }
+
+    /**
+     * Processa um PDF iniciando um processo Python dedicado (PDF enviado pelo stdin)
+     * @param {Buffer} pdfBuffer - Buffer do arquivo PDF
+     * @param {string} filename - Nome do arquivo PDF
+     * @param {Object} [opcoes] - Mesmas opções de processarPDF
+     * @returns {Promise<Object>} Resultado do processamento
+     */
+    async processarPDFProcessoUnico(pdfBuffer, filename, opcoes = {}) {
         return new Promise(async (resolve, reject) => {
             try {
-                // Criar arquivo temporário
-                const tempDir = '/tmp';
-                const tempFilePath = path.join(tempDir, `temp_${Date.now()}_${filename}`);
-                
-                // Salvar buffer no arquivo temporário
-                fs.writeFileSync(tempFilePath, pdfBuffer);
-                console.log(`📁 Arquivo temporário criado: ${tempFilePath}`);
-
                 // Executar script Python usando o ambiente virtual
                 console.log('🐍 Executando processador Python...');
-                const python = spawn(this.pythonBinPath, [this.pythonScriptPath, tempFilePath], {
+                const args = [this.pythonScriptPath, '-', '--nome', filename];
+                if (this.usarFormatoCompacto) {
+                    args.push('--compacto');
+                    if (opcoes.tabelaBruta) {
+                        args.push('--tabela-bruta');
+                    }
+                }
+                if (opcoes.texto) {
+                    args.push('--texto');
+                }
+                const python = spawn(this.pythonBinPath, args, {
                     stdio: ['pipe', 'pipe', 'pipe']
                 });
 
+                python.stdin.on('error', () => {
+                    // Processo encerrado antes de ler o PDF; tratado no 'close'
+                });
+                python.stdin.end(pdfBuffer);
+
                 let stdout = '';
                 let stderr = '';
 
@@ -76,13 +407,6 @@ class PythonPDFService {
                 });
 
                 python.on('close', (code) => {
-                    // Limpar arquivo temporário
-                    try {
-                        fs.unlinkSync(tempFilePath);
-                    } catch (err) {
-                        // Erro silencioso ao remover arquivo temporário
-                    }
-
                     if (code === 0) {
                         try {
                             // Tentar extrair resultado JSON do stdout
@@ -122,10 +446,7 @@ class PythonPDFService {
                             }
 
                             if (jsonResult) {
-                                resolve({
-                                    success: true,
-                                    data: jsonResult
-                                });
+                                resolve(respostaProcessamento(jsonResult));
                             } else {
                                 // Se não encontrou JSON, criar resultado baseado no stdout
                                 const resultado = {
@@ -153,6 +474,37 @@ class PythonPDFService {
         });
     }
 
+    /**
+     * Consulta o índice de códigos de receita dos cardápios já processados
+     * Roda indice_receitas.py num processo leve (sem pdfplumber), para não
+     * esperar na fila do worker enquanto ele processa um PDF
+     * @param {Object} filtros
+     * @param {string} [filtros.codigo] - Código da receita (ex: LL25.228)
+     * @param {string} [filtros.data] - Data do cardápio (dd/mm/aaaa)
+     * @param {number} [filtros.limite] - Máximo de ocorrências
+     * @returns {Promise<Object>} { ocorrencias: [{ codigo, descricao, arquivo, data, turno }], total }
+     */
+    async consultarIndiceReceitas({ codigo, data, limite } = {}) {
+        const args = [this.indiceScriptPath];
+        if (codigo) args.push('--codigo', codigo);
+        if (data) args.push('--data', data);
+        if (limite) args.push('--limite', String(limite));
+
+        return new Promise((resolve, reject) => {
+            execFile(this.pythonBinPath, args, { maxBuffer: 32 * 1024 * 1024 }, (err, stdout, stderr) => {
+                if (err) {
+                    reject(new Error(stderr.trim() || err.message));
+                    return;
+                }
+                try {
+                    resolve(JSON.parse(stdout));
+                } catch (parseErr) {
+                    reject(new Error(`Resposta inválida do índice de receitas: ${parseErr.message}`));
+                }
+            });
+        });
+    }
+
     /**
      * Verifica se Python e as dependências estão disponíveis
      */
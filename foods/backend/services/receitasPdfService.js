@@ -1,6 +1,5 @@
 const fs = require('fs');
 const path = require('path');
-const pdf = require('pdf-parse');
 const PythonPDFService = require('./pythonPDFService');
 
 const DEFAULT_DEBUG_DIR = path.join(__dirname, '..', 'storage', 'receitas_pdf');
@@ -238,16 +237,15 @@ class ReceitasPdfService {
   }
 
   async processar(buffer, filename) {
-    const pdfData = await pdf(buffer);
-    const textoExtraido = pdfData.text || '';
-
-    const resultadoPython = await this.pythonService.processarPDF(buffer, filename);
+    // Tabelas e texto saem da mesma leitura do PDF no Python
+    const resultadoPython = await this.pythonService.processarPDF(buffer, filename, { tabelaBruta: true, texto: true });
     if (!resultadoPython.success || !resultadoPython.data) {
       const mensagem = resultadoPython.error || 'Falha ao processar PDF com serviço Python';
       const erro = new Error(mensagem);
       erro.status = 400;
       throw erro;
     }
+    const textoExtraido = (resultadoPython.data.texto_paginas || []).join('\n\n');
 
     const receitasEstruturadas = mapearReceitasExtraidas(resultadoPython.data);
     const primeiraReceita = receitasEstruturadas[0] || null;
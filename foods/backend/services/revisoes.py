@@ -0,0 +1,180 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Reprocessamento incremental de revisões de cardápio
+Cada página é identificada pelo hash do seu conteúdo (streams de conteúdo,
+tamanho e fontes): páginas já vistas reaproveitam as tabelas em cache e só
+as páginas novas passam pelo extract_tables. O histórico de versões guarda
+um resumo das refeições por data/turno de cada documento, usado para
+apontar o que mudou em relação à versão anterior.
+"""
+
+import hashlib
+import json
+import os
+import threading
+from datetime import datetime
+from typing import Any, Dict, Iterable, List, Mapping, Optional
+
+from pdfminer.pdftypes import PDFStream, resolve1
+
+
+def _dados_stream(objeto) -> bytes:
+    objeto = resolve1(objeto)
+    return objeto.get_data() if isinstance(objeto, PDFStream) else b""
+
+
+def hash_pagina(page) -> str:
+    """
+    Hash do conteúdo de uma página do pdfplumber
+
+    Considera os streams de conteúdo, o tamanho/rotação da página e as fontes
+    (nome, codificação e ToUnicode), que decidem o texto extraído.
+    """
+    pagina = page.page_obj
+    h = hashlib.sha256()
+    h.update(repr((list(pagina.mediabox), pagina.rotate)).encode())
+    for conteudo in pagina.contents or []:
+        h.update(_dados_stream(conteudo))
+
+    recursos = resolve1(pagina.resources) or {}
+    fontes = resolve1(recursos.get("Font")) or {}
+    for nome in sorted(fontes, key=str):
+        fonte = resolve1(fontes[nome]) or {}
+        h.update(repr((str(nome), str(fonte.get("BaseFont")), str(resolve1(fonte.get("Encoding"))))).encode())
+        h.update(_dados_stream(fonte.get("ToUnicode")))
+    return h.hexdigest()
+
+
+def resumo_refeicoes(refeicoes: Iterable[Mapping[str, Any]]) -> Dict[str, str]:
+    """Resumo por "data|turno": digest das receitas (código, descrição) servidas"""
+    receitas: Dict[str, set] = {}
+    for refeicao in refeicoes:
+        chave = f"{refeicao['data']}|{refeicao['turno']}"
+        receitas.setdefault(chave, set()).add((refeicao["codigo"] or "", refeicao["descricao"]))
+    return {
+        chave: hashlib.sha256(json.dumps(sorted(itens), ensure_ascii=False).encode("utf-8")).hexdigest()[:16]
+        for chave, itens in receitas.items()
+    }
+
+
+def _ordem_data(data: str):
+    try:
+        return (0, datetime.strptime(data, "%d/%m/%Y"))
+    except ValueError:
+        return (1, data)
+
+
+def comparar_resumos(anterior: Dict[str, str], atual: Dict[str, str]) -> Dict[str, Any]:
+    """
+    Diferença entre os resumos de duas versões
+
+    Returns:
+        {"datas_alteradas": [...], "alteracoes": [{"data", "turno", "tipo"}]},
+        com tipo "incluida", "removida" ou "alterada"
+    """
+    alteracoes = []
+    for chave in set(anterior) | set(atual):
+        if anterior.get(chave) == atual.get(chave):
+            continue
+        data, turno = chave.split("|", 1)
+        tipo = "incluida" if chave not in anterior else "removida" if chave not in atual else "alterada"
+        alteracoes.append({"data": data, "turno": turno, "tipo": tipo})
+    alteracoes.sort(key=lambda a: (_ordem_data(a["data"]), a["turno"]))
+
+    datas_alteradas = []
+    for alteracao in alteracoes:
+        if alteracao["data"] not in datas_alteradas:
+            datas_alteradas.append(alteracao["data"])
+    return {"datas_alteradas": datas_alteradas, "alteracoes": alteracoes}
+
+
+class HistoricoVersoes:
+    """
+    Últimos documentos processados: hashes das páginas e resumo das refeições
+
+    A versão anterior de um documento é o registro que divide com ele a
+    maioria das páginas, ou que tem o mesmo nome de arquivo; entre os
+    candidatos vale o de mais páginas em comum (depois o mesmo nome e o mais
+    recente).
+    """
+
+    def __init__(self, arquivo: str, max_documentos: int = 200):
+        self.arquivo = arquivo
+        self.max_documentos = max_documentos
+        self._lock = threading.Lock()
+        os.makedirs(os.path.dirname(os.path.abspath(arquivo)), exist_ok=True)
+
+    def _carregar(self) -> List[Dict[str, Any]]:
+        try:
+            with open(self.arquivo, "r", encoding="utf-8") as f:
+                return json.load(f)
+        except (OSError, ValueError):
+            return []
+
+    def _gravar(self, registros: List[Dict[str, Any]]):
+        caminho_temporario = f"{self.arquivo}.{os.getpid()}.tmp"
+        with open(caminho_temporario, "w", encoding="utf-8") as f:
+            json.dump(registros, f, ensure_ascii=False, separators=(",", ":"))
+        os.replace(caminho_temporario, self.arquivo)
+
+    @staticmethod
+    def _versao_anterior(registros: List[Dict[str, Any]], nome_arquivo: str,
+                         conjunto: set) -> Optional[Dict[str, Any]]:
+        """Melhor candidato a versão anterior (registros vêm do mais recente para o mais antigo)"""
+        melhor, melhor_pontos = None, None
+        for registro in registros:
+            em_comum = len(conjunto.intersection(registro["paginas"]))
+            mesmo_nome = registro["arquivo"] == nome_arquivo
+            # Uma página em comum (capa, rodapé) não basta: a maioria das páginas tem de coincidir
+            if not mesmo_nome and em_comum * 2 <= len(conjunto):
+                continue
+            pontos = (em_comum, mesmo_nome)
+            if melhor_pontos is None or pontos > melhor_pontos:
+                melhor, melhor_pontos = registro, pontos
+        return melhor
+
+    def registrar(self, nome_arquivo: str, paginas: List[str],
+                  refeicoes: Iterable[Mapping[str, Any]]) -> Optional[Dict[str, Any]]:
+        """
+        Guarda o documento e compara com a versão anterior
+
+        Args:
+            nome_arquivo: Nome do PDF (o mesmo nome também identifica a versão anterior)
+            paginas: Hash de cada página, na ordem
+            refeicoes: Refeições do documento
+
+        Returns:
+            {"versao_anterior": {...}, "datas_alteradas", "alteracoes"} ou None
+            se nenhum documento anterior for uma versão deste
+        """
+        resumo = resumo_refeicoes(refeicoes)
+        conjunto = set(paginas)
+        with self._lock:
+            registros = self._carregar()
+            anterior = self._versao_anterior(registros, nome_arquivo, conjunto)
+
+            revisao = None
+            if anterior is not None:
+                revisao = {
+                    "versao_anterior": {
+                        "arquivo": anterior["arquivo"],
+                        "data_processamento": anterior["data_processamento"],
+                        "paginas_em_comum": len(conjunto.intersection(anterior["paginas"])),
+                    },
+                    **comparar_resumos(anterior["refeicoes"], resumo),
+                }
+
+            registro = {
+                "arquivo": nome_arquivo,
+                "data_processamento": datetime.now().isoformat(),
+                "paginas": paginas,
+                "refeicoes": resumo,
+            }
+            # O mesmo conteúdo processado de novo substitui o registro antigo
+            registros = [registro] + [r for r in registros if r["paginas"] != paginas]
+            try:
+                self._gravar(registros[:self.max_documentos])
+            except OSError as e:
+                print(f"❌ Erro ao gravar histórico de versões: {str(e)}")
+            return revisao
@@ -0,0 +1,145 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Triagem barata das páginas antes do extract_tables
+Lê só os streams de conteúdo da página (sem interpretar o layout, que é a
+parte cara do pdfplumber) e conta os segmentos de borda, o texto mostrado
+e os marcadores de cardápio (TURNOS ou datas). Capas, páginas de
+assinatura e anexos em branco são ignorados; na dúvida (formulários
+XObject, imagens embutidas, fontes compostas) a página segue para a
+extração completa.
+"""
+
+import re
+from typing import Any, Dict, Optional
+
+from pdfminer.pdftypes import PDFStream, resolve1
+from pdfminer.psparser import LIT
+
+# A tabela do cardápio tem ao menos cabeçalho + um turno e TURNOS + um dia:
+# 3 bordas horizontais e 3 verticais
+MIN_SEGMENTOS = 6
+# Sem TURNOS nem datas, só páginas com pouco texto são ignoradas
+MIN_CARACTERES = 200
+
+_TOKENS = re.compile(
+    rb"%[^\r\n]*"                      # comentário
+    rb"|\((?:\\.|[^\\()])*\)"          # string literal (sem parênteses aninhados)
+    rb"|<[0-9A-Fa-f\s]*>"              # string hexadecimal
+    rb"|/[^\s/\[\]()<>{}%]*"           # nome
+    rb"|[A-Za-z'\"*]+",                # operador
+    re.S)
+_ESCAPES = re.compile(rb"\\([0-7]{1,3}|\r\n|.)", re.S)
+_ESCAPES_SIMPLES = {b"n": b"\n", b"r": b"\r", b"t": b"\t", b"b": b"\b", b"f": b"\f", b"\r\n": b"", b"\n": b""}
+_MARCADORES = re.compile(r"TURNO|\d{1,2}/\d{1,2}/\d{4}", re.I)
+
+# Operadores de caminho e quantas bordas cada um pode gerar
+_SEGMENTOS_POR_OPERADOR = {b"re": 4, b"l": 1, b"c": 1, b"v": 1, b"y": 1, b"h": 1}
+_OPERADORES_TEXTO = {b"Tj", b"TJ", b"'", b'"'}
+_FORM = LIT("Form")
+_FONTES_COMPOSTAS = {LIT("Type0"), LIT("Type3")}
+
+
+def _desescapar(literal: bytes) -> bytes:
+    def trocar(m):
+        sequencia = m.group(1)
+        if sequencia[:1].isdigit():
+            return bytes([int(sequencia, 8) & 0xFF])
+        return _ESCAPES_SIMPLES.get(sequencia, sequencia)
+    return _ESCAPES.sub(trocar, literal)
+
+
+def _texto_da_string(token: bytes) -> bytes:
+    if token[:1] == b"(":
+        return _desescapar(token[1:-1])
+    digitos = re.sub(rb"\s", b"", token[1:-1])
+    return bytes.fromhex((digitos + b"0" * (len(digitos) % 2)).decode())
+
+
+def _recursos(pagina) -> Dict[str, Any]:
+    return resolve1(pagina.resources) or {}
+
+
+def _tem_formularios(recursos) -> bool:
+    """Formulários XObject podem desenhar bordas e texto fora do stream da página"""
+    for objeto in (resolve1(recursos.get("XObject")) or {}).values():
+        objeto = resolve1(objeto)
+        if isinstance(objeto, PDFStream) and resolve1(objeto.get("Subtype")) is _FORM:
+            return True
+    return False
+
+
+def _texto_legivel(recursos) -> bool:
+    """Fontes simples: os bytes das strings correspondem (quase sempre) ao texto em Latin-1"""
+    for fonte in (resolve1(recursos.get("Font")) or {}).values():
+        if resolve1((resolve1(fonte) or {}).get("Subtype")) in _FONTES_COMPOSTAS:
+            return False
+    return True
+
+
+def analisar_pagina(page) -> Optional[Dict[str, Any]]:
+    """
+    Sinais baratos de uma página do pdfplumber
+
+    Returns:
+        {"segmentos", "caracteres", "marcadores", "texto_legivel"} ou None se
+        o stream não basta para decidir (formulários XObject ou imagens embutidas)
+    """
+    pagina = page.page_obj
+    recursos = _recursos(pagina)
+    if _tem_formularios(recursos):
+        return None
+
+    segmentos = caracteres = 0
+    textos = []
+    pendentes = []
+    for conteudo in pagina.contents or []:
+        conteudo = resolve1(conteudo)
+        if not isinstance(conteudo, PDFStream):
+            continue
+        for token in _TOKENS.findall(conteudo.get_data()):
+            inicial = token[:1]
+            if inicial in (b"(", b"<"):
+                pendentes.append(token)
+            elif inicial in (b"%", b"/"):
+                continue
+            elif token in _OPERADORES_TEXTO:
+                for string in pendentes:
+                    texto = _texto_da_string(string)
+                    caracteres += len(texto)
+                    textos.append(texto)
+                pendentes = []
+            elif token == b"BI":
+                # Dados binários da imagem embutida confundiriam a contagem
+                return None
+            else:
+                segmentos += _SEGMENTOS_POR_OPERADOR.get(token, 0)
+                pendentes = []
+
+    legivel = _texto_legivel(recursos)
+    texto = b" ".join(textos).decode("latin-1")
+    return {
+        "segmentos": segmentos,
+        "caracteres": caracteres,
+        "marcadores": bool(_MARCADORES.search(texto)) if legivel else None,
+        "texto_legivel": legivel,
+    }
+
+
+def motivo_para_ignorar(page) -> Optional[str]:
+    """
+    Motivo para não extrair tabelas da página, ou None se ela pode ter o cardápio
+
+    Motivos: "sem_bordas" (bordas insuficientes para uma tabela), "sem_texto"
+    e "sem_cardapio" (pouco texto, sem TURNOS nem datas)
+    """
+    sinais = analisar_pagina(page)
+    if sinais is None:
+        return None
+    if sinais["segmentos"] < MIN_SEGMENTOS:
+        return "sem_bordas"
+    if sinais["caracteres"] == 0:
+        return "sem_texto"
+    if sinais["marcadores"] is False and sinais["caracteres"] < MIN_CARACTERES:
+        return "sem_cardapio"
+    return None
@@ -0,0 +1,70 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Benchmark da deduplicação em processar_tabela_cardapio
+Gera tabelas sintéticas (sem PDF) com milhares de células e mede o tempo por
+célula: com os índices por chave ele deve ficar constante ao dobrar o tamanho
+"""
+
+import argparse
+import datetime
+import os
+import random
+import sys
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "backend", "services"))
+
+from pdf_processor import PDFCardapioProcessor  # noqa: E402
+
+TURNOS = ["Matutino\nVespertino\nNoturno", "Matutino", "Vespertino", "Noturno"]
+
+
+def gerar_tabela(celulas: int, linhas_por_pagina: int = 12, repeticao: float = 0.3, semente: int = 42):
+    """
+    Monta uma tabela no formato de extrair_tabela_do_pdf (páginas com
+    cabeçalho de datas e PAGE_MARKER_n) com aproximadamente o número de
+    células de refeição pedido; parte das células repete receitas já vistas
+    """
+    rng = random.Random(semente)
+    tabela, vistas = [], []
+    segunda = datetime.date(2025, 1, 6)
+    pagina = 0
+    while celulas > 0:
+        pagina += 1
+        datas = [(segunda + datetime.timedelta(days=d)).strftime("%d/%m/%Y") for d in range(5)]
+        tabela.append(["TURNOS"] + [f"Dia {data}" for data in datas])
+        for _ in range(linhas_por_pagina):
+            linha = [rng.choice(TURNOS)]
+            for _ in range(5):
+                if vistas and rng.random() < repeticao:
+                    linha.append(rng.choice(vistas))
+                else:
+                    texto = f"{rng.choice(['LL', 'R'])}25.{rng.randint(100, 999)} PREPARAÇÃO {rng.randint(1, 10 ** 6)}"
+                    vistas.append(texto)
+                    linha.append(texto)
+            tabela.append(linha)
+            celulas -= 5
+        tabela.append([f"PAGE_MARKER_{pagina}"] + [""] * 5)
+        segunda += datetime.timedelta(weeks=1)
+    return tabela
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--tamanhos", default="1000,2000,4000,8000,16000",
+                        help="Números de células separados por vírgula")
+    parser.add_argument("--repeticoes", type=int, default=3)
+    args = parser.parse_args()
+
+    processor = PDFCardapioProcessor()
+    print(f"{'células':>8} {'refeições':>10} {'tempo (s)':>10} {'µs/célula':>10}")
+    for celulas in [int(t) for t in args.tamanhos.split(",") if t]:
+        tabela = gerar_tabela(celulas)
+        melhor = None
+        for _ in range(args.repeticoes):
+            inicio = time.perf_counter()
+            refeicoes = processor.processar_tabela_cardapio(tabela)
+            decorrido = time.perf_counter() - inicio
+            melhor = decorrido if melhor is None else min(melhor, decorrido)
+        print(f"{celulas:>8} {len(refeicoes):>10} {melhor:>10.4f} {melhor / celulas * 1e6:>10.2f}")
@@ -0,0 +1,48 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Benchmark da extração paralela de páginas (extrair_tabela_do_pdf)
+Compara o caminho sequencial com o pool de processos em um PDF sintético
+e confere que a tabela montada é idêntica
+"""
+
+import argparse
+import os
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "backend", "services"))
+
+from gerador_cardapio_pdf import gerar_cardapio_pdf  # noqa: E402
+from pdf_processor import PDFCardapioProcessor  # noqa: E402
+
+
+def medir(processor: PDFCardapioProcessor, caminho: str, workers: int, repeticoes: int):
+    """Retorna (melhor tempo em segundos, tabela extraída)"""
+    melhor, tabela = None, None
+    for _ in range(repeticoes):
+        inicio = time.perf_counter()
+        tabela = processor.extrair_tabela_do_pdf(caminho, workers=workers)
+        decorrido = time.perf_counter() - inicio
+        melhor = decorrido if melhor is None else min(melhor, decorrido)
+    return melhor, tabela
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--paginas", type=int, default=40)
+    parser.add_argument("--workers", default="2,4", help="Lista de workers separados por vírgula")
+    parser.add_argument("--repeticoes", type=int, default=3)
+    args = parser.parse_args()
+
+    processor = PDFCardapioProcessor()
+    with tempfile.TemporaryDirectory() as tmpdir:
+        caminho = gerar_cardapio_pdf(os.path.join(tmpdir, "cardapio.pdf"), paginas=args.paginas)
+        base, tabela_base = medir(processor, caminho, 1, args.repeticoes)
+        print(f"CPUs: {os.cpu_count()} | páginas: {args.paginas}")
+        print(f"sequencial       {base:8.3f}s")
+        for workers in [int(w) for w in args.workers.split(",") if w]:
+            tempo, tabela = medir(processor, caminho, workers, args.repeticoes)
+            identica = "ok" if tabela == tabela_base else "DIVERGENTE"
+            print(f"{workers:2d} workers       {tempo:8.3f}s  speedup {base / tempo:5.2f}x  saída {identica}")
@@ -0,0 +1,55 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Memória ocupada pelas refeições de um cardápio sintético grande
+Compara os registros Refeicao (__slots__, data/turno internados) com um
+dicionário por refeição, medindo com tracemalloc só o que cada lista aloca
+"""
+
+import argparse
+import contextlib
+import gc
+import io
+import os
+import sys
+import tracemalloc
+
+AQUI = os.path.dirname(os.path.abspath(__file__))
+sys.path.insert(0, os.path.join(AQUI, "..", "backend", "services"))
+
+from bench_deduplicacao import gerar_tabela  # noqa: E402
+from pdf_processor import PDFCardapioProcessor  # noqa: E402
+
+
+def medir_bytes(construir):
+    """Bytes alocados e ainda vivos depois de construir(); devolve (bytes, objeto)"""
+    gc.collect()
+    tracemalloc.start()
+    try:
+        objeto = construir()
+        atual, _ = tracemalloc.get_traced_memory()
+    finally:
+        tracemalloc.stop()
+    return atual, objeto
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--celulas", type=int, default=40000, help="Células de refeição na tabela sintética")
+    args = parser.parse_args()
+
+    tabela = gerar_tabela(args.celulas)
+    processor = PDFCardapioProcessor(usar_cache=False)
+    with contextlib.redirect_stdout(io.StringIO()):
+        # Aquece o cache de classificação: os textos das células são os mesmos nos dois formatos
+        refeicoes = processor.processar_tabela_cardapio(tabela)
+
+        bytes_registros, registros = medir_bytes(lambda: processor.processar_tabela_cardapio(tabela))
+        bytes_dicts, dicts = medir_bytes(lambda: [dict(r) for r in processor.processar_tabela_cardapio(tabela)])
+
+    assert registros == dicts
+    total = len(registros)
+    print(f"Refeições: {total}")
+    print(f"  dict por refeição:  {bytes_dicts / 1024 / 1024:8.2f} MB ({bytes_dicts / total:6.1f} bytes/refeição)")
+    print(f"  registros Refeicao: {bytes_registros / 1024 / 1024:8.2f} MB ({bytes_registros / total:6.1f} bytes/refeição)")
+    print(f"  economia:           {(1 - bytes_registros / bytes_dicts) * 100:7.1f}%")
@@ -0,0 +1,245 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Gerador de PDFs sintéticos de cardápio
+Escreve o PDF diretamente (sem dependências) com a mesma estrutura dos
+cardápios municipais: título, linha de datas e uma tabela com bordas
+"""
+
+import argparse
+import datetime
+import random
+from typing import List, Optional
+
+LARGURA_PAGINA = 842
+ALTURA_PAGINA = 595
+MARGEM = 26
+TAMANHO_FONTE = 7
+ALTURA_LINHA_TEXTO = 8.5
+
+DIAS_SEMANA = ["Segunda-feira", "Terça-feira", "Quarta-feira", "Quinta-feira", "Sexta-feira"]
+TURNOS_PADRAO = ["Matutino", "Vespertino", "Noturno"]
+PREPARACOES = [
+    "PÃO FRANCÊS COM MARGARINA", "ARROZ, FEIJÃO, CARNE MOÍDA COM LEGUMES",
+    "BOLO DE CENOURA, SUCO DE LARANJA", "MACARRÃO À BOLONHESA, SALADA DE ALFACE",
+    "IOGURTE NATURAL, BANANA", "RISOTO DE FRANGO, CENOURA RALADA",
+    "BISCOITO SALGADO, LEITE COM CACAU", "SOPA DE LEGUMES COM CARNE",
+    "ARROZ DOCE, MAÇÃ", "POLENTA COM MOLHO DE CARNE, REPOLHO",
+]
+
+
+class _Pagina:
+    """Acumula os operadores de desenho de uma página"""
+
+    def __init__(self):
+        self.operadores: List[str] = []
+
+    def linha(self, x0: float, y0: float, x1: float, y1: float):
+        self.operadores.append(f"{x0:.2f} {y0:.2f} m {x1:.2f} {y1:.2f} l S")
+
+    def texto(self, x: float, y: float, conteudo: str):
+        escapado = conteudo.replace("\\", "\\\\").replace("(", "\\(").replace(")", "\\)")
+        self.operadores.append(f"BT /F1 {TAMANHO_FONTE} Tf {x:.2f} {y:.2f} Td ({escapado}) Tj ET")
+
+    def stream(self) -> bytes:
+        return ("0.5 w\n" + "\n".join(self.operadores)).encode("cp1252", errors="replace")
+
+
+def _quebrar_texto(texto: str, largura: float) -> List[str]:
+    """Quebra o texto em linhas que cabem na largura da célula"""
+    max_chars = max(1, int(largura / (TAMANHO_FONTE * 0.68)))
+    linhas, atual = [], ""
+    for bloco in texto.split("\n"):
+        for palavra in bloco.split(" "):
+            candidato = f"{atual} {palavra}".strip()
+            if len(candidato) > max_chars and atual:
+                linhas.append(atual)
+                atual = palavra
+            else:
+                atual = candidato
+        linhas.append(atual)
+        atual = ""
+    return [l for l in linhas if l]
+
+
+def _desenhar_tabela(pagina: _Pagina, larguras: List[float], linhas: List[List[Optional[str]]], topo: float) -> float:
+    """
+    Desenha as bordas e o texto de uma tabela a partir do topo informado
+    Uma célula None é mesclada com a de cima (sem a borda horizontal entre elas)
+
+    Returns:
+        Coordenada y da borda inferior da tabela
+    """
+    xs = [MARGEM]
+    for largura in larguras:
+        xs.append(xs[-1] + largura)
+
+    y = topo
+    for linha in linhas:
+        quebradas = [_quebrar_texto(celula or "", larguras[j] - 4) for j, celula in enumerate(linha)]
+        altura = max(1, max(len(q) for q in quebradas)) * ALTURA_LINHA_TEXTO + 6
+        for j, conteudo in enumerate(quebradas):
+            for k, texto in enumerate(conteudo):
+                pagina.texto(xs[j] + 2, y - 3 - (k + 1) * ALTURA_LINHA_TEXTO + 2, texto)
+        for x in xs:
+            pagina.linha(x, y, x, y - altura)
+        # Borda superior, exceto sobre células mescladas com a linha anterior
+        for j, celula in enumerate(linha):
+            if celula is not None:
+                pagina.linha(xs[j], y, xs[j + 1], y)
+        y -= altura
+    pagina.linha(xs[0], y, xs[-1], y)
+    return y
+
+
+def _codigo_receita(rng: random.Random) -> str:
+    prefixo = rng.choice(["LL", "R"])
+    return f"{prefixo}{rng.randint(24, 25)}.{rng.randint(10, 999):03d}"
+
+
+def gerar_cardapio_pdf(caminho: str, paginas: int = 4, semanas: Optional[int] = None,
+                       turnos: Optional[List[str]] = None, celulas_por_dia: int = 2,
+                       cabecalho_deslocado: bool = False, turnos_mesclados: bool = False,
+                       notas_rodape: int = 0, anexos: bool = False, inicio: datetime.date = datetime.date(2025, 10, 6), semente: int = 42) -> str:
+    """
+    Gera um PDF sintético de cardápio
+
+    Args:
+        caminho: Caminho do PDF a ser escrito
+        paginas: Número de páginas (uma tabela por página)
+        semanas: Número de semanas distintas (padrão: uma por página)
+        turnos: Rótulos de turno, um grupo de linhas por turno
+        celulas_por_dia: Linhas de receita por turno em cada dia
+        cabecalho_deslocado: Data da sexta-feira uma coluna à direita do conteúdo
+        turnos_mesclados: Célula de turno mesclada verticalmente sobre as linhas do turno
+        notas_rodape: Linhas de observações nutricionais abaixo da tabela (texto fora da tabela)
+        anexos: Capa antes do cardápio e, no fim, página de assinaturas e página em branco
+        inicio: Segunda-feira da primeira semana
+        semente: Semente do gerador de preparações (saída determinística)
+
+    Returns:
+        Caminho do PDF gerado
+    """
+    rng = random.Random(semente)
+    turnos = turnos or TURNOS_PADRAO
+    semanas = semanas or paginas
+    largura_extra = 70 if cabecalho_deslocado else 0
+    larguras = [92] + [(LARGURA_PAGINA - 2 * MARGEM - 92 - largura_extra) / len(DIAS_SEMANA)] * len(DIAS_SEMANA)
+    if cabecalho_deslocado:
+        larguras.append(largura_extra)
+
+    conteudos = []
+    for numero_pagina in range(paginas):
+        semana = numero_pagina % semanas
+        segunda = inicio + datetime.timedelta(weeks=semana)
+        cabecalho = ["TURNOS"] + [
+            f"{dia} {(segunda + datetime.timedelta(days=d)).strftime('%d/%m/%Y')}"
+            for d, dia in enumerate(DIAS_SEMANA)
+        ]
+        if cabecalho_deslocado:
+            # Sexta-feira desenhada na coluna estreita à direita, como nos PDFs com data deslocada
+            cabecalho = cabecalho[:-1] + ["", cabecalho[-1]]
+        linhas = [cabecalho]
+        for turno in turnos:
+            for k in range(celulas_por_dia):
+                rotulo = None if turnos_mesclados and k > 0 else turno
+                linha = [rotulo] + [
+                    f"{_codigo_receita(rng)} {rng.choice(PREPARACOES)}" for _ in DIAS_SEMANA
+                ]
+                if cabecalho_deslocado:
+                    linha.append("")
+                linhas.append(linha)
+
+        pagina = _Pagina()
+        pagina.texto(MARGEM, ALTURA_PAGINA - MARGEM, "SECRETARIA MUNICIPAL DE EDUCAÇÃO")
+        pagina.texto(MARGEM, ALTURA_PAGINA - MARGEM - 10, f"CARDÁPIO ESCOLAR - Semana {semana + 1}")
+        base_tabela = _desenhar_tabela(pagina, larguras, linhas, ALTURA_PAGINA - MARGEM - 24)
+        for k in range(notas_rodape):
+            y = base_tabela - 12 - k * ALTURA_LINHA_TEXTO
+            if y < MARGEM:
+                break
+            pagina.texto(MARGEM, y, f"Obs. {k + 1}: {rng.choice(PREPARACOES)} - porção de referência, "
+                                    f"{rng.randint(150, 650)} kcal, {rng.randint(5, 40)} g de proteína, "
+                                    "cardápio sujeito a alterações conforme disponibilidade dos gêneros")
+        pagina.texto(MARGEM, MARGEM - 10, f"Pág. {numero_pagina + 1}/{paginas}")
+        conteudos.append(pagina.stream())
+
+    if anexos:
+        conteudos = [_pagina_capa().stream()] + conteudos + [_pagina_assinaturas().stream(), _Pagina().stream()]
+    _escrever_pdf(caminho, conteudos)
+    return caminho
+
+
+def _pagina_capa() -> _Pagina:
+    """Capa com moldura e título, sem tabela"""
+    pagina = _Pagina()
+    x0, y0, x1, y1 = MARGEM, MARGEM, LARGURA_PAGINA - MARGEM, ALTURA_PAGINA - MARGEM
+    for linha in ((x0, y0, x1, y0), (x1, y0, x1, y1), (x1, y1, x0, y1), (x0, y1, x0, y0)):
+        pagina.linha(*linha)
+    pagina.texto(LARGURA_PAGINA / 2 - 90, ALTURA_PAGINA / 2 + 20, "SECRETARIA MUNICIPAL DE EDUCAÇÃO")
+    pagina.texto(LARGURA_PAGINA / 2 - 70, ALTURA_PAGINA / 2, "CARDÁPIO DA ALIMENTAÇÃO ESCOLAR")
+    return pagina
+
+
+def _pagina_assinaturas() -> _Pagina:
+    """Página final com as linhas de assinatura das nutricionistas"""
+    pagina = _Pagina()
+    pagina.texto(MARGEM, ALTURA_PAGINA - MARGEM, "Cardápio elaborado pela equipe de nutrição.")
+    for k, nome in enumerate(["Nutricionista Responsável Técnica", "Nutricionista do Quadro Técnico"]):
+        x = MARGEM + k * 400
+        pagina.linha(x, 200, x + 300, 200)
+        pagina.texto(x, 188, nome)
+    return pagina
+
+
+def _escrever_pdf(caminho: str, conteudos: List[bytes]):
+    """Serializa as páginas num arquivo PDF 1.4 com tabela xref"""
+    objetos: List[bytes] = []
+    ids_paginas = [4 + 2 * i for i in range(len(conteudos))]
+    objetos.append(b"<< /Type /Catalog /Pages 2 0 R >>")
+    kids = " ".join(f"{i} 0 R" for i in ids_paginas)
+    objetos.append(f"<< /Type /Pages /Kids [{kids}] /Count {len(conteudos)} >>".encode())
+    objetos.append(b"<< /Type /Font /Subtype /Type1 /BaseFont /Helvetica /Encoding /WinAnsiEncoding >>")
+    for id_pagina, conteudo in zip(ids_paginas, conteudos):
+        objetos.append((
+            f"<< /Type /Page /Parent 2 0 R /MediaBox [0 0 {LARGURA_PAGINA} {ALTURA_PAGINA}] "
+            f"/Resources << /Font << /F1 3 0 R >> >> /Contents {id_pagina + 1} 0 R >>"
+        ).encode())
+        objetos.append(f"<< /Length {len(conteudo)} >>\nstream\n".encode() + conteudo + b"\nendstream")
+
+    saida = bytearray(b"%PDF-1.4\n")
+    offsets = []
+    for numero, objeto in enumerate(objetos, start=1):
+        offsets.append(len(saida))
+        saida += f"{numero} 0 obj\n".encode() + objeto + b"\nendobj\n"
+    inicio_xref = len(saida)
+    saida += f"xref\n0 {len(objetos) + 1}\n0000000000 65535 f \n".encode()
+    for offset in offsets:
+        saida += f"{offset:010d} 00000 n \n".encode()
+    saida += f"trailer\n<< /Size {len(objetos) + 1} /Root 1 0 R >>\nstartxref\n{inicio_xref}\n%%EOF\n".encode()
+
+    with open(caminho, "wb") as f:
+        f.write(saida)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Gera um PDF sintético de cardápio")
+    parser.add_argument("saida", help="Caminho do PDF a ser gerado")
+    parser.add_argument("--paginas", type=int, default=4)
+    parser.add_argument("--semanas", type=int, default=None)
+    parser.add_argument("--turnos", default=",".join(TURNOS_PADRAO),
+                        help="Turnos separados por vírgula")
+    parser.add_argument("--celulas-por-dia", type=int, default=2)
+    parser.add_argument("--cabecalho-deslocado", action="store_true")
+    parser.add_argument("--turnos-mesclados", action="store_true")
+    parser.add_argument("--notas-rodape", type=int, default=0)
+    parser.add_argument("--anexos", action="store_true",
+                        help="Acrescenta capa, página de assinaturas e página em branco")
+    parser.add_argument("--semente", type=int, default=42)
+    args = parser.parse_args()
+    gerar_cardapio_pdf(args.saida, paginas=args.paginas, semanas=args.semanas,
+                       turnos=[t.strip() for t in args.turnos.split(",") if t.strip()],
+                       celulas_por_dia=args.celulas_por_dia, cabecalho_deslocado=args.cabecalho_deslocado,
+                       turnos_mesclados=args.turnos_mesclados, notas_rodape=args.notas_rodape,
+                       anexos=args.anexos, semente=args.semente)
+    print(args.saida)
@@ -0,0 +1,163 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Suíte de benchmarks dos dois parsers de cardápio
+Gera PDFs sintéticos determinísticos (incluindo cabeçalho deslocado, turnos
+mesclados e códigos LL25.228/R25.375), mede cada etapa e grava um relatório
+JSON estável para comparar commits:
+
+    python suite_benchmarks.py --saida base.json
+    python suite_benchmarks.py --comparar base.json
+"""
+
+import argparse
+import io
+import json
+import os
+import platform
+import statistics
+import sys
+import tempfile
+import time
+from typing import Any, Callable, Dict, List
+
+AQUI = os.path.dirname(os.path.abspath(__file__))
+sys.path.insert(0, os.path.join(AQUI, "..", "backend", "services"))
+sys.path.insert(0, os.path.join(AQUI, "..", "teste_cardapio"))
+
+# Benchmarks medem o processamento, não os caches de resultado
+os.environ["PDF_CACHE"] = "false"
+os.environ["PARSE_CACHE"] = "false"
+
+import pdfplumber  # noqa: E402
+
+from gerador_cardapio_pdf import gerar_cardapio_pdf  # noqa: E402
+from pdf_processor import PDFCardapioProcessor  # noqa: E402
+
+try:
+    import app as app_flask  # noqa: E402
+except ImportError:
+    app_flask = None
+
+TURNOS_REAIS = ["Matutino\nVespertino\nSemana 1", "Noturno\nSemana 1"]
+
+CENARIOS: Dict[str, Dict[str, Any]] = {
+    "basico": {"paginas": 4},
+    "multi_semanas": {"paginas": 12, "semanas": 4, "celulas_por_dia": 3},
+    "cabecalho_deslocado": {"paginas": 8, "cabecalho_deslocado": True},
+    "turnos_mesclados": {"paginas": 8, "turnos": TURNOS_REAIS, "celulas_por_dia": 3, "turnos_mesclados": True},
+    "grande": {"paginas": 40, "semanas": 8, "celulas_por_dia": 3},
+    "notas_rodape": {"paginas": 8, "celulas_por_dia": 1, "notas_rodape": 40},
+}
+
+
+def medir(funcao: Callable[[], Any], repeticoes: int) -> Dict[str, float]:
+    """Executa a função N vezes e retorna mediana e mínimo em segundos"""
+    tempos = []
+    for _ in range(repeticoes):
+        inicio = time.perf_counter()
+        funcao()
+        tempos.append(time.perf_counter() - inicio)
+    return {"mediana": round(statistics.median(tempos), 6), "minimo": round(min(tempos), 6)}
+
+
+def tabelas_limpas_app(caminho: str) -> List[List[List[str]]]:
+    """Tabelas como o app.py as entrega a normalize_table"""
+    tabelas = []
+    with pdfplumber.open(caminho) as pdf:
+        for page in pdf.pages:
+            for tabela in page.extract_tables() or []:
+                linhas = [[app_flask.sanitize_text(c) for c in (row or [])] for row in tabela]
+                tabelas.append([r for r in linhas if any(c for c in r)])
+    return tabelas
+
+
+def executar_cenario(nome: str, parametros: Dict[str, Any], diretorio: str, repeticoes: int) -> Dict[str, Any]:
+    """Mede todas as etapas para um PDF sintético"""
+    caminho = gerar_cardapio_pdf(os.path.join(diretorio, f"{nome}.pdf"), **parametros)
+    processor = PDFCardapioProcessor(usar_cache=False)
+
+    tabela = processor.extrair_tabela_do_pdf(caminho)
+    refeicoes = processor.processar_tabela_cardapio(tabela)
+    por_data = processor._organizar_por_data(refeicoes)
+
+    etapas = {
+        "extrair_tabela_do_pdf": medir(lambda: processor.extrair_tabela_do_pdf(caminho), repeticoes),
+        "processar_tabela_cardapio": medir(lambda: processor.processar_tabela_cardapio(tabela), repeticoes),
+        "_organizar_por_data": medir(lambda: processor._organizar_por_data(refeicoes), repeticoes),
+    }
+    contagens = {
+        "paginas": parametros["paginas"],
+        "linhas_tabela": len(tabela),
+        "refeicoes": len(refeicoes),
+        "dias": len(por_data),
+    }
+
+    if app_flask is not None:
+        tabelas_app = tabelas_limpas_app(caminho)
+        etapas["normalize_table"] = medir(lambda: [app_flask.normalize_table(t) for t in tabelas_app], repeticoes)
+
+        with open(caminho, "rb") as f:
+            conteudo = f.read()
+        cliente = app_flask.app.test_client()
+
+        def chamar_api():
+            resposta = cliente.post("/api/parse", data={"file": (io.BytesIO(conteudo), f"{nome}.pdf")},
+                                    content_type="multipart/form-data")
+            if resposta.status_code != 200:
+                raise RuntimeError(f"/api/parse retornou {resposta.status_code}")
+            return resposta
+
+        contagens["tabelas_api"] = chamar_api().get_json()["tables_found"]
+        etapas["api_parse"] = medir(chamar_api, repeticoes)
+
+    return {"parametros": {k: v for k, v in parametros.items() if k != "turnos"}, "contagens": contagens, "etapas": etapas}
+
+
+def imprimir_relatorio(relatorio: Dict[str, Any], anterior: Dict[str, Any] = None):
+    """Tabela de medianas por cenário/etapa (com a razão em relação ao relatório anterior)"""
+    for nome, cenario in relatorio["cenarios"].items():
+        contagens = ", ".join(f"{k}={v}" for k, v in cenario["contagens"].items())
+        print(f"\n{nome} ({contagens})")
+        base = (anterior or {}).get("cenarios", {}).get(nome, {}).get("etapas", {})
+        for etapa, tempos in cenario["etapas"].items():
+            linha = f"  {etapa:<28} {tempos['mediana'] * 1000:10.2f} ms"
+            if etapa in base and tempos["mediana"]:
+                linha += f"   {base[etapa]['mediana'] / tempos['mediana']:6.2f}x vs anterior"
+            print(linha)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Benchmarks dos parsers de cardápio")
+    parser.add_argument("--cenarios", default=",".join(CENARIOS), help="Cenários separados por vírgula")
+    parser.add_argument("--repeticoes", type=int, default=5)
+    parser.add_argument("--saida", help="Grava o relatório JSON neste caminho")
+    parser.add_argument("--comparar", help="Relatório JSON anterior para comparação")
+    args = parser.parse_args()
+
+    relatorio = {
+        "ambiente": {
+            "python": platform.python_version(),
+            "pdfplumber": pdfplumber.__version__,
+            "plataforma": platform.platform(),
+            "cpus": os.cpu_count(),
+            "repeticoes": args.repeticoes,
+            "app_flask": app_flask is not None,
+        },
+        "cenarios": {},
+    }
+
+    with tempfile.TemporaryDirectory() as diretorio:
+        for nome in [c for c in args.cenarios.split(",") if c]:
+            relatorio["cenarios"][nome] = executar_cenario(nome, CENARIOS[nome], diretorio, args.repeticoes)
+
+    anterior = None
+    if args.comparar:
+        with open(args.comparar, "r", encoding="utf-8") as f:
+            anterior = json.load(f)
+
+    imprimir_relatorio(relatorio, anterior)
+
+    if args.saida:
+        with open(args.saida, "w", encoding="utf-8") as f:
+            json.dump(relatorio, f, ensure_ascii=False, indent=2, sort_keys=True)
@@ -0,0 +1,98 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Controle de admissão dos uploads: no máximo `max_active` PDFs
+processando por processo (/api/parse e jobs somados) e `max_queued`
+requisições esperando vaga. Acima disso a resposta sai na hora (429),
+antes de ler o corpo; quem espera mais que `queue_timeout` segundos recebe
+503. As duas levam Retry-After. Jobs esperam a vaga sem ocupar a fila.
+"""
+
+import os
+import threading
+
+
+class Saturated(Exception):
+    """Sem vaga: status HTTP (429 ou 503) e segundos para o Retry-After."""
+
+    def __init__(self, status, retry_after, message):
+        super().__init__(message)
+        self.status = status
+        self.retry_after = retry_after
+
+
+class AdmissionLimiter:
+    """Semáforo com fila limitada; seguro entre threads do mesmo processo."""
+
+    def __init__(self, max_active=1, max_queued=2, queue_timeout=30.0, retry_after=5):
+        self.max_active = max_active
+        self.max_queued = max_queued
+        self.queue_timeout = queue_timeout
+        self.retry_after = retry_after
+        self._slots = threading.BoundedSemaphore(max_active)
+        self._lock = threading.Lock()
+        self.active = 0
+        self.queued = 0
+        self.rejected = {429: 0, 503: 0}
+
+    @classmethod
+    def from_env(cls):
+        """PARSE_CONCURRENCY, PARSE_QUEUE_DEPTH, PARSE_QUEUE_TIMEOUT e PARSE_RETRY_AFTER (segundos)."""
+        return cls(max_active=int(os.environ.get("PARSE_CONCURRENCY", "1")),
+                   max_queued=int(os.environ.get("PARSE_QUEUE_DEPTH", "2")),
+                   queue_timeout=float(os.environ.get("PARSE_QUEUE_TIMEOUT", "30")),
+                   retry_after=int(os.environ.get("PARSE_RETRY_AFTER", "5")))
+
+    def acquire(self):
+        """Ocupa uma vaga ou levanta Saturated."""
+        if self._slots.acquire(blocking=False):
+            with self._lock:
+                self.active += 1
+            return
+        with self._lock:
+            if self.queued >= self.max_queued:
+                self.rejected[429] += 1
+                raise Saturated(429, self.retry_after, "Servidor ocupado, tente novamente")
+            self.queued += 1
+        acquired = self._slots.acquire(timeout=self.queue_timeout)
+        with self._lock:
+            self.queued -= 1
+            if not acquired:
+                self.rejected[503] += 1
+            else:
+                self.active += 1
+        if not acquired:
+            raise Saturated(503, self.retry_after, "Tempo de espera por uma vaga esgotado, tente novamente")
+
+    def acquire_background(self, timeout=None):
+        """Vaga para um job: espera sem contar na fila dos uploads; False se o timeout passar."""
+        if not self._slots.acquire(timeout=timeout):
+            return False
+        with self._lock:
+            self.active += 1
+        return True
+
+    def release(self):
+        with self._lock:
+            self.active -= 1
+        self._slots.release()
+
+    def stats(self):
+        with self._lock:
+            return {"active": self.active, "queued": self.queued, "max_active": self.max_active,
+                    "max_queued": self.max_queued, "rejected": dict(self.rejected)}
+
+    def render(self):
+        """Linhas no formato texto do Prometheus (somadas às do ParseMetrics em /metrics)."""
+        stats = self.stats()
+        lines = ["# HELP admission_active Requisições de upload em processamento neste processo",
+                 "# TYPE admission_active gauge",
+                 f"admission_active {stats['active']}",
+                 "# HELP admission_queued Requisições de upload esperando vaga neste processo",
+                 "# TYPE admission_queued gauge",
+                 f"admission_queued {stats['queued']}",
+                 "# HELP admission_rejected_total Uploads recusados por falta de vaga",
+                 "# TYPE admission_rejected_total counter"]
+        for status, count in sorted(stats["rejected"].items()):
+            lines.append(f'admission_rejected_total{{status="{status}"}} {count}')
+        return "\n".join(lines) + "\n"
@@ -2,22 +2,90 @@
 # -*- coding: utf-8 -*-
 
 from flask import Flask, render_template, request, jsonify
-from werkzeug.utils import secure_filename
 import pdfplumber
+import io
 import tempfile
-from pathlib import Path
 import re
 import traceback
+import json
 import datetime
+import functools
+import os
+import time
 from collections import defaultdict
 
+from admission import AdmissionLimiter, Saturated
+from jobs import JobCancelled, JobManager, QueueFull
+from metrics import MemoryGuard, MemoryLimitExceeded, ParseMetrics, StageTimer, render_memo
+from page_filter import skip_reason
+from result_cache import ResultCache
+import services_path  # noqa: F401
+from memoizacao import memoizar  # noqa: E402
+
 app = Flask(__name__, template_folder="templates")
 app.config["MAX_CONTENT_LENGTH"] = 100 * 1024 * 1024  # até 100 MB
 
+# Incrementar quando a saída do /api/parse mudar (invalida o cache)
+PARSER_VERSION = "2"
+
+# Cache por conteúdo do PDF (PARSE_CACHE=false desativa)
+result_cache = None
+if os.environ.get("PARSE_CACHE", "true").lower() != "false":
+    result_cache = ResultCache(
+        directory=os.environ.get("PARSE_CACHE_DIR", os.path.join(tempfile.gettempdir(), "teste_cardapio_cache")),
+        max_memory_items=int(os.environ.get("PARSE_CACHE_MEMORY_ITEMS", "32")),
+        max_disk_bytes=int(os.environ.get("PARSE_CACHE_MAX_MB", "512")) * 1024 * 1024,
+        max_age_seconds=int(os.environ.get("PARSE_CACHE_MAX_DAYS", "30")) * 24 * 3600,
+    )
+
+# Tempos por etapa agregados em /metrics; ?instrument=1 (ou PARSE_INSTRUMENT=true)
+# devolve as etapas da requisição, com pico de memória, em "instrumentation"
+parse_metrics = ParseMetrics()
+PARSE_INSTRUMENT = os.environ.get("PARSE_INSTRUMENT", "false").lower() == "true"
+
+# Memória da extração: descarta o layout de cada página já processada (PARSE_LOW_MEMORY=false
+# desativa) e, com PARSE_MEMORY_LIMIT_MB, interrompe o parse acima do limite de memória residente
+PARSE_LOW_MEMORY = os.environ.get("PARSE_LOW_MEMORY", "true").lower() != "false"
+PARSE_MEMORY_LIMIT_MB = int(os.environ.get("PARSE_MEMORY_LIMIT_MB", "0"))
+
+# Capas, assinaturas e páginas em branco não passam pelo extract_tables (PARSE_PAGE_FILTER=false desativa)
+PARSE_PAGE_FILTER = os.environ.get("PARSE_PAGE_FILTER", "true").lower() != "false"
+
+# Entradas do LRU de cada função de texto memoizada (backend/services/memoizacao.py; 0 desativa)
+MEMO_SIZE = int(os.environ.get("PARSE_MEMO_SIZE", "8192"))
+
+# PDFs processando (uploads e jobs) e uploads esperando vaga por processo (ver admission.py e gunicorn.conf.py)
+admission = AdmissionLimiter.from_env()
+
+def admitted(view):
+    """Reserva uma vaga antes de ler o upload; sem vaga responde 429/503 com Retry-After."""
+    @functools.wraps(view)
+    def wrapper(*args, **kwargs):
+        try:
+            admission.acquire()
+        except Saturated as e:
+            response = jsonify({"error": str(e), **admission.stats()})
+            response.status_code = e.status
+            response.headers["Retry-After"] = str(e.retry_after)
+            # Fecha a conexão em vez de drenar um corpo de até 100 MB
+            response.headers["Connection"] = "close"
+            return response
+        try:
+            return view(*args, **kwargs)
+        finally:
+            admission.release()
+    return wrapper
+
+# Partes de cada tabela na resposta; ?include= (ou ?fields=) escolhe quais
+# calcular, e "normalized" aceita subcampos (ex: include=normalized.by_date)
+TABLE_FIELDS = ("rows_raw", "headers", "records", "normalized")
+NORMALIZED_FIELDS = ("headers_filled", "rows", "by_date")
+
 # =====================================================
 # 🧩 Funções auxiliares básicas
 # =====================================================
 
+@memoizar(MEMO_SIZE)
 def sanitize_text(x):
     if x is None:
         return ""
@@ -68,6 +136,7 @@ TURNOS_KNOWN = [
 # 🔎 Normalização de cabeçalhos e estrutura
 # =====================================================
 
+@memoizar(MEMO_SIZE)
 def parse_date_any(s):
     if not s:
         return None
@@ -102,15 +171,27 @@ def strip_title_rows(rows):
         return rows, 0
     return rows[header_row_idx:], header_row_idx
 
+def column_occupancy(body, width, sample_rows=6):
+    """
+    Células não-vazias por coluna nas primeiras sample_rows linhas do corpo
+    (None conta o corpo inteiro), numa única passada.
+    """
+    counts = [0] * width
+    for r in body[:sample_rows]:
+        for j, c in enumerate(r[:width]):
+            if c and c.strip():
+                counts[j] += 1
+    return counts
+
+def kept_columns(headers, body):
+    """Índices mantidos por drop_empty_columns: cabeçalho preenchido ou algum valor no corpo."""
+    if all(headers):
+        return list(range(len(headers)))
+    counts = column_occupancy(body, len(headers), sample_rows=None)
+    return [j for j, h in enumerate(headers) if h or counts[j]]
+
 def drop_empty_columns(headers, body):
-    keep_idx = []
-    for j, h in enumerate(headers):
-        if h:
-            keep_idx.append(j)
-            continue
-        has_val = any((len(r) > j and (r[j] or "").strip()) for r in body)
-        if has_val:
-            keep_idx.append(j)
+    keep_idx = kept_columns(headers, body)
     def select(cols, idxs): return [cols[j] if j < len(cols) else "" for j in idxs]
     headers2 = select(headers, keep_idx)
     body2 = [select(r, keep_idx) for r in body]
@@ -125,92 +206,93 @@ def fill_empties_nearest(headers):
     """Preenche cabeçalhos vazios com o vizinho mais próximo (empate → direita)."""
     n = len(headers)
     filled = headers[:]
-    non_empty_idx = [i for i, h in enumerate(headers) if h and str(h).strip()]
-    if not non_empty_idx:
-        return filled
+    present = [bool(h and str(h).strip()) for h in headers]
 
-    for i, h in enumerate(headers):
-        if h and str(h).strip():
+    # Vizinho preenchido mais próximo à direita de cada posição, numa passada de trás para frente
+    right_of = [None] * n
+    right = None
+    for i in range(n - 1, -1, -1):
+        right_of[i] = right
+        if present[i]:
+            right = i
+
+    left = None
+    for i in range(n):
+        if present[i]:
+            left = i
             continue
-        left = right = None
-        for j in range(i-1, -1, -1):
-            if headers[j] and str(headers[j]).strip():
-                left = j
-                break
-        for j in range(i+1, n):
-            if headers[j] and str(headers[j]).strip():
-                right = j
-                break
-        pick = None
-        if left is None and right is None:
-            pick = None
-        elif left is None:
+        right = right_of[i]
+        if left is None:
             pick = right
         elif right is None:
             pick = left
         else:
-            dl = i - left
-            dr = right - i
-            pick = right if dr <= dl else left
-        filled[i] = headers[pick] if pick is not None else headers[i]
+            pick = right if right - i <= i - left else left
+        if pick is not None:
+            filled[i] = headers[pick]
     return filled
 
 
-def col_nonempty_count(body, j, sample_rows=6):
-    """Conta quantas células não-vazias existem na coluna j."""
-    n = min(sample_rows, len(body))
-    cnt = 0
-    for i in range(n):
-        if j < len(body[i]) and (body[i][j] or "").strip():
-            cnt += 1
-    return cnt
-
-
-def align_headers_to_body(headers, body, max_passes=3):
+def align_headers_to_body(headers, body, max_passes=3, occupancy=None):
     """
     Corrige casos em que um header de DATA está deslocado 1 coluna para a direita.
     Regra: se header[j] é data e a coluna j tem poucos valores, mas a coluna j-1
     tem mais valores e (header[j-1] está vazio ou não é data), então 'puxa' o header[j]
     para j-1 (swap).
+    Contagens por coluna e datas dos cabeçalhos são calculadas uma vez; a troca
+    move o cabeçalho junto com a sua marca de data.
     """
     hdr = headers[:]
+    counts = occupancy if occupancy is not None else column_occupancy(body, len(hdr))
+    is_date = [bool(h and parse_date_any(h)) for h in hdr]
     for _ in range(max_passes):
         changed = False
         for j in range(2, len(hdr)):  # começa em 2 (col_1=TURNOS)
-            h = hdr[j]
-            if not h or not parse_date_any(h):
+            if not is_date[j]:
                 continue
-            left_h = hdr[j-1] if j-1 >= 0 else ""
-            left_is_date = bool(parse_date_any(left_h))
-            this_cnt = col_nonempty_count(body, j, sample_rows=6)
-            left_cnt = col_nonempty_count(body, j-1, sample_rows=6)
-            if left_cnt > this_cnt and (not left_h or not left_is_date):
+            if counts[j-1] > counts[j] and (not hdr[j-1] or not is_date[j-1]):
                 hdr[j-1], hdr[j] = hdr[j], hdr[j-1]
+                is_date[j-1], is_date[j] = is_date[j], is_date[j-1]
                 changed = True
         if not changed:
             break
     return hdr
 
 
-def collapse_duplicate_headers(headers, body):
+def group_columns(headers, columns=None):
+    """Cabeçalhos únicos (ordem de aparição) e as colunas de cada um."""
     idx_by_header = defaultdict(list)
-    for j, h in enumerate(headers):
-        idx_by_header[h].append(j)
-    unique_headers = list(idx_by_header.keys())
+    for j in (range(len(headers)) if columns is None else columns):
+        idx_by_header[headers[j]].append(j)
+    return list(idx_by_header.keys()), list(idx_by_header.values())
+
+def merge_columns(body, groups):
+    """Monta cada linha juntando as colunas de cada grupo (células vazias ignoradas)."""
+    width = max((idxs[-1] for idxs in groups), default=-1) + 1
     new_body = []
     for r in body:
+        if len(r) < width:
+            r = r + [""] * (width - len(r))
         new_row = []
-        for h in unique_headers:
-            idxs = idx_by_header[h]
+        for idxs in groups:
+            if len(idxs) == 1:
+                c = r[idxs[0]]
+                new_row.append(c.strip() if c else "")
+                continue
             parts = []
             for j in idxs:
-                if j < len(r) and r[j]:
+                if r[j]:
                     parts.append(r[j])
             new_row.append(" ".join(parts).strip())
         new_body.append(new_row)
-    return unique_headers, new_body
+    return new_body
 
+def collapse_duplicate_headers(headers, body):
+    unique_headers, groups = group_columns(headers)
+    return unique_headers, merge_columns(body, groups)
 
+
+@memoizar(MEMO_SIZE, congelar=lambda r: (tuple(r[0]), r[1]), copiar=lambda r: (list(r[0]), r[1]))
 def split_turnos(cell_text):
     if not cell_text:
         return [], ""
@@ -227,6 +309,8 @@ def split_turnos(cell_text):
 # 🍽️ Separação de receitas por célula
 # =====================================================
 
+@memoizar(MEMO_SIZE, congelar=lambda items: tuple(tuple(it.items()) for it in items),
+          copiar=lambda items: [dict(it) for it in items])
 def split_cell_into_items(cell_text):
     """Divide uma célula em itens {code, descricao, incompleto?}."""
     text = (cell_text or "").strip()
@@ -253,25 +337,36 @@ def split_cell_into_items(cell_text):
 # 🧠 Normalização principal
 # =====================================================
 
-def normalize_table(clean_rows):
+def select_parts(result, parts):
+    """Mantém só as partes pedidas (parts=None mantém tudo)."""
+    if parts is None:
+        return result
+    return {k: v for k, v in result.items() if k in parts}
+
+def normalize_table(clean_rows, parts=None):
+    """parts: subconjunto de NORMALIZED_FIELDS; sem "by_date" os itens não são separados."""
     if not clean_rows:
-        return {"headers_filled": [], "rows": [], "by_date": {}}
+        return select_parts({"headers_filled": [], "rows": [], "by_date": {}}, parts)
 
     rows2, _ = strip_title_rows(clean_rows)
     if not rows2:
-        return {"headers_filled": [], "rows": [], "by_date": {}}
+        return select_parts({"headers_filled": [], "rows": [], "by_date": {}}, parts)
 
     headers_raw = rows2[0]
     body = rows2[1:]
 
+    # Ocupação das primeiras linhas do corpo, calculada uma vez para o alinhamento
+    occupancy = column_occupancy(body, len(headers_raw))
+
     # 1) preenche vazios (empate -> direita)
     headers_ff = fill_empties_nearest(headers_raw)
 
     # 2) alinha cabeçalhos com corpo (corrige sexta deslocada)
-    headers_ff = align_headers_to_body(headers_ff, body, max_passes=2)
+    headers_ff = align_headers_to_body(headers_ff, body, max_passes=2, occupancy=occupancy)
 
-    headers_ff, body = drop_empty_columns(headers_ff, body)
-    headers_collapsed, body = collapse_duplicate_headers(headers_ff, body)
+    # 3) remove colunas vazias e junta cabeçalhos repetidos reconstruindo o corpo uma única vez
+    headers_collapsed, groups = group_columns(headers_ff, kept_columns(headers_ff, body))
+    body = merge_columns(body, groups)
 
     header_dates = []
     for h in headers_collapsed:
@@ -279,34 +374,35 @@ def normalize_table(clean_rows):
         header_dates.append(iso or h)
 
     by_date = defaultdict(lambda: defaultdict(list))
-
-    for row in body:
-        if not row:
-            continue
-        turno_cell = row[0] if len(row) > 0 else ""
-        turnos, _sem = split_turnos(turno_cell)
-        if not turnos:
-            turnos = [turno_cell]
-
-        for j in range(1, len(header_dates)):
-            date_key = header_dates[j]
-            if not date_key or str(date_key).upper().startswith("TURNOS"):
+    # Separar os itens das células é a parte cara; só quando by_date foi pedido
+    if parts is None or "by_date" in parts:
+        for row in body:
+            if not row:
                 continue
-            cell = row[j] if j < len(row) else ""
-            if not cell:
-                continue
-            items = split_cell_into_items(cell)
-            for t in turnos:
-                day_key = date_key if re.match(r"\d{4}-\d{2}-\d{2}", str(date_key)) else date_key
-                seen = set()
-                for it in items:
-                    key = (it.get("code"), it.get("descricao"))
-                    if key in seen:
-                        continue
-                    seen.add(key)
-                    by_date[day_key][t].append(it)
-
-    return {"headers_filled": header_dates, "rows": body, "by_date": by_date}
+            turno_cell = row[0] if len(row) > 0 else ""
+            turnos, _sem = split_turnos(turno_cell)
+            if not turnos:
+                turnos = [turno_cell]
+
+            for j in range(1, len(header_dates)):
+                date_key = header_dates[j]
+                if not date_key or str(date_key).upper().startswith("TURNOS"):
+                    continue
+                cell = row[j] if j < len(row) else ""
+                if not cell:
+                    continue
+                items = split_cell_into_items(cell)
+                for t in turnos:
+                    day_key = date_key if re.match(r"\d{4}-\d{2}-\d{2}", str(date_key)) else date_key
+                    seen = set()
+                    for it in items:
+                        key = (it.get("code"), it.get("descricao"))
+                        if key in seen:
+                            continue
+                        seen.add(key)
+                        by_date[day_key][t].append(it)
+
+    return select_parts({"headers_filled": header_dates, "rows": body, "by_date": by_date}, parts)
 
 # =====================================================
 # 🚀 Rotas Flask
@@ -316,42 +412,278 @@ def normalize_table(clean_rows):
 def index():
     return render_template("index.html")
 
+def parse_fields(spec):
+    """
+    Lê o parâmetro include=/fields= ("rows_raw,normalized.by_date") como
+    {campo: subcampos de normalized ou None para o campo inteiro}.
+    Vazio → None (todos os campos); campo desconhecido → ValueError.
+    """
+    names = [n.strip() for n in (spec or "").split(",") if n.strip()]
+    if not names:
+        return None
+    fields = {}
+    for name in names:
+        field, _, sub = name.partition(".")
+        if field not in TABLE_FIELDS or (sub and (field != "normalized" or sub not in NORMALIZED_FIELDS)):
+            raise ValueError(f"Campo desconhecido em include: {name}")
+        if not sub:
+            fields[field] = None
+        elif fields.get(field, ()) is not None:
+            fields.setdefault(field, set()).add(sub)
+    return fields
+
+def fields_variant(fields):
+    """Forma canônica dos campos pedidos, usada na chave do cache."""
+    if fields is None:
+        return None
+    names = []
+    for field in TABLE_FIELDS:
+        if field in fields:
+            subs = fields[field]
+            names += [field] if subs is None else [f"{field}.{sub}" for sub in NORMALIZED_FIELDS if sub in subs]
+    return ",".join(names)
+
+def request_fields():
+    return parse_fields(request.args.get("include") or request.args.get("fields"))
+
+def release_page(page):
+    """Descarta objetos, layout e mapas de texto da página já extraída."""
+    page.flush_cache()
+    if hasattr(page.get_textmap, "cache_clear"):
+        page.get_textmap.cache_clear()
+
+def parse_pdf(pdf_file, timer=None, on_page=None, fields=None, guard=None):
+    """
+    Extrai e normaliza todas as tabelas do PDF (caminho ou arquivo binário,
+    ex: BytesIO com o upload); on_page(feitas, total) a cada página.
+    fields (ver parse_fields) limita as partes calculadas de cada tabela.
+    guard (MemoryGuard) é consultado a cada página: acima do limite levanta
+    MemoryLimitExceeded com as tabelas extraídas até ali. Páginas descartadas
+    pela triagem (page_filter) vão para skipped_pages.
+    """
+    timer = timer or StageTimer()
+    guard = guard or MemoryGuard(PARSE_MEMORY_LIMIT_MB)
+    def wanted(field):
+        return fields is None or field in fields
+    payload_tables = []
+    skipped_pages = []
+    with timer.stage("open_pdf"):
+        pdf = pdfplumber.open(pdf_file)
+        pages_count = len(pdf.pages)
+    with pdf:
+        for page in pdf.pages:
+            with timer.stage("page_filter"):
+                reason = skip_reason(page) if PARSE_PAGE_FILTER else None
+            if reason:
+                skipped_pages.append({"page": page.page_number, "reason": reason})
+                tables = []
+            else:
+                with timer.stage("extract_tables"), timer.stage("extract_tables", page=page.page_number):
+                    tables = page.extract_tables() or []
+            for idx, table in enumerate(tables):
+                table_payload = {"page": page.page_number, "table_idx": idx}
+                with timer.stage("normalize"), timer.stage("normalize", page=page.page_number):
+                    clean_rows = [[sanitize_text(c) for c in (row or [])] for row in table]
+                    clean_rows = [r for r in clean_rows if any(c for c in r)]
+                    if wanted("rows_raw"):
+                        table_payload["rows_raw"] = clean_rows
+                    if wanted("headers") or wanted("records"):
+                        headers, data_rows = pick_headers(clean_rows)
+                        if wanted("headers"):
+                            table_payload["headers"] = headers
+                        if wanted("records"):
+                            table_payload["records"] = [{headers[i]: r[i] for i in range(len(headers))} for r in data_rows]
+                    if wanted("normalized"):
+                        table_payload["normalized"] = normalize_table(
+                            clean_rows, None if fields is None else fields["normalized"])
+                payload_tables.append(table_payload)
+            if PARSE_LOW_MEMORY:
+                release_page(page)
+            if guard.exceeded():
+                raise MemoryLimitExceeded(
+                    f"Limite de memória de {PARSE_MEMORY_LIMIT_MB} MB excedido na página "
+                    f"{page.page_number} de {pages_count}",
+                    {"pages": pages_count, "pages_done": page.page_number, "skipped_pages": skipped_pages,
+                     "tables_found": len(payload_tables), "tables": payload_tables})
+            if on_page:
+                on_page(page.page_number, pages_count)
+    return {"pages": pages_count, "skipped_pages": skipped_pages,
+            "tables_found": len(payload_tables), "tables": payload_tables}
+
+def json_response(body, status=200):
+    return app.response_class(body, status=status, mimetype="application/json")
+
 @app.route("/api/parse", methods=["POST"])
+@admitted
 def api_parse():
+    started = time.perf_counter()
+    instrument = PARSE_INSTRUMENT or request.args.get("instrument", "").lower() in ("1", "true")
+    timer = StageTimer(memory=instrument)
+    guard = MemoryGuard(PARSE_MEMORY_LIMIT_MB)
+    status, cached = 500, False
     try:
         if "file" not in request.files:
+            status = 400
             return jsonify({"error": "Nenhum arquivo enviado (campo 'file')"}), 400
         f = request.files["file"]
         if not f.filename.lower().endswith(".pdf"):
+            status = 400
             return jsonify({"error": "Envie um arquivo .pdf"}), 400
-        filename = secure_filename(f.filename)
-        with tempfile.TemporaryDirectory() as tmpdir:
-            pdf_path = Path(tmpdir) / filename
-            f.save(str(pdf_path))
-            payload_tables = []
-            with pdfplumber.open(pdf_path) as pdf:
-                pages_count = len(pdf.pages)
-                for page in pdf.pages:
-                    tables = page.extract_tables() or []
-                    for idx, table in enumerate(tables):
-                        clean_rows = [[sanitize_text(c) for c in (row or [])] for row in table]
-                        clean_rows = [r for r in clean_rows if any(c for c in r)]
-                        headers, data_rows = pick_headers(clean_rows)
-                        processed = [{headers[i]: r[i] for i in range(len(headers))} for r in data_rows]
-                        normalized = normalize_table(clean_rows)
-                        payload_tables.append({
-                            "page": page.page_number,
-                            "table_idx": idx,
-                            "rows_raw": clean_rows,
-                            "headers": headers,
-                            "records": processed,
-                            "normalized": normalized
-                        })
-            return jsonify({"pages": pages_count, "tables_found": len(payload_tables), "tables": payload_tables})
+        try:
+            fields = request_fields()
+        except ValueError as e:
+            status = 400
+            return jsonify({"error": str(e), "fields": list(TABLE_FIELDS),
+                            "normalized_fields": list(NORMALIZED_FIELDS)}), 400
+        with timer.stage("read_upload"):
+            content = f.read()
+        cache_key = None
+        if result_cache is not None:
+            with timer.stage("cache_lookup"):
+                cache_key = ResultCache.make_key(content, PARSER_VERSION, fields_variant(fields))
+                body = result_cache.get(cache_key)
+            if body is not None:
+                status, cached = 200, True
+                if instrument:
+                    return jsonify({**json.loads(body), "instrumentation": timer.summary()})
+                return json_response(body)
+        # Parse direto da memória: o upload não passa por arquivo temporário
+        try:
+            result = parse_pdf(io.BytesIO(content), timer, fields=fields, guard=guard)
+        except MemoryLimitExceeded as e:
+            # Resultado parcial: não vai para o cache
+            status = 507
+            return jsonify({"error": str(e), "partial": True, **e.partial, "memory": guard.summary()}), 507
+        with timer.stage("serialize"):
+            response = jsonify(result)
+        if cache_key:
+            result_cache.put(cache_key, response.get_data(as_text=True))
+        status = 200
+        if instrument:
+            # O corpo em cache fica sem as métricas desta requisição
+            return jsonify({**result, "instrumentation": {**timer.summary(), "memory": guard.summary()}})
+        return response
     except Exception as e:
         app.logger.exception("Falha no parse do PDF")
         tb = traceback.format_exc()
         return jsonify({"error": "Falha ao processar PDF", "exception": str(e), "traceback": tb.splitlines()[-15:]}), 500
+    finally:
+        timer.close()
+        parse_metrics.record(timer, time.perf_counter() - started, status, cached, guard)
+
+@app.route("/api/cache", methods=["GET"])
+def api_cache_stats():
+    if result_cache is None:
+        return jsonify({"enabled": False})
+    return jsonify({"enabled": True, **result_cache.stats()})
+
+@app.route("/metrics", methods=["GET"])
+def metrics():
+    return app.response_class(parse_metrics.render() + admission.render() + render_memo(), mimetype="text/plain; version=0.0.4")
+
+# =====================================================
+# ⏳ Jobs assíncronos (PDFs grandes sem segurar a requisição)
+# =====================================================
+
+def run_parse_job(job):
+    """Processa o PDF do job e devolve o JSON serializado (mesmo corpo do /api/parse)."""
+    content, cache_key, fields = job.payload
+    # Mesmas vagas do /api/parse: jobs e uploads somados não passam de PARSE_CONCURRENCY
+    while not admission.acquire_background(timeout=1):
+        if job.cancel_requested:
+            raise JobCancelled()
+    try:
+        result = parse_pdf(io.BytesIO(content), on_page=job.report, fields=fields)
+    finally:
+        admission.release()
+    with app.app_context():
+        body = jsonify(result).get_data(as_text=True)
+    if cache_key:
+        result_cache.put(cache_key, body)
+    return body
+
+# Estado dos jobs fica na memória do processo (PARSE_JOBS=false desativa /api/jobs);
+# com jobs ligados o gunicorn.conf.py usa um worker só e não recicla com jobs pendentes
+PARSE_JOBS = os.environ.get("PARSE_JOBS", "true").lower() != "false"
+parse_jobs = None
+if PARSE_JOBS:
+    parse_jobs = JobManager(
+        run_parse_job,
+        workers=int(os.environ.get("PARSE_JOB_WORKERS", "2")),
+        max_queued=int(os.environ.get("PARSE_JOB_MAX_QUEUED", "16")),
+        ttl_seconds=int(os.environ.get("PARSE_JOB_TTL_SECONDS", "3600")),
+    )
+
+def jobs_enabled(view):
+    """404 em todos os /api/jobs quando PARSE_JOBS=false."""
+    @functools.wraps(view)
+    def wrapper(*args, **kwargs):
+        if parse_jobs is None:
+            return jsonify({"error": "Jobs desativados (PARSE_JOBS=false)"}), 404
+        return view(*args, **kwargs)
+    return wrapper
+
+def job_links(job):
+    return {"status_url": f"/api/jobs/{job.id}", "result_url": f"/api/jobs/{job.id}/result"}
+
+# Sem @admitted: o envio só enfileira (limite em PARSE_JOB_MAX_QUEUED); a vaga é tomada no run_parse_job
+@app.route("/api/jobs", methods=["POST"])
+@jobs_enabled
+def api_jobs_submit():
+    if "file" not in request.files:
+        return jsonify({"error": "Nenhum arquivo enviado (campo 'file')"}), 400
+    f = request.files["file"]
+    if not f.filename.lower().endswith(".pdf"):
+        return jsonify({"error": "Envie um arquivo .pdf"}), 400
+    try:
+        fields = request_fields()
+    except ValueError as e:
+        return jsonify({"error": str(e), "fields": list(TABLE_FIELDS),
+                        "normalized_fields": list(NORMALIZED_FIELDS)}), 400
+    content = f.read()
+    cache_key = cached = None
+    if result_cache is not None:
+        cache_key = ResultCache.make_key(content, PARSER_VERSION, fields_variant(fields))
+        cached = result_cache.get(cache_key)
+    try:
+        job = parse_jobs.submit((content, cache_key, fields), result=cached)
+    except QueueFull:
+        response = jsonify({"error": "Fila de processamento cheia, tente novamente"})
+        response.headers["Retry-After"] = "30"
+        return response, 503
+    return jsonify({**job.to_dict(), **job_links(job)}), 202
+
+@app.route("/api/jobs/<job_id>", methods=["GET"])
+@jobs_enabled
+def api_jobs_status(job_id):
+    job = parse_jobs.get(job_id)
+    if job is None:
+        return jsonify({"error": "Job não encontrado ou expirado"}), 404
+    return jsonify({**job.to_dict(), **job_links(job)})
+
+@app.route("/api/jobs/<job_id>/result", methods=["GET"])
+@jobs_enabled
+def api_jobs_result(job_id):
+    job = parse_jobs.get(job_id)
+    if job is None:
+        return jsonify({"error": "Job não encontrado ou expirado"}), 404
+    if job.status != "done":
+        return jsonify({"error": f"Job ainda não concluído ({job.status})", **job.to_dict()}), 409
+    return json_response(job.result)
+
+@app.route("/api/jobs/<job_id>", methods=["DELETE"])
+@jobs_enabled
+def api_jobs_cancel(job_id):
+    job = parse_jobs.cancel(job_id)
+    if job is None:
+        return jsonify({"error": "Job não encontrado ou expirado"}), 404
+    return jsonify(job.to_dict())
+
+@app.route("/api/jobs", methods=["GET"])
+@jobs_enabled
+def api_jobs_stats():
+    return jsonify(parse_jobs.stats())
 
 if __name__ == "__main__":
+    # Servidor de desenvolvimento; em produção: gunicorn -c gunicorn.conf.py app:app
     app.run(host="0.0.0.0", port=5000, debug=True)
@@ -0,0 +1,83 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Servidor de produção do teste_cardapio: gunicorn -c gunicorn.conf.py app:app
+
+Processos pré-criados (fork) depois de importar o app (pdfplumber/pdfminer
+carregados uma vez e compartilhados copy-on-write). Cada processo processa
+até PARSE_CONCURRENCY PDFs (uploads e jobs somados) com PARSE_QUEUE_DEPTH
+uploads esperando; acima disso 429/503 com Retry-After (admission.py).
+Processos são reciclados depois de PARSE_MAX_REQUESTS requisições ou ao
+passar de PARSE_WORKER_MAX_MB de memória residente, mas nunca enquanto
+houver jobs pendentes ou resultados de jobs ainda não expirados.
+
+Os jobs (/api/jobs) vivem na memória do processo: com eles ligados
+(PARSE_JOBS, padrão) o padrão é um worker só, senão a consulta de status
+cairia em outro processo. PARSE_JOBS=false libera PARSE_WORKERS = CPUs.
+"""
+
+import os
+import random
+import sys
+
+from admission import AdmissionLimiter
+from metrics import current_rss_kb
+
+_limits = AdmissionLimiter.from_env()
+_max_rss_mb = int(os.environ.get("PARSE_WORKER_MAX_MB", "1024"))
+_max_requests = int(os.environ.get("PARSE_MAX_REQUESTS", "500"))
+_jobs = os.environ.get("PARSE_JOBS", "true").lower() != "false"
+
+bind = os.environ.get("PARSE_BIND", "0.0.0.0:5000")
+workers = int(os.environ.get("PARSE_WORKERS", "1" if _jobs else str(os.cpu_count() or 1)))
+worker_class = "gthread"
+# Vagas de processamento + fila + 1 thread para recusar na hora quem chega depois
+threads = _limits.max_active + _limits.max_queued + 1
+preload_app = True
+
+# Reciclagem: limita o crescimento de memória (fragmentação, caches do pdfminer). Feita no
+# post_request, e não pelo max_requests do gunicorn, para poder esperar os jobs terminarem
+max_requests = 0
+
+# PDFs grandes levam dezenas de segundos; o timeout derruba só workers travados
+timeout = int(os.environ.get("PARSE_WORKER_TIMEOUT", "300"))
+graceful_timeout = 60
+backlog = int(os.environ.get("PARSE_BACKLOG", "64"))
+
+
+def when_ready(server):
+    if _jobs and server.num_workers > 1:
+        server.log.warning("PARSE_WORKERS=%d com jobs ligados: status e resultados de /api/jobs são por "
+                           "processo (use 1 worker, afinidade de sessão ou PARSE_JOBS=false)", server.num_workers)
+
+
+def post_fork(server, worker):
+    # Como o max_requests_jitter: processos não reciclam todos juntos
+    worker.recycle_after = _max_requests + random.randint(0, _max_requests // 10) if _max_requests else 0
+
+
+def _jobs_pending():
+    app_module = sys.modules.get("app")
+    jobs = getattr(app_module, "parse_jobs", None)
+    return jobs is not None and jobs.busy()
+
+
+def post_request(worker, req, environ, resp):
+    """Encerra o worker (depois das requisições em andamento) por quantidade de requisições ou memória."""
+    if not worker.alive:
+        return
+    reason = None
+    if worker.recycle_after and worker.nr >= worker.recycle_after:
+        reason = f"{worker.nr} requisições"
+    elif _max_rss_mb:
+        rss_kb = current_rss_kb()
+        if rss_kb is not None and rss_kb > _max_rss_mb * 1024:
+            reason = f"{rss_kb // 1024} MB (limite {_max_rss_mb} MB)"
+    if reason is None:
+        return
+    if _jobs_pending():
+        # Reciclar agora perderia jobs e resultados: tenta de novo na próxima requisição
+        worker.log.debug("Worker %s com %s: reciclagem adiada por jobs não expirados", worker.pid, reason)
+        return
+    worker.log.info("Worker %s com %s: reciclando", worker.pid, reason)
+    worker.alive = False
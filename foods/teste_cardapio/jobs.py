@@ -0,0 +1,175 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Jobs assíncronos do /api/jobs: fila limitada, pool local de threads,
+progresso por página, cancelamento e expiração dos resultados.
+"""
+
+import os
+import queue
+import threading
+import time
+import uuid
+
+
+class JobCancelled(Exception):
+    """Levantada dentro do runner quando o job foi cancelado durante a execução."""
+
+
+class QueueFull(Exception):
+    """Fila de jobs no limite; o cliente deve tentar de novo mais tarde."""
+
+
+class Job:
+    def __init__(self, payload):
+        self.id = uuid.uuid4().hex
+        self.payload = payload
+        self.status = "queued"
+        self.pages_total = None
+        self.pages_done = 0
+        self.result = None
+        self.error = None
+        self.created_at = time.time()
+        self.started_at = None
+        self.finished_at = None
+        self.cancel_requested = False
+
+    def report(self, pages_done, pages_total):
+        """Chamado pelo runner a cada página; interrompe o job se foi cancelado."""
+        self.pages_done = pages_done
+        self.pages_total = pages_total
+        if self.cancel_requested:
+            raise JobCancelled()
+
+    @property
+    def finished(self):
+        return self.status in ("done", "failed", "cancelled")
+
+    def to_dict(self):
+        progress = None
+        if self.status == "done":
+            progress = 1.0
+        elif self.pages_total:
+            progress = round(self.pages_done / self.pages_total, 4)
+        return {
+            "job_id": self.id,
+            "status": self.status,
+            "pages_done": self.pages_done,
+            "pages_total": self.pages_total,
+            "progress": progress,
+            "error": self.error,
+            "created_at": self.created_at,
+            "started_at": self.started_at,
+            "finished_at": self.finished_at,
+        }
+
+
+class JobManager:
+    """
+    Executa runner(job) em `workers` threads a partir de uma fila com no máximo
+    `max_queued` jobs esperando. Jobs terminados expiram `ttl_seconds` depois.
+    As threads nascem no primeiro submit do processo: com o app pré-carregado
+    (gunicorn preload_app), cada worker criado por fork inicia as suas.
+    """
+
+    def __init__(self, runner, workers=2, max_queued=16, ttl_seconds=3600):
+        self.runner = runner
+        self.ttl_seconds = ttl_seconds
+        self._queue = queue.Queue(maxsize=max_queued)
+        self._jobs = {}
+        self._lock = threading.Lock()
+        self.workers = workers
+        self._threads = []
+        self._pid = None
+
+    def _start_threads(self):
+        # Threads não sobrevivem ao fork: recria no processo atual
+        if self._pid == os.getpid():
+            return
+        self._pid = os.getpid()
+        self._threads = []
+        for i in range(self.workers):
+            thread = threading.Thread(target=self._work, name=f"parse-job-{i}", daemon=True)
+            thread.start()
+            self._threads.append(thread)
+
+    def submit(self, payload, result=None):
+        """Enfileira um job; com `result` o job já nasce concluído (ex: acerto de cache)."""
+        job = Job(payload)
+        if result is not None:
+            job.status, job.result, job.payload = "done", result, None
+            job.finished_at = time.time()
+        with self._lock:
+            self._expire()
+            if result is None:
+                self._start_threads()
+                try:
+                    self._queue.put_nowait(job)
+                except queue.Full:
+                    raise QueueFull()
+            self._jobs[job.id] = job
+        return job
+
+    def get(self, job_id):
+        with self._lock:
+            self._expire()
+            return self._jobs.get(job_id)
+
+    def cancel(self, job_id):
+        """Cancela um job na fila ou em execução; jobs terminados não mudam."""
+        with self._lock:
+            job = self._jobs.get(job_id)
+            if job is None or job.finished:
+                return job
+            job.cancel_requested = True
+            if job.status == "queued":
+                self._finish(job, "cancelled")
+            return job
+
+    def busy(self):
+        """Há jobs pendentes ou resultados ainda não expirados (reciclar o processo os perderia)."""
+        with self._lock:
+            self._expire()
+            return bool(self._jobs)
+
+    def stats(self):
+        with self._lock:
+            counts = {}
+            for job in self._jobs.values():
+                counts[job.status] = counts.get(job.status, 0) + 1
+            return {"queued": self._queue.qsize(), "max_queued": self._queue.maxsize,
+                    "workers": self.workers, "jobs": counts}
+
+    def _work(self):
+        while True:
+            job = self._queue.get()
+            with self._lock:
+                if job.status != "queued":  # cancelado enquanto esperava
+                    continue
+                job.status = "running"
+                job.started_at = time.time()
+            try:
+                result = self.runner(job)
+            except JobCancelled:
+                with self._lock:
+                    self._finish(job, "cancelled")
+            except Exception as e:
+                with self._lock:
+                    job.error = str(e)
+                    self._finish(job, "failed")
+            else:
+                with self._lock:
+                    job.result = result
+                    self._finish(job, "done")
+
+    def _finish(self, job, status):
+        job.status = status
+        job.finished_at = time.time()
+        job.payload = None  # libera o PDF enviado
+
+    def _expire(self):
+        now = time.time()
+        expired = [job_id for job_id, job in self._jobs.items()
+                   if job.finished and now - job.finished_at > self.ttl_seconds]
+        for job_id in expired:
+            del self._jobs[job_id]
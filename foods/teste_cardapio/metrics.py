@@ -0,0 +1,179 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Métricas do /api/parse: tempo por etapa de cada requisição e histogramas
+agregados expostos em /metrics (formato texto do Prometheus); memória
+residente por página com limite opcional (MemoryGuard).
+"""
+
+import threading
+
+import services_path  # noqa: F401
+from instrumentacao import Instrumentacao, rss_atual_kb as current_rss_kb  # noqa: E402
+from memoizacao import estatisticas as memo_stats  # noqa: E402
+
+# Limites dos buckets em segundos (de 5 ms a 30 s)
+DEFAULT_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0)
+
+
+# tracemalloc é global no processo: uma requisição instrumentada por vez mede memória
+_memory_tracing = threading.Lock()
+
+# Nomes das métricas do processador (backend/services/instrumentacao.py) na resposta do app
+_FIELDS = {"parede_ms": "wall_ms", "cpu_ms": "cpu_ms", "pico_memoria_kb": "peak_memory_kb"}
+
+
+class StageTimer(Instrumentacao):
+    """
+    Mede as etapas de uma requisição com a Instrumentacao do processador;
+    com memory=True também o pico do tracemalloc. Se outra requisição já está
+    medindo memória, peak_memory_kb sai None (indisponível).
+    """
+
+    def __init__(self, memory=False):
+        self._holds_tracing = memory and _memory_tracing.acquire(blocking=False)
+        self.memory_unavailable = memory and not self._holds_tracing
+        super().__init__(ativa=True, memoria=self._holds_tracing)
+
+    def stage(self, name, page=None):
+        return self.etapa(name, page)
+
+    def _translated(self, metrics):
+        out = {}
+        for name, values in metrics.items():
+            out[name] = {_FIELDS[k]: round(v, 3) for k, v in values.items()}
+            if self.memory_unavailable:
+                out[name]["peak_memory_kb"] = None
+        return out
+
+    def summary(self):
+        return {
+            "stages": self._translated(self.etapas),
+            "pages": [{"page": page, **self._translated(stages)} for page, stages in sorted(self.paginas.items())],
+        }
+
+    def close(self):
+        self.encerrar()
+        if self._holds_tracing:
+            self._holds_tracing = False
+            _memory_tracing.release()
+
+
+class MemoryLimitExceeded(Exception):
+    """Extração interrompida pelo MemoryGuard; partial tem as tabelas já extraídas."""
+
+    def __init__(self, message, partial):
+        super().__init__(message)
+        self.partial = partial
+
+
+class MemoryGuard:
+    """Amostra a memória residente a cada página; limit_mb (0/None = sem limite)."""
+
+    def __init__(self, limit_mb=None):
+        self.limit_kb = limit_mb * 1024 if limit_mb else None
+        self.start_kb = current_rss_kb()
+        self.peak_kb = self.start_kb
+
+    def exceeded(self):
+        rss = current_rss_kb()
+        if rss is None:
+            return False
+        self.peak_kb = max(self.peak_kb or 0, rss)
+        return self.limit_kb is not None and rss > self.limit_kb
+
+    def summary(self):
+        return {"start_rss_kb": self.start_kb, "peak_rss_kb": self.peak_kb, "limit_kb": self.limit_kb}
+
+
+class Histogram:
+    """Histograma cumulativo (buckets, soma e contagem) por rótulo."""
+
+    def __init__(self, name, help_text, label, buckets=DEFAULT_BUCKETS):
+        self.name = name
+        self.help_text = help_text
+        self.label = label
+        self.buckets = buckets
+        self._series = {}
+
+    def observe(self, label_value, value):
+        series = self._series.get(label_value)
+        if series is None:
+            series = self._series[label_value] = {"counts": [0] * len(self.buckets), "sum": 0.0, "count": 0}
+        for i, bound in enumerate(self.buckets):
+            if value <= bound:
+                series["counts"][i] += 1
+        series["sum"] += value
+        series["count"] += 1
+
+    def render(self):
+        lines = [f"# HELP {self.name} {self.help_text}", f"# TYPE {self.name} histogram"]
+        for label_value, series in sorted(self._series.items()):
+            label = f'{self.label}="{label_value}"'
+            for bound, count in zip(self.buckets, series["counts"]):
+                lines.append(f'{self.name}_bucket{{{label},le="{bound}"}} {count}')
+            lines.append(f'{self.name}_bucket{{{label},le="+Inf"}} {series["count"]}')
+            lines.append(f"{self.name}_sum{{{label}}} {series['sum']:.6f}")
+            lines.append(f"{self.name}_count{{{label}}} {series['count']}")
+        return lines
+
+
+class ParseMetrics:
+    """Agrega as requisições do /api/parse (seguro entre threads)."""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.stage_seconds = Histogram(
+            "parse_stage_duration_seconds", "Tempo de parede por etapa do /api/parse", "stage")
+        self.request_seconds = Histogram(
+            "parse_request_duration_seconds", "Tempo total das requisições do /api/parse", "cache")
+        self.requests = {}
+        self.pages = 0
+        self.peak_rss_kb = 0
+
+    def record(self, timer, total_seconds, status, cached, guard=None):
+        """Registra uma requisição: etapas do timer, tempo total, status HTTP e pico de memória."""
+        with self._lock:
+            if guard is not None and guard.peak_kb:
+                self.peak_rss_kb = max(self.peak_rss_kb, guard.peak_kb)
+            for name, values in timer.etapas.items():
+                self.stage_seconds.observe(name, values["parede_ms"] / 1000)
+            self.request_seconds.observe("hit" if cached else "miss", total_seconds)
+            self.requests[status] = self.requests.get(status, 0) + 1
+            self.pages += len(timer.paginas)
+
+    def render(self):
+        with self._lock:
+            lines = ["# HELP parse_requests_total Requisições do /api/parse por status HTTP",
+                     "# TYPE parse_requests_total counter"]
+            for status, count in sorted(self.requests.items()):
+                lines.append(f'parse_requests_total{{status="{status}"}} {count}')
+            lines += ["# HELP parse_pages_total Páginas extraídas pelo /api/parse",
+                      "# TYPE parse_pages_total counter",
+                      f"parse_pages_total {self.pages}",
+                     "# HELP parse_peak_resident_memory_bytes Maior memória residente medida durante um parse",
+                     "# TYPE parse_peak_resident_memory_bytes gauge",
+                     f"parse_peak_resident_memory_bytes {self.peak_rss_kb * 1024}"]
+            rss = current_rss_kb()
+            if rss is not None:
+                lines += ["# HELP process_resident_memory_bytes Memória residente atual do processo",
+                          "# TYPE process_resident_memory_bytes gauge",
+                          f"process_resident_memory_bytes {rss * 1024}"]
+            lines += self.stage_seconds.render()
+            lines += self.request_seconds.render()
+        return "\n".join(lines) + "\n"
+
+
+def render_memo():
+    """Acertos, erros e entradas da memoização por função (formato texto do Prometheus)."""
+    current = memo_stats()
+    lines = ["# HELP memo_hits_total Chamadas respondidas pelo cache de memoização",
+             "# TYPE memo_hits_total counter"]
+    lines += [f'memo_hits_total{{function="{name}"}} {s["acertos"]}' for name, s in current.items()]
+    lines += ["# HELP memo_misses_total Chamadas calculadas (e guardadas) pelo cache de memoização",
+              "# TYPE memo_misses_total counter"]
+    lines += [f'memo_misses_total{{function="{name}"}} {s["erros"]}' for name, s in current.items()]
+    lines += ["# HELP memo_entries Entradas no cache de memoização",
+              "# TYPE memo_entries gauge"]
+    lines += [f'memo_entries{{function="{name}"}} {s["entradas"]}' for name, s in current.items()]
+    return "\n".join(lines) + "\n"
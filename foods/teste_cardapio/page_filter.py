@@ -0,0 +1,19 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Triagem das páginas antes do extract_tables: capas, páginas de assinatura e
+anexos em branco não passam pela extração. A heurística e os limiares são os
+do processador (backend/services/triagem_paginas.py), mantidos só lá; aqui os
+motivos ganham os nomes usados em "skipped_pages".
+"""
+
+import services_path  # noqa: F401
+from triagem_paginas import motivo_para_ignorar  # noqa: E402
+
+REASONS = {"sem_bordas": "no_rulings", "sem_texto": "no_text", "sem_cardapio": "no_menu_markers"}
+
+
+def skip_reason(page):
+    """"no_rulings", "no_text" ou "no_menu_markers" se a página não pode ter o cardápio; senão None."""
+    reason = motivo_para_ignorar(page)
+    return REASONS[reason] if reason else None
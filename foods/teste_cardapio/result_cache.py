@@ -0,0 +1,50 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Cache de respostas do /api/parse, endereçado pelo conteúdo do PDF.
+Nível 1: LRU em memória. Nível 2: arquivos em disco com limite de tamanho e idade.
+Os dois níveis são os do processador (backend/services/cache_resultados.py):
+a ocupação do disco é acompanhada a cada gravação, sem reler o diretório.
+"""
+
+import hashlib
+
+import services_path  # noqa: F401
+from cache_resultados import CacheResultados  # noqa: E402
+
+
+class ResultCache(CacheResultados):
+    """Guarda respostas JSON já serializadas (str), chaveadas por sha256 + versão."""
+
+    def __init__(self, directory=None, max_memory_items=32,
+                 max_disk_bytes=512 * 1024 * 1024, max_age_seconds=30 * 24 * 3600):
+        super().__init__(directory, max_memory_items, max_disk_bytes, max_age_seconds)
+
+    @staticmethod
+    def make_key(content, version, variant=None):
+        """variant separa respostas diferentes do mesmo PDF (ex: só alguns campos)."""
+        key = f"{hashlib.sha256(content).hexdigest()}-{version}"
+        if variant:
+            key += "-" + hashlib.sha256(variant.encode("utf-8")).hexdigest()[:16]
+        return key
+
+    def get(self, key):
+        """Retorna o JSON serializado ou None."""
+        return self.obter_serializado(key)
+
+    def put(self, key, payload):
+        self.salvar_serializado(key, payload)
+
+    def stats(self):
+        current = self.estatisticas()
+        return {
+            "memory_hits": current["hits_memoria"],
+            "disk_hits": current["hits_disco"],
+            "misses": current["misses"],
+            "stores": current["gravacoes"],
+            "disk_evictions": current["removidos_disco"],
+            "hit_rate": current["taxa_acerto"],
+            "memory_items": current["itens_memoria"],
+            "disk_bytes": current["bytes_disco"],
+            "directory": current["diretorio"],
+        }
@@ -0,0 +1,13 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Torna importáveis os módulos do processador (backend/services): a triagem de
+páginas, a memoização e a instrumentação ficam só lá e o app usa os mesmos.
+"""
+
+import os
+import sys
+
+SERVICES_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "backend", "services")
+if SERVICES_DIR not in sys.path:
+    sys.path.append(SERVICES_DIR)